@@ -0,0 +1,186 @@
+"""
+Stand-in for the GitHub REST API and raw.githubusercontent.com, serving synthetic repositories from fixtures.
+Also serves the fixture job postings so the benchmark never leaves the machine.
+
+    uvicorn benchmark.fake_github_server:app --port 8102
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse
+
+from benchmark.fixture_data import load_github_users, repo_files, repo_tarball, blob_sha, load_posting_html
+
+latency_seconds = float(os.getenv("fake_github_latency_seconds", "0.05"))
+latency_jitter_seconds = float(os.getenv("fake_github_latency_jitter_seconds", "0.02"))
+rate_limit = int(os.getenv("fake_github_rate_limit", "5000"))
+rate_limit_window_seconds = float(os.getenv("fake_github_rate_limit_window_seconds", "3600"))
+repos_page_size = 100
+
+app = FastAPI()
+stats = Counter()
+_rate_limit_state = {"used": 0, "reset_at": time.time() + rate_limit_window_seconds}
+
+
+async def _simulate_latency():
+    await asyncio.sleep(max(0.0, latency_seconds + random.uniform(-latency_jitter_seconds, latency_jitter_seconds)))
+
+
+def _rate_limit_headers() -> dict:
+    if time.time() >= _rate_limit_state["reset_at"]:
+        _rate_limit_state.update(used=0, reset_at=time.time() + rate_limit_window_seconds)
+    return {
+        "x-ratelimit-limit": str(rate_limit),
+        "x-ratelimit-remaining": str(max(rate_limit - _rate_limit_state["used"], 0)),
+        "x-ratelimit-used": str(_rate_limit_state["used"]),
+        "x-ratelimit-reset": str(int(_rate_limit_state["reset_at"])),
+        "x-ratelimit-resource": "core",
+    }
+
+
+async def _api_response(request: Request, kind: str, body, status_code: int = 200, headers: dict = None) -> Response:
+    await _simulate_latency()
+    stats[f"api:{kind}"] += 1
+
+    if _rate_limit_state["used"] >= rate_limit and time.time() < _rate_limit_state["reset_at"]:
+        stats["rate_limited"] += 1
+        return Response(json.dumps({"message": "API rate limit exceeded"}), status_code=403,
+                        headers=_rate_limit_headers(), media_type="application/json")
+
+    content = json.dumps(body).encode("utf-8")
+    etag = '"' + hashlib.md5(content).hexdigest() + '"'
+    if status_code == 200 and request.headers.get("if-none-match") == etag:
+        # Conditional hits do not count against the quota, like on GitHub.
+        stats["not_modified"] += 1
+        return Response(status_code=304, headers={"etag": etag, **_rate_limit_headers()})
+
+    _rate_limit_state["used"] += 1
+    response_headers = {"etag": etag, **(headers or {}), **_rate_limit_headers()}
+    return Response(content, status_code=status_code, headers=response_headers, media_type="application/json")
+
+
+def _repo_listing_entry(owner: str, repo_spec: dict) -> dict:
+    full_name = f"{owner}/{repo_spec['name']}"
+    return {
+        "name": repo_spec["name"],
+        "full_name": full_name,
+        "owner": {"login": owner},
+        "html_url": f"https://github.com/{full_name}",
+        "description": f"Synthetic {repo_spec['language']} repository",
+        "language": repo_spec["language"],
+        "fork": repo_spec.get("fork", False),
+        "archived": repo_spec.get("archived", False),
+        "size": repo_spec["files"] * repo_spec["lines_per_file"] // 20,
+        "stargazers_count": repo_spec.get("stars", 0),
+        "default_branch": "main",
+        "pushed_at": repo_spec["pushed_at"],
+        "updated_at": repo_spec["pushed_at"],
+    }
+
+
+@app.get("/users/{login}")
+async def get_user(login: str, request: Request):
+    user = next((dict(spec, login=name) for name, spec in load_github_users().items() if name.lower() == login.lower()),
+                None)
+    if user is None:
+        return await _api_response(request, "user", {"message": "Not Found"}, status_code=404)
+    return await _api_response(request, "user", {"login": user["login"], "type": user["type"]})
+
+
+@app.get("/users/{login}/repos")
+async def list_repos(login: str, request: Request, page: int = 1, per_page: int = 30):
+    user = load_github_users().get(login)
+    if user is None:
+        return await _api_response(request, "repos", {"message": "Not Found"}, status_code=404)
+    per_page = min(per_page, repos_page_size)
+    entries = [_repo_listing_entry(login, repo_spec) for repo_spec in user["repos"]]
+    page_entries = entries[(page - 1) * per_page:page * per_page]
+    headers = {}
+    if page * per_page < len(entries):
+        next_url = f"{str(request.base_url).rstrip('/')}{request.url.path}?{urlencode({'page': page + 1, 'per_page': per_page})}"
+        headers["link"] = f'<{next_url}>; rel="next"'
+    return await _api_response(request, "repos", page_entries, headers=headers)
+
+
+@app.get("/repos/{owner}/{repo}/tarball/{ref}")
+async def get_tarball(owner: str, repo: str, ref: str):
+    await _simulate_latency()
+    stats["api:tarball"] += 1
+    if repo_files(owner, repo) is None:
+        return Response(status_code=404)
+    _rate_limit_state["used"] += 1
+    return Response(repo_tarball(owner, repo), media_type="application/x-gzip", headers=_rate_limit_headers())
+
+
+@app.get("/repos/{owner}/{repo}/git/trees/{ref}")
+async def get_tree(owner: str, repo: str, ref: str, request: Request):
+    files = repo_files(owner, repo)
+    if files is None:
+        return await _api_response(request, "tree", {"message": "Not Found"}, status_code=404)
+    tree = [{"path": path, "type": "blob", "sha": blob_sha(content), "size": len(content)} for path, content in files]
+    return await _api_response(request, "tree", {"sha": ref, "tree": tree, "truncated": False})
+
+
+@app.get("/repos/{owner}/{repo}/contents/{path:path}")
+async def get_contents(owner: str, repo: str, path: str, request: Request):
+    files = repo_files(owner, repo)
+    if files is None:
+        return await _api_response(request, "contents", {"message": "Not Found"}, status_code=404)
+    path = path.strip("/")
+    for file_path, content in files:
+        if file_path == path:
+            return await _api_response(request, "contents", {
+                "type": "file", "path": file_path, "sha": blob_sha(content), "size": len(content),
+                "encoding": "base64", "content": base64.b64encode(content.encode("utf-8")).decode("ascii"),
+            })
+
+    prefix = f"{path}/" if path else ""
+    entries = {}
+    for file_path, content in files:
+        if not file_path.startswith(prefix):
+            continue
+        name, _, rest = file_path[len(prefix):].partition("/")
+        if rest:
+            entries[name] = {"name": name, "path": prefix + name, "type": "dir", "size": 0}
+        else:
+            entries[name] = {"name": name, "path": prefix + name, "type": "file", "sha": blob_sha(content),
+                             "size": len(content)}
+    if not entries:
+        return await _api_response(request, "contents", {"message": "Not Found"}, status_code=404)
+    return await _api_response(request, "contents", list(entries.values()))
+
+
+@app.get("/raw/{owner}/{repo}/{ref}/{path:path}")
+async def get_raw(owner: str, repo: str, ref: str, path: str):
+    await _simulate_latency()
+    stats["raw"] += 1
+    content = dict(repo_files(owner, repo) or []).get(path)
+    if content is None:
+        return Response(status_code=404)
+    return Response(content, media_type="text/plain")
+
+
+@app.get("/postings/{name}", response_class=HTMLResponse)
+async def get_posting(name: str):
+    stats["posting"] += 1
+    return HTMLResponse(load_posting_html(name))
+
+
+@app.get("/stats")
+async def get_stats():
+    return dict(stats, api_total=sum(count for key, count in stats.items() if key.startswith("api:")))
+
+
+@app.post("/reset")
+async def reset_stats():
+    stats.clear()
+    _rate_limit_state.update(used=0, reset_at=time.time() + rate_limit_window_seconds)
+    return {"reset": True}
@@ -0,0 +1,153 @@
+"""
+Stand-in for the OpenAI chat-completions API with configurable latency, output size and rate limiting.
+JSON-mode answers contain the fields of every response model the app parses, so each call site gets usable output.
+
+    uvicorn benchmark.fake_openai_server:app --port 8101
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import Counter, deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+base_latency_seconds = float(os.getenv("fake_openai_latency_seconds", "0.5"))
+seconds_per_completion_token = float(os.getenv("fake_openai_seconds_per_token", "0.0005"))
+completion_tokens = int(os.getenv("fake_openai_completion_tokens", "600"))
+requests_per_minute = int(os.getenv("fake_openai_requests_per_minute", "0"))  # 0 disables rate limiting
+# Latency multiplier by model name, so routing cheap call sites to small models shows up in the benchmark.
+model_latency_factors = json.loads(os.getenv("fake_openai_model_latency_factors", '{"gpt-5-nano": 0.2, "gpt-5-mini": 0.4}'))
+
+app = FastAPI()
+stats = Counter()
+_request_times = deque()
+_last_prompt_by_cache_key = {}
+min_cacheable_prompt_tokens = 1024
+cache_block_tokens = 128
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _json_answer(prompt: str) -> dict:
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    generator = random.Random(seed)
+    score = generator.randint(40, 95)
+    filler = "Synthetic benchmark answer. " * max(1, completion_tokens // 40)
+    return {
+        # CandidateBasicAnalysis
+        "resume_data": {"contact_info": {"name": "Benchmark Candidate"}, "summary": filler, "skills": ["Python", "Go"]},
+        "job_fit_analysis": {"overall_score": score, "match_summary": filler, "strengths": ["Python"],
+                             "weaknesses": ["Kubernetes"]},
+        # GithubAnalysisReport
+        "project_name": "synthetic-project",
+        "project_purpose": f"Synthetic purpose {seed % 7}.",
+        "core_functionality": ["Serves requests", "Stores data"],
+        "architecture_design": f"Layered design variant {seed % 5}.",
+        "code_quality_assessment": f"Readable code, variant {seed % 3}.",
+        "technology_stack": ["Python", "PostgreSQL"],
+        "strengths": ["Clear module boundaries"],
+        "weaknesses": ["Few tests"],
+        "improvement_suggestions": ["Add integration tests"],
+        # CompositeAnalysisReport
+        "candidate_name": "Benchmark Candidate",
+        "overall_assessment": filler,
+        "evidence_based_analysis": {"strength_validation": filler},
+        "revised_job_fit": {"updated_score": score, "justification": filler},
+        "red_flags": [],
+    }
+
+
+def _text_answer(system_prompt: str, prompt: str) -> str:
+    match = re.search(r'github\.com/[\w\-]+', prompt)
+    if "github username" in (system_prompt + prompt).lower():
+        return f"https://{match.group(0)}" if match else "No GitHub username was found."
+    return prompt[:completion_tokens * 4]
+
+
+def _cached_prompt_tokens(cache_key: str, full_prompt: str) -> int:
+    """Like provider prompt caching: the prefix shared with an earlier prompt counts, in 128-token blocks from 1024."""
+    previous_prompt = _last_prompt_by_cache_key.get(cache_key, "")
+    _last_prompt_by_cache_key[cache_key] = full_prompt
+    shared_chars = 0
+    for previous_char, current_char in zip(previous_prompt, full_prompt):
+        if previous_char != current_char:
+            break
+        shared_chars += 1
+    shared_tokens = _estimate_tokens(full_prompt[:shared_chars]) if shared_chars else 0
+    if shared_tokens < min_cacheable_prompt_tokens:
+        return 0
+    return shared_tokens - shared_tokens % cache_block_tokens
+
+
+def _rate_limited() -> bool:
+    if requests_per_minute <= 0:
+        return False
+    now = time.monotonic()
+    while _request_times and now - _request_times[0] > 60:
+        _request_times.popleft()
+    if len(_request_times) >= requests_per_minute:
+        return True
+    _request_times.append(now)
+    return False
+
+
+@app.post("/v1/chat/completions")
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    system_prompt = next((message["content"] for message in messages if message["role"] == "system"), "")
+    prompt = "\n".join(message["content"] for message in messages if message["role"] == "user")
+    stats["requests"] += 1
+
+    if _rate_limited():
+        stats["rate_limited"] += 1
+        return JSONResponse({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                            status_code=429, headers={"retry-after": "1"})
+
+    stats[f"requests:{body.get('model', 'gpt-5')}"] += 1
+    latency_factor = model_latency_factors.get(body.get("model"), 1.0)
+    await asyncio.sleep((base_latency_seconds + seconds_per_completion_token * completion_tokens) * latency_factor)
+
+    is_json = (body.get("response_format") or {}).get("type") == "json_object"
+    content = json.dumps(_json_answer(prompt)) if is_json else _text_answer(system_prompt, prompt)
+    prompt_tokens = _estimate_tokens(system_prompt) + _estimate_tokens(prompt)
+    cache_key = body.get("prompt_cache_key") or system_prompt[:200]
+    cached_tokens = min(_cached_prompt_tokens(cache_key, system_prompt + "\n" + prompt), prompt_tokens)
+    stats["prompt_tokens"] += prompt_tokens
+    stats["cached_prompt_tokens"] += cached_tokens
+    stats["completion_tokens"] += completion_tokens
+
+    return {
+        "id": f"chatcmpl-{stats['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-5"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return dict(stats)
+
+
+@app.post("/reset")
+async def reset_stats():
+    stats.clear()
+    _request_times.clear()
+    _last_prompt_by_cache_key.clear()
+    return {"reset": True}
@@ -0,0 +1,121 @@
+import hashlib
+import io
+import json
+import os
+import random
+import tarfile
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+language_layouts = {
+    "Python": (".py", ["requirements.txt", "Dockerfile", "app/main.py"]),
+    "TypeScript": (".ts", ["package.json", "src/index.ts"]),
+    "Go": (".go", ["go.mod", "cmd/server/main.go", "Dockerfile"]),
+    "Java": (".java", ["pom.xml", "src/main/java/Application.java"]),
+    "Shell": (".sh", ["install.sh"]),
+}
+
+
+def load_github_users() -> Dict[str, dict]:
+    with open(os.path.join(fixtures_dir, "github_users.json"), encoding="utf-8") as fixture_file:
+        return json.load(fixture_file)
+
+
+def load_resume_texts() -> Dict[str, str]:
+    resumes_dir = os.path.join(fixtures_dir, "resumes")
+    resume_texts = {}
+    for file_name in sorted(os.listdir(resumes_dir)):
+        with open(os.path.join(resumes_dir, file_name), encoding="utf-8") as resume_file:
+            resume_texts[file_name.rsplit(".", 1)[0]] = resume_file.read()
+    return resume_texts
+
+
+def load_posting_html(name: str) -> str:
+    with open(os.path.join(fixtures_dir, "postings", f"{name}.html"), encoding="utf-8") as posting_file:
+        return posting_file.read()
+
+
+def resume_pdf_bytes(resume_text: str, github_link: str = None) -> bytes:
+    """Render a resume as a PDF. With `github_link`, the profile is only reachable through a hyperlink annotation."""
+    import fitz
+
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 790), resume_text, fontsize=9)
+    if github_link:
+        label_rect = fitz.Rect(50, 800, 120, 815)
+        page.insert_textbox(label_rect, "GitHub", fontsize=9)
+        page.insert_link({"kind": fitz.LINK_URI, "from": label_rect, "uri": github_link})
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
+
+
+def _synthetic_source(path: str, extension: str, lines: int, seed: str) -> str:
+    generator = random.Random(seed + path)
+    words = ["account", "ledger", "invoice", "route", "packet", "store", "buffer", "cache", "client", "handler",
+             "session", "payload", "balance", "retry", "index", "segment", "report", "queue", "token", "worker"]
+    comment = "#" if extension in (".py", ".sh") else "//"
+    body = [f"{comment} {path} (synthetic benchmark fixture)"]
+    while len(body) < lines:
+        name = "_".join(generator.sample(words, 2))
+        body.append(f"{comment} {' '.join(generator.sample(words, 6))}")
+        if extension == ".py":
+            body += [f"def {name}(value):", f"    return value * {generator.randint(2, 99)}", ""]
+        elif extension == ".go":
+            body += [f"func {name}(value int) int {{", f"\treturn value * {generator.randint(2, 99)}", "}", ""]
+        else:
+            body += [f"function {name}(value) {{", f"  return value * {generator.randint(2, 99)};", "}", ""]
+    return "\n".join(body[:lines]) + "\n"
+
+
+@lru_cache(maxsize=None)
+def synthetic_repo_files(owner: str, repo_spec_json: str) -> Tuple[Tuple[str, str], ...]:
+    repo_spec = json.loads(repo_spec_json)
+    extension, extra_paths = language_layouts.get(repo_spec["language"], (".txt", []))
+    lines = repo_spec["lines_per_file"]
+    paths = list(extra_paths)
+    for index in range(repo_spec["files"]):
+        module = f"module_{index % 4}"
+        paths.append(f"src/{module}/file_{index}{extension}" if index % 5 else f"tests/test_file_{index}{extension}")
+    seed = f"{owner}/{repo_spec['name']}"
+    files = [(path, _synthetic_source(path, "." + path.rsplit(".", 1)[-1], lines, seed)) for path in paths]
+    # Content the analysis should not pay for: a helper copied into every repository of the owner,
+    # a vendored dependency and a minified bundle.
+    files.append((f"common/retry{extension}", _synthetic_source(f"common/retry{extension}", extension, 60, owner)))
+    files.append((f"vendor/left_pad{extension}", _synthetic_source(f"vendor/left_pad{extension}", extension, 80, "")))
+    files.append(("static/app.js", ";".join(f"var a{index}=function(b){{return b*{index}}}" for index in range(400))))
+    return tuple(files)
+
+
+def find_repo_spec(owner: str, repo_name: str) -> dict:
+    user = load_github_users().get(owner)
+    if user is None:
+        return None
+    return next((repo for repo in user["repos"] if repo["name"] == repo_name), None)
+
+
+def repo_files(owner: str, repo_name: str) -> List[Tuple[str, str]]:
+    repo_spec = find_repo_spec(owner, repo_name)
+    if repo_spec is None:
+        return None
+    return list(synthetic_repo_files(owner, json.dumps(repo_spec, sort_keys=True)))
+
+
+def blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def repo_tarball(owner: str, repo_name: str) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, content in repo_files(owner, repo_name):
+            data = content.encode("utf-8")
+            member = tarfile.TarInfo(f"{owner}-{repo_name}-0000000/{path}")
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
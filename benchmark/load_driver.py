@@ -0,0 +1,226 @@
+"""
+Fires concurrent /resume, /resume/pdf and /chat load at a running app and reports latency percentiles,
+throughput and upstream calls per request (read from the fake OpenAI / GitHub servers' /stats).
+
+    python -m benchmark.load_driver --app-url http://127.0.0.1:8100 \
+        --openai-url http://127.0.0.1:8101 --github-url http://127.0.0.1:8102 --requests 40 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmark.fixture_data import load_resume_texts, resume_pdf_bytes
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = int(weight or 1)
+    unknown = set(weights) - {"resume", "pdf", "chat"}
+    if unknown:
+        raise ValueError(f"Unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+def build_workload(args) -> List[dict]:
+    resume_texts = list(load_resume_texts().values())
+    weights = parse_mix(args.mix)
+    generator = random.Random(args.seed)
+    workload = []
+    for index in range(args.requests):
+        endpoint = generator.choices(list(weights), weights=list(weights.values()))[0]
+        resume_text = resume_texts[index % len(resume_texts)]
+        if args.unique_resumes:
+            resume_text += f"\nReference number: {index}\n"
+        workload.append({"endpoint": endpoint, "resume_text": resume_text, "index": index})
+    return workload
+
+
+async def send_request(client: httpx.AsyncClient, args, item: dict) -> httpx.Response:
+    if item["endpoint"] == "resume":
+        return await client.post("/resume", params={
+            "resume_text": item["resume_text"],
+            "application_link": args.posting_url,
+            "force_refresh": str(args.force_refresh).lower()
+        })
+    if item["endpoint"] == "pdf":
+        # The PDF variant carries its GitHub profile only as a hyperlink annotation.
+        github_link = None
+        match = re.search(r'https://github\.com/[\w\-]+', item["resume_text"])
+        if match:
+            github_link = match.group(0)
+        pdf_bytes = resume_pdf_bytes(item["resume_text"].replace(github_link or "\0", ""), github_link)
+        return await client.post(
+            "/resume/pdf",
+            data={"application_link": args.posting_url, "force_refresh": str(args.force_refresh).lower()},
+            files={"resume_pdf_file": (f"resume_{item['index']}.pdf", pdf_bytes, "application/pdf")}
+        )
+    return await client.get("/chat", params={"prompt": f"Benchmark chat request {item['index']}"})
+
+
+async def fetch_stats(url: Optional[str]) -> dict:
+    if not url:
+        return {}
+    async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+        return (await client.get("/stats")).json()
+
+
+async def run_load(args) -> dict:
+    workload = build_workload(args)
+    openai_before, github_before = await asyncio.gather(fetch_stats(args.openai_url), fetch_stats(args.github_url))
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.app_url, timeout=args.timeout) as client:
+        async def run_item(item: dict):
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    response = await send_request(client, args, item)
+                    ok = response.status_code == 200
+                except httpx.HTTPError as e:
+                    print(f"Request {item['index']} ({item['endpoint']}) failed: {e}", file=sys.stderr)
+                    ok = False
+                latencies[item["endpoint"]].append(time.perf_counter() - started_at)
+                if not ok:
+                    errors[item["endpoint"]] += 1
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*[run_item(item) for item in workload])
+        wall_seconds = time.perf_counter() - started_at
+
+    openai_after, github_after = await asyncio.gather(fetch_stats(args.openai_url), fetch_stats(args.github_url))
+    analysis_requests = sum(len(latencies.get(endpoint, [])) for endpoint in ("resume", "pdf")) or 1
+
+    def delta(after: dict, before: dict, key: str) -> int:
+        return after.get(key, 0) - before.get(key, 0)
+
+    endpoints = {}
+    for endpoint, values in sorted(latencies.items()):
+        values.sort()
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": errors[endpoint],
+            "p50_seconds": round(percentile(values, 0.50), 3),
+            "p95_seconds": round(percentile(values, 0.95), 3),
+            "p99_seconds": round(percentile(values, 0.99), 3),
+            "mean_seconds": round(sum(values) / len(values), 3),
+        }
+
+    return {
+        "requests": len(workload),
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(workload) / wall_seconds, 3) if wall_seconds else None,
+        "errors": sum(errors.values()),
+        "endpoints": endpoints,
+        "upstream": {
+            "llm_calls": delta(openai_after, openai_before, "requests"),
+            "llm_rate_limited": delta(openai_after, openai_before, "rate_limited"),
+            "llm_prompt_tokens": delta(openai_after, openai_before, "prompt_tokens"),
+            "llm_cached_prompt_tokens": delta(openai_after, openai_before, "cached_prompt_tokens"),
+            "github_api_calls": delta(github_after, github_before, "api_total"),
+            "github_not_modified": delta(github_after, github_before, "not_modified"),
+            "github_raw_calls": delta(github_after, github_before, "raw"),
+            "posting_fetches": delta(github_after, github_before, "posting"),
+        },
+        # /chat makes one LLM call and no GitHub calls; attribute the rest to the analysis requests.
+        "llm_calls_per_analysis": round(
+            (delta(openai_after, openai_before, "requests") - len(latencies.get("chat", []))) / analysis_requests, 2),
+        "github_calls_per_analysis": round(delta(github_after, github_before, "api_total") / analysis_requests, 2),
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{report['requests']} requests, concurrency {report['concurrency']}, "
+          f"{report['wall_seconds']}s wall, {report['throughput_rps']} req/s, {report['errors']} errors")
+    print(f"{'endpoint':<10}{'n':>6}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:<10}{stats['requests']:>6}{stats['errors']:>6}{stats['p50_seconds']:>9}"
+              f"{stats['p95_seconds']:>9}{stats['p99_seconds']:>9}{stats['mean_seconds']:>9}")
+    print(f"upstream: {json.dumps(report['upstream'])}")
+    print(f"LLM calls per analysis: {report['llm_calls_per_analysis']}, "
+          f"GitHub API calls per analysis: {report['github_calls_per_analysis']}")
+
+
+def check_thresholds(report: dict, args) -> List[str]:
+    failures = []
+    if report["errors"] > args.max_errors:
+        failures.append(f"{report['errors']} failed requests (max {args.max_errors})")
+    if args.max_llm_calls_per_analysis is not None and report["llm_calls_per_analysis"] > args.max_llm_calls_per_analysis:
+        failures.append(f"{report['llm_calls_per_analysis']} LLM calls per analysis "
+                        f"(max {args.max_llm_calls_per_analysis})")
+    if (args.max_github_calls_per_analysis is not None
+            and report["github_calls_per_analysis"] > args.max_github_calls_per_analysis):
+        failures.append(f"{report['github_calls_per_analysis']} GitHub API calls per analysis "
+                        f"(max {args.max_github_calls_per_analysis})")
+    if args.max_p95_seconds is not None:
+        for endpoint, stats in report["endpoints"].items():
+            if stats["p95_seconds"] > args.max_p95_seconds:
+                failures.append(f"{endpoint} p95 {stats['p95_seconds']}s (max {args.max_p95_seconds}s)")
+    return failures
+
+
+def add_load_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default="resume=2,pdf=1,chat=1", help="Endpoint weights, e.g. resume=2,pdf=1,chat=1")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--unique-resumes", action="store_true",
+                        help="Make every resume text unique so LLM response caching does not hide the cost.")
+    parser.add_argument("--force-refresh", action="store_true", help="Bypass the repository analysis cache.")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    parser.add_argument("--max-errors", type=int, default=0)
+    parser.add_argument("--max-llm-calls-per-analysis", type=float)
+    parser.add_argument("--max-github-calls-per-analysis", type=float)
+    parser.add_argument("--max-p95-seconds", type=float)
+
+
+def finish(report: dict, args) -> int:
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+    failures = check_thresholds(report, args)
+    for failure in failures:
+        print(f"THRESHOLD EXCEEDED: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-url", required=True)
+    parser.add_argument("--openai-url")
+    parser.add_argument("--github-url")
+    parser.add_argument("--posting-url", help="Defaults to the fixture posting served by the fake GitHub server.")
+    add_load_arguments(parser)
+    args = parser.parse_args()
+    if not args.posting_url:
+        if not args.github_url:
+            parser.error("--posting-url is required without --github-url")
+        args.posting_url = f"{args.github_url.rstrip('/')}/postings/backend_engineer"
+    return finish(asyncio.run(run_load(args)), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Starts the fake OpenAI and GitHub servers and the app on free local ports, runs the load driver against them
+and stops everything. Needs no network access, so it can gate CI on latency and upstream call counts.
+
+    python -m benchmark.run_benchmark --requests 40 --concurrency 8 --max-llm-calls-per-analysis 12
+
+Fake server behaviour is configured through their environment variables (fake_openai_*, fake_github_*).
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmark.load_driver import add_load_arguments, run_load, finish
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(module_app: str, port: int, env: dict, log_file) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module_app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=repo_root, env=env, stdout=log_file, stderr=subprocess.STDOUT
+    )
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout_seconds: float = 60):
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {process.returncode}.")
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not become ready within {timeout_seconds}s.")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_load_arguments(parser)
+    parser.add_argument("--log", default=os.path.join(tempfile.gettempdir(), "resume_benchmark.log"),
+                        help="Where the servers' output is written.")
+    args = parser.parse_args()
+
+    openai_port, github_port, app_port = free_port(), free_port(), free_port()
+    openai_url = f"http://127.0.0.1:{openai_port}"
+    github_url = f"http://127.0.0.1:{github_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    cache_dir = tempfile.mkdtemp(prefix="resume_benchmark_cache_")
+
+    app_env = dict(
+        os.environ,
+        chat_gpt_api_key_1="benchmark",
+        openai_base_url=f"{openai_url}/v1",
+        github_token_1="benchmark",
+        github_api_base_url=github_url,
+        github_raw_base_url=f"{github_url}/raw",
+        cache_dir=cache_dir,
+        browser_pool_size="0",
+        browser_prewarm="false",
+        resume_job_workers="0",
+    )
+
+    processes = []
+    with open(args.log, "w", encoding="utf-8") as log_file:
+        try:
+            processes.append(start_server("benchmark.fake_openai_server:app", openai_port, dict(os.environ), log_file))
+            wait_until_ready(f"{openai_url}/stats", processes[-1])
+            processes.append(start_server("benchmark.fake_github_server:app", github_port, dict(os.environ), log_file))
+            wait_until_ready(f"{github_url}/stats", processes[-1])
+            processes.append(start_server("main:app", app_port, app_env, log_file))
+            wait_until_ready(f"{app_url}/", processes[-1])
+
+            args.app_url, args.openai_url, args.github_url = app_url, openai_url, github_url
+            args.posting_url = f"{github_url}/postings/backend_engineer"
+            report = asyncio.run(run_load(args))
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    print(f"Server output: {args.log}")
+    return finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
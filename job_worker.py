@@ -0,0 +1,27 @@
+import asyncio
+
+from service.chat_completion.chat_completion_service import init_openai_client, close_openai_client
+from service.github.github_api_client import close_github_api_client
+from service.jobs.resume_job_worker_pool import get_resume_job_worker_pool
+from service.resume_analysis.pdf_text_extraction_service import shutdown_pdf_process_pool
+from service.scraping.headless_browser_pool import get_headless_browser_pool
+from service.scraping.job_posting_fetcher import close_static_http_client
+
+
+async def run_job_workers():
+    init_openai_client()
+    await get_headless_browser_pool().start()
+    await get_resume_job_worker_pool().start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await get_resume_job_worker_pool().stop()
+        await get_headless_browser_pool().stop()
+        await close_static_http_client()
+        await close_github_api_client()
+        shutdown_pdf_process_pool()
+        await close_openai_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_job_workers())
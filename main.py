@@ -1,11 +1,103 @@
-from fastapi import FastAPI
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from router import health_check_router
 from router import chat_completion_router
 from router import analyze_resume_router
+from router import admin_router
+from router import resume_job_router
+from router import metrics_router
+from service.chat_completion.chat_completion_service import init_openai_client, close_openai_client
+from service.chat_completion.llm_call_policy import LlmCallError
+from service.github.github_api_client import close_github_api_client
+from service.jobs.resume_job_worker_pool import get_resume_job_worker_pool
+from service.resume_analysis.pdf_text_extraction_service import shutdown_pdf_process_pool, max_pdf_upload_body_bytes
+from service.resume_analysis.resume_batch_analysis_service import max_batch_size
+from service.scraping.headless_browser_pool import get_headless_browser_pool
+from service.scraping.job_posting_fetcher import close_static_http_client
+from utils.request_context import current_request_id, new_request_id, current_deadline, deadline_after
+from utils.tracing import RequestTimings, current_request_timings, http_request_duration_seconds
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        init_openai_client()
+    except Exception as e:
+        print(f"WARNING: Could not create the OpenAI client at startup: {e}")
+    await get_headless_browser_pool().start(prewarm=os.getenv("browser_prewarm", "true").lower() == "true")
+    await get_resume_job_worker_pool().start()
+    yield
+    await get_resume_job_worker_pool().stop()
+    await get_headless_browser_pool().stop()
+    await close_static_http_client()
+    await close_github_api_client()
+    shutdown_pdf_process_pool()
+    await close_openai_client()
+
+
+app = FastAPI(lifespan=lifespan)
+pdf_upload_paths = {"/resume/pdf", "/resume/pdf/stream", "/jobs/resume/pdf"}
+pdf_batch_upload_paths = {"/resume/batch/pdf"}
+
+
+def upload_body_limit(path: str):
+    if path in pdf_upload_paths:
+        return max_pdf_upload_body_bytes()
+    if path in pdf_batch_upload_paths:
+        return max_pdf_upload_body_bytes(max_batch_size)
+    return None
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Runs before the multipart body is parsed, so an oversized PDF is never spooled to disk.
+    body_limit = upload_body_limit(request.url.path)
+    content_length = request.headers.get("content-length")
+    if body_limit is not None and content_length is not None and content_length.isdigit() \
+            and int(content_length) > body_limit:
+        return JSONResponse(status_code=413,
+                            content={"detail": f"The upload exceeds the {body_limit} byte request limit."})
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def bind_request_context(request: Request, call_next):
+    request_id_token = current_request_id.set(new_request_id())
+    deadline_token = current_deadline.set(deadline_after())
+    timings = RequestTimings()
+    timings_token = current_request_timings.set(timings)
+    started_at = time.perf_counter()
+    try:
+        response = await call_next(request)
+        response.headers["Server-Timing"] = timings.server_timing_header()
+        route = request.scope.get("route")
+        http_request_duration_seconds.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=response.status_code
+        )
+        return response
+    finally:
+        current_request_timings.reset(timings_token)
+        current_deadline.reset(deadline_token)
+        current_request_id.reset(request_id_token)
+
+
+@app.exception_handler(LlmCallError)
+async def llm_call_error_handler(request: Request, exc: LlmCallError):
+    # 502 when the model kept failing, 504 when the request deadline ran out first.
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
 
-app = FastAPI()
 
 app.include_router(health_check_router.router);
 app.include_router(chat_completion_router.router);
 app.include_router(analyze_resume_router.router);
+app.include_router(admin_router.router);
+app.include_router(resume_job_router.router);
+app.include_router(metrics_router.router);
@@ -0,0 +1,22 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from model.resume_analysis.resume_composite_analysis import CompositeAnalysisReport
+
+
+class ResumeAnalysisJob(BaseModel):
+    job_id: str
+    status: str
+    application_link: str = ""
+    created_at: float = 0
+    updated_at: float = 0
+    attempts: int = 0
+    progress: Dict[str, Any] = {}
+    result: Optional[CompositeAnalysisReport] = None
+    error: Optional[str] = None
+
+
+class ResumeAnalysisJobCreated(BaseModel):
+    job_id: str
+    status: str
@@ -0,0 +1,26 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from model.resume_analysis.resume_composite_analysis import CompositeAnalysisReport
+
+
+class ResumeBatchItem(BaseModel):
+    candidate_id: str
+    resume_text: str
+    file_name: Optional[str] = None
+
+
+class ResumeBatchAnalysisRequest(BaseModel):
+    application_link: str
+    resumes: List[ResumeBatchItem]
+    force_refresh: bool = False
+
+
+class RankedCandidate(BaseModel):
+    rank: int = 0
+    candidate_id: str
+    file_name: Optional[str] = None
+    score: Optional[int] = None
+    report: Optional[CompositeAnalysisReport] = None
+    error: Optional[str] = None
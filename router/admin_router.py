@@ -0,0 +1,93 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from service.chat_completion.llm_model_router import get_llm_model_router
+from service.chat_completion.llm_rate_governor import get_llm_rate_governor
+from service.chat_completion.llm_response_cache import get_llm_response_cache
+from service.chat_completion.prompt_registry import list_prompt_templates
+from service.github.github_api_client import get_github_api_client
+from service.jobs.resume_job_worker_pool import get_resume_job_worker_pool
+from service.resume_analysis.basic_analysis.job_requirements_store import get_job_requirements_store
+from service.resume_analysis.git_crawling_analysis.repo_analysis_cache import get_repo_analysis_cache
+from service.scraping.headless_browser_pool import get_headless_browser_pool
+
+router = APIRouter(prefix="/admin")
+
+
+@router.get("/llm/governor")
+async def llm_governor_status() -> dict:
+    return get_llm_rate_governor().snapshot()
+
+
+@router.get("/llm/cache")
+async def llm_cache_status() -> dict:
+    return get_llm_response_cache().stats()
+
+
+@router.delete("/llm/cache")
+async def clear_llm_cache() -> dict:
+    await get_llm_response_cache().clear()
+    return get_llm_response_cache().stats()
+
+
+@router.get("/llm/prompts")
+async def llm_prompt_templates() -> list:
+    return list_prompt_templates()
+
+
+@router.get("/llm/routes")
+async def llm_model_routes() -> dict:
+    return get_llm_model_router().snapshot()
+
+
+@router.get("/scraper/browsers")
+async def browser_pool_status() -> dict:
+    return get_headless_browser_pool().snapshot()
+
+
+@router.get("/job-requirements")
+async def list_job_requirements() -> dict:
+    store = get_job_requirements_store()
+    return {"entries": store.list_entries(), "in_flight": store.in_flight_urls()}
+
+
+@router.get("/job-requirements/entry")
+async def get_job_requirements_entry(url: str) -> dict:
+    entry = get_job_requirements_store().get_entry(url)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No cached job requirements for this URL.")
+    return entry.__dict__
+
+
+@router.delete("/job-requirements")
+async def invalidate_job_requirements(url: Optional[str] = None) -> dict:
+    store = get_job_requirements_store()
+    if url is None:
+        return {"invalidated": store.clear()}
+    return {"invalidated": 1 if store.invalidate(url) else 0}
+
+
+@router.get("/github")
+async def github_client_status() -> dict:
+    return get_github_api_client().snapshot()
+
+
+@router.get("/repo-analysis")
+async def repo_analysis_cache_status() -> dict:
+    return get_repo_analysis_cache().stats()
+
+
+@router.delete("/repo-analysis")
+async def invalidate_repo_analysis(repo: Optional[str] = None) -> dict:
+    cache = get_repo_analysis_cache()
+    if repo is None:
+        await cache.clear()
+    else:
+        await cache.invalidate(repo)
+    return cache.stats()
+
+
+@router.get("/jobs")
+async def resume_job_worker_status() -> dict:
+    return get_resume_job_worker_pool().snapshot()
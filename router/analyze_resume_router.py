@@ -1,24 +1,96 @@
+from typing import List
+
 from fastapi import APIRouter, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 
 from model.resume_analysis.resume_analysis_request import ResumeAnalysisRequest
+from model.resume_analysis.resume_batch_analysis import ResumeBatchAnalysisRequest
 from model.resume_analysis.resume_composite_analysis import CompositeAnalysisReport
-from service.resume_analysis.resume_core_analysis_service import analyze_resume, analyze_pdf_resume
+from service.resume_analysis.resume_analysis_stream_service import stream_resume_analysis
+from service.resume_analysis.resume_batch_analysis_service import stream_resume_batch_analysis, \
+    resume_batch_items_from_pdfs, check_batch_size
+from service.resume_analysis.resume_core_analysis_service import analyze_resume, analyze_pdf_resume, \
+    resume_text_from_pdf
 
 router = APIRouter()
+sse_headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 
 @router.post("/resume")
-async def resume_analysis(resume_text: str, application_link: str) -> CompositeAnalysisReport:
-    return await analyze_resume(resume_text=resume_text, application_link=application_link)
+async def resume_analysis(
+        resume_text: str,
+        application_link: str,
+        force_refresh: bool = False
+) -> CompositeAnalysisReport:
+    return await analyze_resume(resume_text=resume_text, application_link=application_link, force_refresh=force_refresh)
 
 
 @router.post("/resume/pdf")
 async def resume_pdf_analysis(
         application_link: str = Form(...),
-        resume_pdf_file: UploadFile = File(...)
+        resume_pdf_file: UploadFile = File(...),
+        force_refresh: bool = Form(False)
 ) -> CompositeAnalysisReport:
     return await analyze_pdf_resume(
         resume_pdf_file=resume_pdf_file,
-        application_link=application_link
+        application_link=application_link,
+        force_refresh=force_refresh
+    )
+
+
+
+@router.post("/resume/stream")
+async def resume_analysis_stream(
+        resume_text: str,
+        application_link: str,
+        force_refresh: bool = False
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_resume_analysis(resume_text, application_link, force_refresh=force_refresh),
+        media_type="text/event-stream",
+        headers=sse_headers
+    )
+
+
+@router.post("/resume/pdf/stream")
+async def resume_pdf_analysis_stream(
+        application_link: str = Form(...),
+        resume_pdf_file: UploadFile = File(...),
+        force_refresh: bool = Form(False)
+) -> StreamingResponse:
+    resume_text = await resume_text_from_pdf(resume_pdf_file)
+    return StreamingResponse(
+        stream_resume_analysis(resume_text, application_link, force_refresh=force_refresh),
+        media_type="text/event-stream",
+        headers=sse_headers
+    )
+
+
+@router.post("/resume/batch")
+async def resume_batch_analysis(batch_request: ResumeBatchAnalysisRequest) -> StreamingResponse:
+    check_batch_size(len(batch_request.resumes))
+    return StreamingResponse(
+        stream_resume_batch_analysis(
+            batch_request.resumes,
+            batch_request.application_link,
+            force_refresh=batch_request.force_refresh
+        ),
+        media_type="text/event-stream",
+        headers=sse_headers
     )
 
+
+@router.post("/resume/batch/pdf")
+async def resume_pdf_batch_analysis(
+        application_link: str = Form(...),
+        resume_pdf_files: List[UploadFile] = File(...),
+        force_refresh: bool = Form(False)
+) -> StreamingResponse:
+    check_batch_size(len(resume_pdf_files))
+    resumes, failed_candidates = await resume_batch_items_from_pdfs(resume_pdf_files)
+    return StreamingResponse(
+        stream_resume_batch_analysis(resumes, application_link, force_refresh=force_refresh,
+                                     failed_candidates=failed_candidates),
+        media_type="text/event-stream",
+        headers=sse_headers
+    )
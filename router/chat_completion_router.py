@@ -7,4 +7,4 @@ router = APIRouter()
 
 @router.get("/chat")
 async def chat_completion(prompt: str) -> str:
-    return await get_chat_completion_response(prompt);
+    return await get_chat_completion_response(prompt, call_site="chat");
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+
+from model.resume_analysis.resume_analysis_job import ResumeAnalysisJob, ResumeAnalysisJobCreated
+from service.jobs.resume_job_queue import get_resume_job_queue, JOB_QUEUED
+from service.jobs.resume_job_worker_pool import get_resume_job_worker_pool
+from service.resume_analysis.resume_core_analysis_service import resume_text_from_pdf
+
+router = APIRouter(prefix="/jobs")
+
+
+def _enqueue_resume_job(resume_text: str, application_link: str, force_refresh: bool) -> ResumeAnalysisJobCreated:
+    job_id = get_resume_job_queue().enqueue({
+        "resume_text": resume_text,
+        "application_link": application_link,
+        "force_refresh": force_refresh
+    })
+    get_resume_job_worker_pool().notify_enqueued()
+    return ResumeAnalysisJobCreated(job_id=job_id, status=JOB_QUEUED)
+
+
+@router.post("/resume", status_code=202)
+async def create_resume_job(
+        resume_text: str,
+        application_link: str,
+        force_refresh: bool = False
+) -> ResumeAnalysisJobCreated:
+    return _enqueue_resume_job(resume_text, application_link, force_refresh)
+
+
+@router.post("/resume/pdf", status_code=202)
+async def create_resume_pdf_job(
+        application_link: str = Form(...),
+        resume_pdf_file: UploadFile = File(...),
+        force_refresh: bool = Form(False)
+) -> ResumeAnalysisJobCreated:
+    resume_text = await resume_text_from_pdf(resume_pdf_file)
+    return _enqueue_resume_job(resume_text, application_link, force_refresh)
+
+
+@router.get("/{job_id}")
+async def get_resume_job(job_id: str) -> ResumeAnalysisJob:
+    job = get_resume_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.delete("/{job_id}")
+async def cancel_resume_job(job_id: str) -> ResumeAnalysisJob:
+    queue = get_resume_job_queue()
+    if queue.get_status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if queue.cancel(job_id):
+        get_resume_job_worker_pool().cancel_running(job_id)
+    return queue.get(job_id)
@@ -1,68 +1,204 @@
 import json
 import os
-from typing import Annotated, TypeVar, Type, Literal
+import time
+from typing import Annotated, TypeVar, Type, Literal, Optional
 from fastapi import Depends, Query
-from openai import AsyncOpenAI
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from pydantic import BaseModel, TypeAdapter
 
+from service.chat_completion.llm_call_policy import call_with_policy
+from service.chat_completion.llm_model_router import ModelRoute, get_llm_model_router
+from service.chat_completion.llm_rate_governor import get_llm_rate_governor, estimate_prompt_tokens
+from service.chat_completion.llm_response_cache import LlmResponseCache, get_llm_response_cache
+from service.chat_completion.prompt_registry import PromptTemplate
+from utils.metrics import metrics_registry
+from utils.tracing import record_request_count
+
 T = TypeVar("T", bound=BaseModel)
 api_key = os.getenv("chat_gpt_api_key_1")
+openai_base_url = os.getenv("openai_base_url")  # None uses the OpenAI API; set to point at a compatible server.
+json_response_format = {"type": "json_object"}
+estimated_completion_tokens = 2000
+prompt_cache_key_enabled = os.getenv("llm_prompt_cache_key_enabled", "true").lower() == "true"
+logged_response_chars = 300
+
+llm_requests_total = metrics_registry.counter(
+    "llm_requests_total", "LLM calls by call site and outcome (completed, cache_hit, error).", ["call_site", "outcome"]
+)
+llm_tokens_total = metrics_registry.counter(
+    "llm_tokens_total", "Tokens reported in response.usage by call site and model.", ["call_site", "model", "kind"]
+)
+llm_cost_usd_total = metrics_registry.counter(
+    "llm_cost_usd_total", "Estimated LLM spend in USD by call site and model.", ["call_site", "model"]
+)
+llm_request_duration_seconds = metrics_registry.histogram(
+    "llm_request_duration_seconds", "LLM completion latency by call site and model, including rate-limit queueing.",
+    ["call_site", "model"]
+)
+
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def init_openai_client() -> AsyncOpenAI:
+    global _openai_client
+    if _openai_client is None:
+        max_connections = int(os.getenv("llm_max_connections", "64"))
+        _openai_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=openai_base_url,
+            max_retries=0,  # Retries, timeouts and hedging are handled per call site by llm_call_policy.
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+        )
+    return _openai_client
+
+
+async def close_openai_client():
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
 
 
 def get_openai_client() -> AsyncOpenAI:
-    return AsyncOpenAI(api_key=api_key)
+    return init_openai_client()
 
 
-async def get_chat_completion_response(
+def _record_usage_metrics(route: ModelRoute, usage, seconds: float):
+    call_site, model = route.call_site, route.tier.model
+    prompt_tokens = (usage.prompt_tokens or 0) if usage else 0
+    completion_tokens = (usage.completion_tokens or 0) if usage else 0
+    prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = min(getattr(prompt_tokens_details, "cached_tokens", None) or 0, prompt_tokens)
+    cost_usd = route.tier.cost_usd(prompt_tokens, cached_tokens, completion_tokens)
+    llm_tokens_total.inc(prompt_tokens, call_site=call_site, model=model, kind="prompt")
+    llm_tokens_total.inc(cached_tokens, call_site=call_site, model=model, kind="cached_prompt")
+    llm_tokens_total.inc(completion_tokens, call_site=call_site, model=model, kind="completion")
+    llm_cost_usd_total.inc(cost_usd, call_site=call_site, model=model)
+    get_llm_model_router().record(route, seconds, prompt_tokens, completion_tokens, cost_usd)
+    record_request_count("llm_tokens", prompt_tokens + completion_tokens)
+    record_request_count("llm_cached_tokens", cached_tokens)
+
+
+async def _create_chat_completion(
         prompt: str,
-        system_prompt: str = "You are a helpful assistant."
+        system_prompt: str,
+        route: ModelRoute,
+        response_format: Optional[dict] = None,
+        timeout: Optional[float] = None
 ) -> str:
     openai_client = get_openai_client()
-    print(f"### LLM request ### : {prompt[:100]} \n ^^^ LLM request ^^^ ")
+    governor = get_llm_rate_governor()
+    call_site = route.call_site
+    print(f"### LLM request [{call_site} -> {route.tier.model}] ### : {prompt[:100]} \n ^^^ LLM request ^^^ ")
 
-    try:
+    request_options = {"response_format": response_format} if response_format else {}
+    if route.tier.reasoning_effort:
+        request_options["reasoning_effort"] = route.tier.reasoning_effort
+    if prompt_cache_key_enabled:
+        # Routes calls that share this system prompt to the same provider-side prompt cache.
+        # Same key the registry reports for registered templates; ad-hoc system prompts get one the same way.
+        request_options["extra_body"] = {"prompt_cache_key": PromptTemplate(call_site, system_prompt).prompt_cache_key}
+    started_at = time.perf_counter()
+    async with governor.slot(estimate_prompt_tokens(system_prompt, prompt) + estimated_completion_tokens) as ticket:
         response = await openai_client.chat.completions.create(
-            model="gpt-5",
+            model=route.tier.model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            timeout=timeout,
+            **request_options
+        )
+        governor.record_usage(ticket, response.usage.total_tokens if response.usage else None)
+
+    seconds = time.perf_counter() - started_at
+    llm_request_duration_seconds.observe(seconds, call_site=call_site, model=route.tier.model)
+    llm_requests_total.inc(call_site=call_site, outcome="completed")
+    record_request_count("llm_calls")
+    _record_usage_metrics(route, response.usage, seconds)
+
+    content = response.choices[0].message.content
+    print(f"LLM response [{call_site}] ({len(content or '')} chars): {(content or '')[:logged_response_chars]}")
+    return content
+
+
+async def get_chat_completion_response(
+        prompt: str,
+        system_prompt: str = "You are a helpful assistant.",
+        use_cache: bool = True,
+        call_site: str = "default"
+) -> str:
+    route = get_llm_model_router().route(call_site)
+    cache = get_llm_response_cache()
+    cache_key = LlmResponseCache.make_key(route.tier.cache_identity, system_prompt, prompt, None)
+    if use_cache:
+        cached_content = await cache.get(cache_key)
+        if cached_content is not None:
+            print(f"### LLM cache hit [{call_site}] ### : {prompt[:100]}")
+            llm_requests_total.inc(call_site=call_site, outcome="cache_hit")
+            return cached_content
+
+    try:
+        content = await call_with_policy(
+            call_site,
+            lambda timeout: _create_chat_completion(prompt, system_prompt, route, timeout=timeout)
         )
+    except Exception:
+        llm_requests_total.inc(call_site=call_site, outcome="error")
+        raise
+    if use_cache and content:
+        await cache.set(cache_key, content)
+    return content
 
-        print(f"LLM response: {response}")
 
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return "error occured."
+def _parse_json_response(json_string: str, response_model: Type[T]) -> T:
+    data = json.loads(json_string)
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    model_fields = response_model.model_fields.keys()
+    filtered_data = {key: value for key, value in data.items() if key in model_fields}
+    if model_fields and not filtered_data:
+        raise ValueError(f"none of the {response_model.__name__} fields are present")
+    return response_model(**filtered_data)
 
 
 async def get_chat_completion_json(
         prompt: str,
         response_model: Type[T],
-        system_prompt: str = "You are a helpful assistant that responds in JSON format."
+        system_prompt: str = "You are a helpful assistant that responds in JSON format.",
+        use_cache: bool = True,
+        call_site: str = "default"
 ) -> T:
-    openai_client = get_openai_client()
-    print(f"### LLM request ### : {prompt[:100]} \n ^^^ LLM request ^^^ ")
+    route = get_llm_model_router().route(call_site)
+    cache = get_llm_response_cache()
+    cache_key = LlmResponseCache.make_key(route.tier.cache_identity, system_prompt, prompt, json_response_format)
+    cached_json_string = await cache.get(cache_key) if use_cache else None
+    if cached_json_string is not None:
+        print(f"### LLM cache hit [{call_site}] ### : {prompt[:100]}")
+        llm_requests_total.inc(call_site=call_site, outcome="cache_hit")
+        return _parse_json_response(cached_json_string, response_model)
+
+    def parse(json_string: str):
+        return json_string, _parse_json_response(json_string, response_model)
 
     try:
-        response = await openai_client.chat.completions.create(
-            model="gpt-5",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
+        # Malformed or off-schema answers are retried as part of the call policy.
+        json_string, parsed_object = await call_with_policy(
+            call_site,
+            lambda timeout: _create_chat_completion(
+                prompt, system_prompt, route, response_format=json_response_format, timeout=timeout
+            ),
+            validate=parse
         )
-        json_string = response.choices[0].message.content
-
-        print(f"LLM response: {json_string}")
-
-        data = json.loads(json_string)
-        model_fields = response_model.model_fields.keys()
-        filtered_data = {key: value for key, value in data.items() if key in model_fields}
-        parsed_object = response_model(**filtered_data)
-        return parsed_object
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return response_model()
+    except Exception:
+        llm_requests_total.inc(call_site=call_site, outcome="error")
+        raise
+
+    # Only responses that parsed successfully are cached, so a broken answer is never replayed.
+    if use_cache:
+        await cache.set(cache_key, json_string)
+    return parsed_object
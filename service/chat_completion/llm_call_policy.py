@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, replace, fields
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import openai
+
+from utils.metrics import metrics_registry
+from utils.request_context import remaining_time
+
+R = TypeVar("R")
+
+llm_retries_total = metrics_registry.counter(
+    "llm_retries_total", "LLM call retries by call site and reason (error, schema).", ["call_site", "reason"]
+)
+llm_hedged_requests_total = metrics_registry.counter(
+    "llm_hedged_requests_total", "Duplicate LLM requests sent because the first exceeded the hedge delay.",
+    ["call_site", "winner"]
+)
+
+
+class LlmCallError(Exception):
+    def __init__(self, call_site: str, message: str, status_code: int = 502):
+        super().__init__(f"LLM call '{call_site}' failed: {message}")
+        self.call_site = call_site
+        self.status_code = status_code
+
+
+class LlmDeadlineExceeded(LlmCallError):
+    def __init__(self, call_site: str):
+        super().__init__(call_site, "the request deadline was exceeded", status_code=504)
+
+
+@dataclass(frozen=True)
+class LlmCallPolicy:
+    timeout_seconds: float = 120.0
+    max_attempts: int = 3
+    backoff_base_seconds: float = 1.0
+    backoff_max_seconds: float = 20.0
+    schema_retries: int = 1
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+
+
+default_call_policy = LlmCallPolicy(
+    timeout_seconds=float(os.getenv("llm_call_timeout_seconds", "120")),
+    max_attempts=int(os.getenv("llm_call_max_attempts", "3")),
+    schema_retries=int(os.getenv("llm_schema_retries", "1")),
+    hedge=os.getenv("llm_hedge_enabled", "false").lower() == "true",
+)
+# Short, cheap calls on the critical path are hedged by default; large completions only get a longer timeout.
+call_site_policies: Dict[str, LlmCallPolicy] = {
+    "github_username": replace(default_call_policy, timeout_seconds=30, hedge=True),
+    "job_requirements": replace(default_call_policy, timeout_seconds=60, hedge=True),
+    "repo_chunk_analysis": replace(default_call_policy, timeout_seconds=180),
+}
+
+
+def _load_policy_overrides():
+    # e.g. llm_call_policies='{"composite_analysis": {"timeout_seconds": 90, "hedge": true}}'
+    raw_overrides = os.getenv("llm_call_policies")
+    if not raw_overrides:
+        return
+    known_fields = {policy_field.name for policy_field in fields(LlmCallPolicy)}
+    for call_site, overrides in json.loads(raw_overrides).items():
+        unknown = set(overrides) - known_fields
+        if unknown:
+            raise ValueError(f"Unknown LLM call policy fields for '{call_site}': {', '.join(sorted(unknown))}")
+        call_site_policies[call_site] = replace(call_site_policies.get(call_site, default_call_policy), **overrides)
+
+
+_load_policy_overrides()
+
+
+def get_call_policy(call_site: str) -> LlmCallPolicy:
+    return call_site_policies.get(call_site, default_call_policy)
+
+
+class LatencyTracker:
+    """Recent successful call latencies per call site, used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, call_site: str, seconds: float):
+        self._samples.setdefault(call_site, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, call_site: str, quantile: float, min_samples: int) -> Optional[float]:
+        samples = self._samples.get(call_site)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+
+latency_tracker = LatencyTracker()
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def _backoff_delay(policy: LlmCallPolicy, failed_attempts: int, error: Exception) -> float:
+    # Full jitter keeps retries of many concurrent calls from arriving in lockstep.
+    delay = random.uniform(0, min(policy.backoff_max_seconds, policy.backoff_base_seconds * 2 ** (failed_attempts - 1)))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def _attempt_timeout(call_site: str, policy: LlmCallPolicy) -> float:
+    remaining = remaining_time()
+    if remaining is None:
+        return policy.timeout_seconds
+    if remaining <= 0:
+        raise LlmDeadlineExceeded(call_site)
+    return min(policy.timeout_seconds, remaining)
+
+
+async def _run_attempt(call_site: str, attempt: Callable[[float], Awaitable[str]], timeout: float) -> str:
+    started_at = time.perf_counter()
+    result = await asyncio.wait_for(attempt(timeout), timeout)
+    latency_tracker.record(call_site, time.perf_counter() - started_at)
+    return result
+
+
+async def _run_hedged_attempt(
+        call_site: str,
+        policy: LlmCallPolicy,
+        attempt: Callable[[float], Awaitable[str]],
+        timeout: float
+) -> str:
+    hedge_delay = latency_tracker.quantile(call_site, policy.hedge_quantile, policy.hedge_min_samples)
+    if not policy.hedge or hedge_delay is None or hedge_delay >= timeout:
+        return await _run_attempt(call_site, attempt, timeout)
+
+    primary = asyncio.create_task(_run_attempt(call_site, attempt, timeout))
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        print(f"LLM call '{call_site}' exceeded its p{policy.hedge_quantile * 100:.0f} of {hedge_delay:.1f}s. Hedging.")
+        hedge = asyncio.create_task(_run_attempt(call_site, attempt, max(timeout - hedge_delay, 0.001)))
+        tasks.add(hedge)
+        last_error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    llm_hedged_requests_total.inc(call_site=call_site, winner="hedge" if task is hedge else "primary")
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in (primary, *tasks):
+            task.cancel()
+
+
+async def call_with_policy(
+        call_site: str,
+        attempt: Callable[[float], Awaitable[str]],
+        validate: Optional[Callable[[str], R]] = None
+) -> R:
+    """
+    Runs `attempt(timeout)` under the call site's policy: per-attempt timeouts bounded by the request deadline,
+    jittered exponential backoff on retryable errors, retries on responses `validate` rejects, and optional hedging.
+    Raises LlmCallError once the policy is exhausted.
+    """
+    policy = get_call_policy(call_site)
+    failed_attempts = 0
+    schema_failures = 0
+    while True:
+        timeout = _attempt_timeout(call_site, policy)
+        try:
+            content = await _run_hedged_attempt(call_site, policy, attempt, timeout)
+        except Exception as e:
+            failed_attempts += 1
+            if not is_retryable(e) or failed_attempts >= policy.max_attempts:
+                raise LlmCallError(call_site, f"{type(e).__name__}: {e}") from e
+            delay = _backoff_delay(policy, failed_attempts, e)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                raise LlmDeadlineExceeded(call_site) from e
+            print(f"LLM call '{call_site}' failed ({type(e).__name__}). Retrying in {delay:.1f}s.")
+            llm_retries_total.inc(call_site=call_site, reason="error")
+            await asyncio.sleep(delay)
+            continue
+
+        if validate is None:
+            return content
+        try:
+            return validate(content)
+        except Exception as e:
+            schema_failures += 1
+            if schema_failures > policy.schema_retries:
+                raise LlmCallError(call_site, f"invalid response: {e}") from e
+            print(f"LLM call '{call_site}' returned an invalid response ({e}). Retrying.")
+            llm_retries_total.inc(call_site=call_site, reason="schema")
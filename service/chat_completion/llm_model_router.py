@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, replace, fields
+from typing import Dict, Optional, Set
+
+from utils.metrics import metrics_registry
+from utils.request_context import remaining_time
+
+TIER_FAST = "fast"
+TIER_STANDARD = "standard"
+TIER_REASONING = "reasoning"
+# Slowest to fastest; a latency fallback moves one step to the right.
+tier_order = [TIER_REASONING, TIER_STANDARD, TIER_FAST]
+
+latency_fallback_enabled = os.getenv("llm_latency_fallback_enabled", "true").lower() == "true"
+fallback_remaining_seconds = float(os.getenv("llm_fallback_remaining_seconds", "90"))
+
+llm_model_fallbacks_total = metrics_registry.counter(
+    "llm_model_fallbacks_total", "LLM calls routed to a faster tier because the request deadline was near.",
+    ["call_site", "from_tier", "to_tier"]
+)
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    reasoning_effort: Optional[str] = None
+    input_cost_per_million_tokens: float = 0.0
+    cached_input_cost_per_million_tokens: float = 0.0
+    output_cost_per_million_tokens: float = 0.0
+
+    @property
+    def cache_identity(self) -> str:
+        # Answers from different reasoning efforts of one model are not interchangeable in the response cache.
+        return f"{self.model}:{self.reasoning_effort}" if self.reasoning_effort else self.model
+
+    def cost_usd(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+        return ((prompt_tokens - cached_tokens) * self.input_cost_per_million_tokens
+                + cached_tokens * self.cached_input_cost_per_million_tokens
+                + completion_tokens * self.output_cost_per_million_tokens) / 1_000_000
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    call_site: str
+    tier: ModelTier
+    downgraded_from: Optional[str] = None
+
+
+model_tiers: Dict[str, ModelTier] = {
+    TIER_FAST: ModelTier(
+        TIER_FAST, os.getenv("llm_fast_model", "gpt-5-nano"), reasoning_effort="minimal",
+        input_cost_per_million_tokens=0.05, cached_input_cost_per_million_tokens=0.005,
+        output_cost_per_million_tokens=0.4
+    ),
+    TIER_STANDARD: ModelTier(
+        TIER_STANDARD, os.getenv("llm_standard_model", "gpt-5-mini"), reasoning_effort="low",
+        input_cost_per_million_tokens=0.25, cached_input_cost_per_million_tokens=0.025,
+        output_cost_per_million_tokens=2.0
+    ),
+    TIER_REASONING: ModelTier(
+        TIER_REASONING, os.getenv("llm_reasoning_model", "gpt-5"),
+        input_cost_per_million_tokens=float(os.getenv("llm_input_cost_per_million_tokens", "1.25")),
+        cached_input_cost_per_million_tokens=float(os.getenv("llm_cached_input_cost_per_million_tokens", "0.125")),
+        output_cost_per_million_tokens=float(os.getenv("llm_output_cost_per_million_tokens", "10.0"))
+    ),
+}
+# Mechanical steps (finding a username, copying posting sections) do not need the reasoning model.
+call_site_tiers: Dict[str, str] = {
+    "github_username": TIER_FAST,
+    "job_requirements": TIER_FAST,
+    "repo_merge": TIER_STANDARD,
+    "chat": TIER_STANDARD,
+    "basic_analysis": TIER_REASONING,
+    "repo_chunk_analysis": TIER_REASONING,
+    "composite_analysis": TIER_REASONING,
+}
+default_tier = os.getenv("llm_default_tier", TIER_REASONING)
+# Call sites whose output quality must not degrade under deadline pressure.
+no_fallback_call_sites = set()
+# Collects the call sites downgraded within a unit of work (e.g. one repository analysis) whose result is persisted,
+# so a lower-quality result is not stored as if it came from the configured tier.
+current_downgraded_call_sites: ContextVar[Optional[Set[str]]] = ContextVar("current_downgraded_call_sites", default=None)
+
+
+def _load_routing_overrides():
+    # e.g. llm_model_tiers='{"fast": {"model": "gpt-4.1-nano", "reasoning_effort": null}}'
+    raw_tiers = os.getenv("llm_model_tiers")
+    if raw_tiers:
+        known_fields = {tier_field.name for tier_field in fields(ModelTier)} - {"name"}
+        for tier_name, overrides in json.loads(raw_tiers).items():
+            unknown = set(overrides) - known_fields
+            if unknown:
+                raise ValueError(f"Unknown model tier fields for '{tier_name}': {', '.join(sorted(unknown))}")
+            if tier_name not in model_tiers:
+                raise ValueError(f"Unknown model tier '{tier_name}'. Expected one of: {', '.join(tier_order)}")
+            model_tiers[tier_name] = replace(model_tiers[tier_name], **overrides)
+
+    # e.g. llm_model_routes='{"composite_analysis": "standard", "basic_analysis": {"tier": "reasoning", "fallback": false}}'
+    raw_routes = os.getenv("llm_model_routes")
+    if raw_routes:
+        for call_site, route in json.loads(raw_routes).items():
+            if isinstance(route, str):
+                route = {"tier": route}
+            tier_name = route.get("tier")
+            if tier_name is not None:
+                if tier_name not in model_tiers:
+                    raise ValueError(f"Unknown model tier '{tier_name}' for call site '{call_site}'")
+                call_site_tiers[call_site] = tier_name
+            if route.get("fallback") is False:
+                no_fallback_call_sites.add(call_site)
+            else:
+                no_fallback_call_sites.discard(call_site)
+
+
+_load_routing_overrides()
+
+
+class LlmModelRouter:
+    """
+    Picks the model tier for each LLM call site, falling back to a faster tier when the request is running out of time.
+    Keeps per-route latency, token and cost totals for the admin API.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._route_stats: Dict[tuple, Dict[str, float]] = {}
+
+    def route(self, call_site: str) -> ModelRoute:
+        tier_name = call_site_tiers.get(call_site, default_tier)
+        remaining = remaining_time()
+        if (latency_fallback_enabled and call_site not in no_fallback_call_sites
+                and remaining is not None and remaining < fallback_remaining_seconds):
+            position = tier_order.index(tier_name)
+            if position + 1 < len(tier_order):
+                faster_tier = tier_order[position + 1]
+                print(f"Only {max(remaining, 0):.0f}s left for this request. "
+                      f"Routing '{call_site}' to the {faster_tier} tier instead of {tier_name}.")
+                llm_model_fallbacks_total.inc(call_site=call_site, from_tier=tier_name, to_tier=faster_tier)
+                downgraded_call_sites = current_downgraded_call_sites.get()
+                if downgraded_call_sites is not None:
+                    downgraded_call_sites.add(call_site)
+                return ModelRoute(call_site, model_tiers[faster_tier], downgraded_from=tier_name)
+        return ModelRoute(call_site, model_tiers[tier_name])
+
+    def record(self, route: ModelRoute, seconds: float, prompt_tokens: int, completion_tokens: int, cost_usd: float):
+        key = (route.call_site, route.tier.name, route.tier.model)
+        with self._lock:
+            stats = self._route_stats.setdefault(key, {
+                "requests": 0, "downgraded": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cost_usd": 0.0,
+            })
+            stats["requests"] += 1
+            stats["downgraded"] += 1 if route.downgraded_from else 0
+            stats["seconds"] += seconds
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost_usd"] += cost_usd
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = [
+                {
+                    "call_site": call_site,
+                    "tier": tier_name,
+                    "model": model,
+                    **stats,
+                    "mean_seconds": round(stats["seconds"] / stats["requests"], 3),
+                    "cost_usd": round(stats["cost_usd"], 6),
+                }
+                for (call_site, tier_name, model), stats in sorted(self._route_stats.items())
+            ]
+        return {
+            "tiers": {name: tier.__dict__ for name, tier in model_tiers.items()},
+            "call_sites": {call_site: call_site_tiers.get(call_site) for call_site in sorted(call_site_tiers)},
+            "default_tier": default_tier,
+            "latency_fallback_enabled": latency_fallback_enabled,
+            "fallback_remaining_seconds": fallback_remaining_seconds,
+            "no_fallback_call_sites": sorted(no_fallback_call_sites),
+            "routes": routes,
+        }
+
+
+_llm_model_router: Optional[LlmModelRouter] = None
+
+
+def get_llm_model_router() -> LlmModelRouter:
+    global _llm_model_router
+    if _llm_model_router is None:
+        _llm_model_router = LlmModelRouter()
+    return _llm_model_router
@@ -0,0 +1,112 @@
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, List, Optional
+
+from utils.fair_scheduler import FairScheduler, Ticket
+from utils.request_context import get_request_id
+
+RATE_WINDOW_SECONDS = 60.0
+
+
+class LlmRateGovernor:
+    """
+    Caps in-flight LLM calls and requests/tokens per minute for the whole process.
+    Waiting calls are admitted round-robin per HTTP request so one large analysis cannot starve the rest.
+    A limit of 0 disables that limit.
+    """
+
+    def __init__(self, max_in_flight: int, requests_per_minute: int, tokens_per_minute: int):
+        self.max_in_flight = max_in_flight
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_window: Deque[float] = deque()
+        self._token_window: Deque[List] = deque()  # [admitted_at, tokens]
+        self._tokens_in_window = 0
+        self._scheduler = FairScheduler(
+            capacity=max_in_flight,
+            admission_delay=self._admission_delay,
+            on_admit=self._record_admission
+        )
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        async with self._scheduler.slot(get_request_id(), estimated_tokens) as ticket:
+            yield ticket
+
+    def record_usage(self, ticket: Ticket, total_tokens: Optional[int]):
+        if total_tokens is None or ticket.meta is None:
+            return
+        now = time.monotonic()
+        self._prune(now)
+        if now - ticket.meta[0] < RATE_WINDOW_SECONDS:
+            self._tokens_in_window += total_tokens - ticket.meta[1]
+        ticket.meta[1] = total_tokens
+        self._scheduler.dispatch()
+
+    def snapshot(self) -> dict:
+        self._prune(time.monotonic())
+        return {
+            "max_in_flight": self.max_in_flight,
+            "requests_per_minute_limit": self.requests_per_minute,
+            "tokens_per_minute_limit": self.tokens_per_minute,
+            "in_flight": self._scheduler.in_flight,
+            "queue_depth": self._scheduler.queue_depth,
+            "queue_depth_by_request": self._scheduler.queue_depth_by_owner(),
+            "requests_last_minute": len(self._request_window),
+            "tokens_last_minute": self._tokens_in_window,
+        }
+
+    def _prune(self, now: float):
+        while self._request_window and now - self._request_window[0] >= RATE_WINDOW_SECONDS:
+            self._request_window.popleft()
+        while self._token_window and now - self._token_window[0][0] >= RATE_WINDOW_SECONDS:
+            self._tokens_in_window -= self._token_window.popleft()[1]
+
+    def _admission_delay(self, ticket: Ticket) -> float:
+        now = time.monotonic()
+        self._prune(now)
+        delay = 0.0
+
+        if self.requests_per_minute and len(self._request_window) >= self.requests_per_minute:
+            delay = max(delay, self._request_window[0] + RATE_WINDOW_SECONDS - now)
+
+        if self.tokens_per_minute and self._token_window and \
+                self._tokens_in_window + ticket.cost > self.tokens_per_minute:
+            tokens_to_free = self._tokens_in_window + ticket.cost - self.tokens_per_minute
+            freed = 0
+            for admitted_at, tokens in self._token_window:
+                freed += tokens
+                if freed >= tokens_to_free:
+                    delay = max(delay, admitted_at + RATE_WINDOW_SECONDS - now)
+                    break
+            else:
+                delay = max(delay, self._token_window[-1][0] + RATE_WINDOW_SECONDS - now)
+
+        return delay
+
+    def _record_admission(self, ticket: Ticket):
+        now = time.monotonic()
+        self._request_window.append(now)
+        ticket.meta = [now, ticket.cost]
+        self._token_window.append(ticket.meta)
+        self._tokens_in_window += ticket.cost
+
+
+_llm_rate_governor: Optional[LlmRateGovernor] = None
+
+
+def get_llm_rate_governor() -> LlmRateGovernor:
+    global _llm_rate_governor
+    if _llm_rate_governor is None:
+        _llm_rate_governor = LlmRateGovernor(
+            max_in_flight=int(os.getenv("llm_max_in_flight", "16")),
+            requests_per_minute=int(os.getenv("llm_requests_per_minute", "500")),
+            tokens_per_minute=int(os.getenv("llm_tokens_per_minute", "500000"))
+        )
+    return _llm_rate_governor
+
+
+def estimate_prompt_tokens(*texts: str) -> int:
+    return sum(len(text) for text in texts if text) // 4
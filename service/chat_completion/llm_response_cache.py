@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from utils.sqlite_key_value_store import SqliteKeyValueStore, get_cache_db_path
+
+
+class LlmResponseCache:
+    """
+    Content-addressed cache of raw LLM responses: a bounded in-memory LRU in front of an optional SQLite tier.
+    Keys are a hash of everything that determines the completion (model, prompts, response format).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, disk_store: Optional[SqliteKeyValueStore] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_store = disk_store
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, response_format: Optional[dict]) -> str:
+        key_material = json.dumps([model, system_prompt, prompt, response_format], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+
+        if self.disk_store is not None:
+            value = await self.disk_store.aget(key)
+            if value is not None:
+                self._remember(key, value)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        self._remember(key, value)
+        self.writes += 1
+        if self.disk_store is not None:
+            await self.disk_store.aset(key, value, self.ttl_seconds)
+
+    async def clear(self):
+        self._memory.clear()
+        if self.disk_store is not None:
+            await self.disk_store.aclear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "max_memory_entries": self.max_entries,
+            "disk_enabled": self.disk_store is not None,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = (value, time.time() + self.ttl_seconds)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+_llm_response_cache: Optional[LlmResponseCache] = None
+
+
+def get_llm_response_cache() -> LlmResponseCache:
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        disk_store = None
+        if os.getenv("llm_cache_disk_enabled", "true").lower() == "true":
+            disk_store = SqliteKeyValueStore(get_cache_db_path("llm_response_cache.sqlite3"), "llm_responses")
+        _llm_response_cache = LlmResponseCache(
+            max_entries=int(os.getenv("llm_cache_max_entries", "1024")),
+            ttl_seconds=float(os.getenv("llm_cache_ttl_seconds", str(7 * 24 * 3600))),
+            disk_store=disk_store
+        )
+    return _llm_response_cache
@@ -0,0 +1,50 @@
+import hashlib
+import inspect
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from utils.token_counter import count_tokens
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A call site's byte-stable system prompt. Request data never goes into `system_prompt`; it goes into the user
+    message built by `user_prompt`, so every call of a template shares the provider-side cached prompt prefix.
+    """
+    name: str
+    system_prompt: str
+
+    @property
+    def prefix_hash(self) -> str:
+        return hashlib.sha256(self.system_prompt.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def prompt_cache_key(self) -> str:
+        return f"{self.name}:{self.prefix_hash}"
+
+    def user_prompt(self, *sections: Tuple[str, str]) -> str:
+        """Labelled sections in the order given: put values shared across calls first and the most variable last."""
+        return "\n\n".join(f"--- {label} ---\n{content}" for label, content in sections)
+
+
+_prompt_templates: Dict[str, PromptTemplate] = {}
+
+
+def register_prompt_template(name: str, system_prompt: str) -> PromptTemplate:
+    if name in _prompt_templates:
+        raise ValueError(f"Prompt template '{name}' is already registered.")
+    template = PromptTemplate(name=name, system_prompt=inspect.cleandoc(system_prompt))
+    _prompt_templates[name] = template
+    return template
+
+
+def get_prompt_template(name: str) -> PromptTemplate:
+    return _prompt_templates[name]
+
+
+def list_prompt_templates() -> List[dict]:
+    return [
+        {"name": template.name, "prefix_hash": template.prefix_hash, "system_tokens": count_tokens(template.system_prompt)}
+        for template in _prompt_templates.values()
+    ]
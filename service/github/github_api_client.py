@@ -0,0 +1,251 @@
+import asyncio
+import base64
+import importlib.util
+import json
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from utils.fair_scheduler import FairScheduler
+from utils.metrics import metrics_registry
+from utils.request_context import get_request_id
+from utils.sqlite_key_value_store import SqliteKeyValueStore, get_cache_db_path
+from utils.tracing import record_request_count
+
+github_api_base_url = os.getenv("github_api_base_url", "https://api.github.com").rstrip("/")
+cached_response_headers = ['content-type', 'link']
+max_cached_body_bytes = 5 * 1024 * 1024
+
+github_requests_total = metrics_registry.counter(
+    "github_requests_total", "GitHub HTTP requests by kind (api, raw) and status code.", ["kind", "status"]
+)
+
+
+class GithubApiClient:
+    """
+    Shared GitHub HTTP client.
+    - Sends If-None-Match / If-Modified-Since from a persistent store so repeat calls become 304s that do not count against quota.
+    - Spreads requests out as X-RateLimit-Remaining drops and waits out resets / Retry-After instead of failing.
+    - Reuses one connection pool (HTTP/2 when `h2` is installed) across all requests.
+    - Caps requests in flight for the process and per request id (one per resume analysis), admitting waiting calls
+      round-robin so one candidate's monorepo cannot take every connection.
+    """
+
+    def __init__(
+            self,
+            token: Optional[str],
+            etag_store: Optional[SqliteKeyValueStore],
+            etag_ttl_seconds: float,
+            slow_down_ratio: float,
+            max_rate_limit_wait_seconds: float,
+            max_concurrent_requests: int = 32,
+            max_concurrent_requests_per_request: Optional[int] = 8,
+            max_attempts: int = 3
+    ):
+        if not token:
+            print("WARNING: github_token environment variable is not set. API requests will be severely rate-limited.")
+
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self._client = httpx.AsyncClient(headers=headers, timeout=50.0, http2=self.http2)
+        self.etag_store = etag_store
+        self.etag_ttl_seconds = etag_ttl_seconds
+        self.slow_down_ratio = slow_down_ratio
+        self.max_rate_limit_wait_seconds = max_rate_limit_wait_seconds
+        self.max_attempts = max_attempts
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_concurrent_requests_per_request = max_concurrent_requests_per_request
+        self._scheduler = FairScheduler(
+            capacity=max_concurrent_requests,
+            per_owner_capacity=max_concurrent_requests_per_request
+        )
+
+        self.rate_limits: Dict[str, dict] = {}
+        self._next_request_at = 0.0
+        self.requests_sent = 0
+        self.not_modified = 0
+        self.quota_consumed = 0
+        self.rate_limited_responses = 0
+        self.throttle_wait_seconds = 0.0
+
+    async def get(self, url: str, params: Optional[dict] = None, **kwargs) -> httpx.Response:
+        is_api_request = url.startswith(github_api_base_url)
+        cache_key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+        cached = await self._load_cached(cache_key) if is_api_request else None
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = None
+        for attempt in range(self.max_attempts):
+            # Quota pacing and rate-limit retry waits happen outside the slot; it only covers the HTTP exchange.
+            await self._wait_for_quota()
+            async with self._scheduler.slot(get_request_id()):
+                response = await self._client.get(url, params=params, headers=headers, **kwargs)
+            self._record_response(response, is_api_request)
+
+            wait_seconds = self._rate_limit_wait(response)
+            if wait_seconds is None:
+                break
+            self.rate_limited_responses += 1
+            if wait_seconds > self.max_rate_limit_wait_seconds or attempt == self.max_attempts - 1:
+                print(f"ERROR: GitHub rate limit hit for {url}; reset is {wait_seconds:.0f}s away. Giving up.")
+                break
+            print(f"GitHub rate limit hit for {url}. Waiting {wait_seconds:.1f}s before retrying.")
+            await self._sleep(wait_seconds)
+
+        if response.status_code == 304 and cached:
+            self.not_modified += 1
+            return httpx.Response(
+                status_code=cached["status_code"],
+                headers=cached["headers"],
+                content=base64.b64decode(cached["body"]),
+                request=response.request
+            )
+
+        if is_api_request and response.status_code == 200:
+            await self._store_cached(cache_key, response)
+        return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        await self._wait_for_quota()
+        async with AsyncExitStack() as stack:
+            # The body is read at the consumer's pace, so the slot is only held until the response headers arrive.
+            async with self._scheduler.slot(get_request_id()):
+                response = await stack.enter_async_context(self._client.stream(method, url, **kwargs))
+            self._record_response(response, url.startswith(github_api_base_url))
+            yield response
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def snapshot(self) -> dict:
+        return {
+            "http2": self.http2,
+            "requests_sent": self.requests_sent,
+            "not_modified_responses": self.not_modified,
+            "quota_consumed": self.quota_consumed,
+            "rate_limited_responses": self.rate_limited_responses,
+            "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "max_concurrent_requests_per_request": self.max_concurrent_requests_per_request,
+            "in_flight": self._scheduler.in_flight,
+            "in_flight_by_request": self._scheduler.in_flight_by_owner(),
+            "queue_depth": self._scheduler.queue_depth,
+            "queue_depth_by_request": self._scheduler.queue_depth_by_owner(),
+            "rate_limits": self.rate_limits,
+        }
+
+    def _record_response(self, response: httpx.Response, is_api_request: bool):
+        self.requests_sent += 1
+        github_requests_total.inc(kind="api" if is_api_request else "raw", status=response.status_code)
+        record_request_count("github_api_calls" if is_api_request else "github_raw_calls")
+        if is_api_request and response.status_code != 304:
+            self.quota_consumed += 1
+
+        remaining = response.headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        resource = response.headers.get("x-ratelimit-resource", "core")
+        self.rate_limits[resource] = {
+            "limit": int(response.headers.get("x-ratelimit-limit", "0")),
+            "remaining": int(remaining),
+            "used": int(response.headers.get("x-ratelimit-used", "0")),
+            "reset_at": float(response.headers.get("x-ratelimit-reset", "0")),
+        }
+
+    def _rate_limit_wait(self, response: httpx.Response) -> Optional[float]:
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            return float(retry_after)
+        if response.headers.get("x-ratelimit-remaining") == "0":
+            return max(float(response.headers.get("x-ratelimit-reset", "0")) - time.time(), 1.0)
+        if response.status_code == 429:
+            return 60.0
+        return None
+
+    async def _wait_for_quota(self):
+        core = self.rate_limits.get("core")
+        now = time.monotonic()
+        until_reset = core["reset_at"] - time.time() if core and core["limit"] else 0.0
+        if until_reset <= 0 or core["remaining"] >= core["limit"] * self.slow_down_ratio:
+            # The window has reset or a response reported enough quota again: no pacing carries over.
+            self._next_request_at = 0.0
+            return
+
+        reset_at = now + until_reset
+        if core["remaining"] <= 0:
+            wait_seconds = until_reset
+        else:
+            # Spread what is left of the budget evenly over the time until reset, never scheduling past the reset.
+            start_at = min(max(now, self._next_request_at), reset_at)
+            self._next_request_at = min(start_at + until_reset / core["remaining"], reset_at)
+            wait_seconds = start_at - now
+        if wait_seconds > 0:
+            await self._sleep(min(wait_seconds, self.max_rate_limit_wait_seconds))
+
+    async def _sleep(self, seconds: float):
+        self.throttle_wait_seconds += seconds
+        await asyncio.sleep(seconds)
+
+    async def _load_cached(self, cache_key: str) -> Optional[dict]:
+        if self.etag_store is None:
+            return None
+        value = await self.etag_store.aget(cache_key)
+        return json.loads(value) if value else None
+
+    async def _store_cached(self, cache_key: str, response: httpx.Response):
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if self.etag_store is None or not (etag or last_modified) or len(response.content) > max_cached_body_bytes:
+            return
+        await self.etag_store.aset(cache_key, json.dumps({
+            "etag": etag,
+            "last_modified": last_modified,
+            "status_code": response.status_code,
+            "headers": {key: response.headers[key] for key in cached_response_headers if key in response.headers},
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }), self.etag_ttl_seconds)
+
+
+_github_api_client: Optional[GithubApiClient] = None
+
+
+def get_github_api_client() -> GithubApiClient:
+    global _github_api_client
+    if _github_api_client is None:
+        etag_store = None
+        if os.getenv("github_etag_cache_enabled", "true").lower() == "true":
+            etag_store = SqliteKeyValueStore(get_cache_db_path("github_http_cache.sqlite3"), "github_responses")
+        _github_api_client = GithubApiClient(
+            token=os.getenv('github_token_1'),
+            etag_store=etag_store,
+            etag_ttl_seconds=float(os.getenv("github_etag_ttl_seconds", str(30 * 24 * 3600))),
+            slow_down_ratio=float(os.getenv("github_slow_down_ratio", "0.2")),
+            max_rate_limit_wait_seconds=float(os.getenv("github_max_rate_limit_wait_seconds", "900")),
+            max_concurrent_requests=int(os.getenv("github_max_concurrent_requests", "32")),
+            max_concurrent_requests_per_request=int(os.getenv("github_max_concurrent_requests_per_request", "8")) or None
+        )
+    return _github_api_client
+
+
+async def close_github_api_client():
+    global _github_api_client
+    if _github_api_client is not None:
+        await _github_api_client.aclose()
+        _github_api_client = None
@@ -0,0 +1,174 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from model.resume_analysis.resume_analysis_job import ResumeAnalysisJob
+from utils.sqlite_key_value_store import get_cache_db_path
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+class ResumeJobQueue:
+    """
+    Durable FIFO of resume analysis jobs in SQLite.
+    Running jobs hold a lease refreshed by heartbeats; a job whose lease expired (e.g. the process died) is queued again
+    until it runs out of attempts.
+    Several processes may share the same database file.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA busy_timeout=5000")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS resume_jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+                "progress TEXT NOT NULL DEFAULT '{}', result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, heartbeat_at REAL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS resume_jobs_status_created ON resume_jobs (status, created_at)"
+            )
+
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO resume_jobs (job_id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, json.dumps(payload, ensure_ascii=False), now, now)
+            )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT job_id, payload FROM resume_jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JOB_QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._connection.execute("COMMIT")
+                    return None
+                self._connection.execute(
+                    "UPDATE resume_jobs SET status = ?, attempts = attempts + 1, updated_at = ?, heartbeat_at = ? "
+                    "WHERE job_id = ?",
+                    (JOB_RUNNING, now, now, row[0])
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return {"job_id": row[0], **json.loads(row[1])}
+
+    def heartbeat(self, job_id: str):
+        self._execute(
+            "UPDATE resume_jobs SET heartbeat_at = ? WHERE job_id = ? AND status = ?", (time.time(), job_id, JOB_RUNNING)
+        )
+
+    def update_progress(self, job_id: str, progress: Dict[str, Any]):
+        now = time.time()
+        self._execute(
+            "UPDATE resume_jobs SET progress = ?, updated_at = ?, heartbeat_at = ? WHERE job_id = ? AND status = ?",
+            (json.dumps(progress, ensure_ascii=False), now, now, job_id, JOB_RUNNING)
+        )
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        self._finish(job_id, JOB_SUCCEEDED, result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, JOB_FAILED, error=error)
+
+    def cancel(self, job_id: str) -> bool:
+        cursor = self._execute(
+            "UPDATE resume_jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+            (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED, JOB_RUNNING)
+        )
+        return cursor.rowcount > 0
+
+    def get_status(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT status FROM resume_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, job_id: str) -> Optional[ResumeAnalysisJob]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT job_id, status, payload, progress, result, error, attempts, created_at, updated_at "
+                "FROM resume_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ResumeAnalysisJob(
+            job_id=row[0],
+            status=row[1],
+            application_link=json.loads(row[2]).get("application_link", ""),
+            progress=json.loads(row[3]),
+            result=json.loads(row[4]) if row[4] else None,
+            error=row[5],
+            attempts=row[6],
+            created_at=row[7],
+            updated_at=row[8]
+        )
+
+    def requeue_expired(self, lease_seconds: float, max_attempts: int) -> Tuple[int, int]:
+        """
+        Queues jobs whose lease expired again and returns (requeued, failed). A job that already used `max_attempts`
+        attempts is marked failed instead, so a job that keeps killing or hanging its worker is not retried forever.
+        """
+        now = time.time()
+        expired_before = now - lease_seconds
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                failed = self._connection.execute(
+                    "UPDATE resume_jobs SET status = ?, error = ?, updated_at = ? "
+                    "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                    (JOB_FAILED, f"The job stopped its worker {max_attempts} time(s) without finishing.", now,
+                     JOB_RUNNING, expired_before, max_attempts)
+                ).rowcount
+                requeued = self._connection.execute(
+                    "UPDATE resume_jobs SET status = ?, updated_at = ? WHERE status = ? AND heartbeat_at < ?",
+                    (JOB_QUEUED, now, JOB_RUNNING, expired_before)
+                ).rowcount
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return requeued, failed
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM resume_jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        # A job cancelled while running stays cancelled even if its analysis happened to finish.
+        self._execute(
+            "UPDATE resume_jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+            (status, result, error, time.time(), job_id, JOB_RUNNING)
+        )
+
+    def _execute(self, sql: str, parameters: tuple) -> sqlite3.Cursor:
+        with self._lock:
+            return self._connection.execute(sql, parameters)
+
+
+_resume_job_queue: Optional[ResumeJobQueue] = None
+
+
+def get_resume_job_queue() -> ResumeJobQueue:
+    global _resume_job_queue
+    if _resume_job_queue is None:
+        _resume_job_queue = ResumeJobQueue(get_cache_db_path("resume_jobs.sqlite3"))
+    return _resume_job_queue
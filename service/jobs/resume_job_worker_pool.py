@@ -0,0 +1,151 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from service.jobs.resume_job_queue import ResumeJobQueue, get_resume_job_queue, JOB_CANCELLED
+from service.resume_analysis.resume_core_analysis_service import analyze_resume
+from utils.request_context import current_request_id, current_deadline, deadline_after
+from utils.tracing import RequestTimings, current_request_timings
+
+poll_interval_seconds = float(os.getenv("resume_job_poll_interval_seconds", "2"))
+heartbeat_interval_seconds = float(os.getenv("resume_job_heartbeat_seconds", "10"))
+lease_seconds = float(os.getenv("resume_job_lease_seconds", "60"))
+max_job_attempts = int(os.getenv("resume_job_max_attempts", "3"))
+job_deadline_seconds = float(os.getenv("resume_job_deadline_seconds", "1800"))
+
+
+class ResumeJobWorkerPool:
+    """
+    Pulls resume analysis jobs from the durable queue and runs them with bounded concurrency.
+    Concurrency is set per process, independently of how many web workers serve HTTP.
+    """
+
+    def __init__(self, queue: ResumeJobQueue, concurrency: int):
+        self.queue = queue
+        self.concurrency = concurrency
+        self._worker_tasks: List[asyncio.Task] = []
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._running_jobs: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+        self._wakeup = asyncio.Event()
+
+    async def start(self):
+        if self._worker_tasks or self.concurrency <= 0:
+            return
+        await self._requeue_expired()
+        self._worker_tasks = [asyncio.create_task(self._run_worker()) for _ in range(self.concurrency)]
+        self._maintenance_task = asyncio.create_task(self._run_maintenance())
+
+    async def stop(self):
+        tasks = self._worker_tasks + ([self._maintenance_task] if self._maintenance_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._maintenance_task = None
+
+    def notify_enqueued(self):
+        self._wakeup.set()
+
+    def cancel_running(self, job_id: str) -> bool:
+        task = self._running_jobs.get(job_id)
+        if task is None:
+            return False
+        self._cancel_requested.add(job_id)
+        task.cancel()
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "running_job_ids": list(self._running_jobs.keys()),
+            "jobs_by_status": self.queue.count_by_status(),
+        }
+
+    async def _run_worker(self):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_task = asyncio.create_task(self._run_job(job))
+            self._running_jobs[job["job_id"]] = job_task
+            try:
+                await job_task
+            except asyncio.CancelledError:
+                # Only a cancelled job is swallowed; cancelling the worker itself (shutdown) must propagate.
+                if job["job_id"] not in self._cancel_requested:
+                    raise
+                print(f"Resume job {job['job_id']} was cancelled.")
+            finally:
+                self._running_jobs.pop(job["job_id"], None)
+                self._cancel_requested.discard(job["job_id"])
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        current_request_id.set(job_id)
+        current_deadline.set(deadline_after(job_deadline_seconds))
+        timings = RequestTimings()
+        current_request_timings.set(timings)
+        progress: Dict[str, Any] = {"github_repos_completed": 0}
+
+        async def on_progress(event: str, data: Any):
+            if event == "github_repo_analysis":
+                progress["github_repos_completed"] += 1
+            else:
+                progress[event] = "completed"
+            await asyncio.to_thread(self.queue.update_progress, job_id, dict(progress))
+
+        print(f"Starting resume job {job_id}")
+        try:
+            result = await analyze_resume(
+                job["resume_text"],
+                job["application_link"],
+                force_refresh=job.get("force_refresh", False),
+                on_progress=on_progress
+            )
+            await asyncio.to_thread(self.queue.complete, job_id, jsonable_encoder(result))
+            print(f"Finished resume job {job_id}: {timings.summary()}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"ERROR: Resume job {job_id} failed: {e}")
+            await asyncio.to_thread(self.queue.fail, job_id, str(e))
+
+    async def _run_maintenance(self):
+        while True:
+            await asyncio.sleep(heartbeat_interval_seconds)
+            for job_id in list(self._running_jobs):
+                # Cancellation may have been requested through another process sharing the queue.
+                if await asyncio.to_thread(self.queue.get_status, job_id) == JOB_CANCELLED:
+                    self.cancel_running(job_id)
+                else:
+                    await asyncio.to_thread(self.queue.heartbeat, job_id)
+            await self._requeue_expired()
+
+    async def _requeue_expired(self):
+        requeued, failed = await asyncio.to_thread(self.queue.requeue_expired, lease_seconds, max_job_attempts)
+        if requeued:
+            print(f"Requeued {requeued} resume job(s) whose worker stopped before finishing.")
+        if failed:
+            print(f"ERROR: Failed {failed} resume job(s) that stopped their worker {max_job_attempts} times.")
+
+
+_resume_job_worker_pool: Optional[ResumeJobWorkerPool] = None
+
+
+def get_resume_job_worker_pool() -> ResumeJobWorkerPool:
+    global _resume_job_worker_pool
+    if _resume_job_worker_pool is None:
+        _resume_job_worker_pool = ResumeJobWorkerPool(
+            queue=get_resume_job_queue(),
+            concurrency=int(os.getenv("resume_job_workers", "2"))
+        )
+    return _resume_job_worker_pool
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+tracking_query_params = {"gclid", "fbclid", "msclkid", "ref", "referrer", "source", "src", "trk", "trackingid"}
+default_ports = {"http": 80, "https": 443}
+
+
+def normalize_job_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != default_ports.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in tracking_query_params
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+@dataclass
+class JobRequirementsEntry:
+    url: str
+    normalized_url: str
+    job_requirements: str
+    fetched_at: float
+    expires_at: float
+    hits: int = 0
+
+
+class JobRequirementsStore:
+    """
+    Job requirements keyed by normalized posting URL.
+    Concurrent lookups for the same URL share one in-flight scrape + extraction instead of each starting their own.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, JobRequirementsEntry]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_fetch(
+            self,
+            url: str,
+            fetch: Callable[[str], Awaitable[str]],
+            force_refresh: bool = False
+    ) -> str:
+        normalized_url = normalize_job_url(url)
+
+        if not force_refresh:
+            entry = self._get_fresh_entry(normalized_url)
+            if entry is not None:
+                entry.hits += 1
+                print(f"Job requirements cache hit for {normalized_url}")
+                return entry.job_requirements
+
+        task = self._in_flight.get(normalized_url)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(url, normalized_url, fetch))
+            self._in_flight[normalized_url] = task
+        else:
+            print(f"Joining in-flight job requirements fetch for {normalized_url}")
+
+        # Shield so one cancelled caller does not cancel the fetch other callers are waiting on.
+        return await asyncio.shield(task)
+
+    def peek(self, url: str) -> Optional[str]:
+        entry = self._get_fresh_entry(normalize_job_url(url))
+        return entry.job_requirements if entry else None
+
+    def get_entry(self, url: str) -> Optional[JobRequirementsEntry]:
+        return self._get_fresh_entry(normalize_job_url(url))
+
+    def invalidate(self, url: str) -> bool:
+        return self._entries.pop(normalize_job_url(url), None) is not None
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def list_entries(self) -> List[dict]:
+        now = time.time()
+        return [
+            {**{key: value for key, value in asdict(entry).items() if key != "job_requirements"},
+             "job_requirements_length": len(entry.job_requirements),
+             "expired": entry.expires_at <= now}
+            for entry in self._entries.values()
+        ]
+
+    def in_flight_urls(self) -> List[str]:
+        return list(self._in_flight.keys())
+
+    def _get_fresh_entry(self, normalized_url: str) -> Optional[JobRequirementsEntry]:
+        entry = self._entries.get(normalized_url)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            del self._entries[normalized_url]
+            return None
+        self._entries.move_to_end(normalized_url)
+        return entry
+
+    async def _fetch_and_store(self, url: str, normalized_url: str, fetch: Callable[[str], Awaitable[str]]) -> str:
+        try:
+            job_requirements = await fetch(url)
+            if job_requirements:
+                now = time.time()
+                self._entries[normalized_url] = JobRequirementsEntry(
+                    url=url,
+                    normalized_url=normalized_url,
+                    job_requirements=job_requirements,
+                    fetched_at=now,
+                    expires_at=now + self.ttl_seconds
+                )
+                self._entries.move_to_end(normalized_url)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return job_requirements
+        finally:
+            self._in_flight.pop(normalized_url, None)
+
+
+_job_requirements_store: Optional[JobRequirementsStore] = None
+
+
+def get_job_requirements_store() -> JobRequirementsStore:
+    global _job_requirements_store
+    if _job_requirements_store is None:
+        _job_requirements_store = JobRequirementsStore(
+            ttl_seconds=float(os.getenv("job_requirements_ttl_seconds", str(6 * 3600))),
+            max_entries=int(os.getenv("job_requirements_max_entries", "512"))
+        )
+    return _job_requirements_store
@@ -1,15 +1,12 @@
+from typing import Optional
+
 from model.resume_analysis.resume_basic_analysis import CandidateBasicAnalysis
 from service.chat_completion.chat_completion_service import get_chat_completion_json
+from service.chat_completion.prompt_registry import register_prompt_template
 from service.resume_analysis.basic_analysis.resume_basic_company_analysis_service import extract_job_requirements
+from utils.progress_events import ProgressCallback, emit_progress
 
-
-async def basic_resume_analysis(resume_text: str, application_link: str) -> CandidateBasicAnalysis:
-
-    job_requirements = ""
-    if application_link:
-        job_requirements = await extract_job_requirements(application_link)
-
-    system_prompt = """
+basic_analysis_prompt = register_prompt_template("basic_analysis", """
     You are an expert HR manager. Your primary task is to analyze a candidate's resume in the context of a specific job description.
     You must evaluate how well the candidate's skills and experience align with the job requirements.
     The final output must be a single, valid JSON object that includes both the parsed resume data AND an analysis of the candidate's suitability for the job.
@@ -76,18 +73,31 @@ async def basic_resume_analysis(resume_text: str, application_link: str) -> Cand
         ]
       }
     }
-    """
+    """)
+
+
+async def basic_resume_analysis(
+        resume_text: str,
+        application_link: str,
+        on_progress: Optional[ProgressCallback] = None
+) -> CandidateBasicAnalysis:
 
-    user_prompt = f"""
-    --- JOB REQUIREMENTS ---
-    {job_requirements}
+    job_requirements = ""
+    if application_link:
+        job_requirements = await extract_job_requirements(application_link)
+        await emit_progress(on_progress, "job_requirements", {
+            "application_link": application_link,
+            "job_requirements": job_requirements
+        })
 
-    --- RESUME ---
-    {resume_text}
-    """
+    # Job requirements come before the resume so candidates for the same posting also share that part of the prefix.
+    user_prompt = basic_analysis_prompt.user_prompt(("JOB REQUIREMENTS", job_requirements), ("RESUME", resume_text))
 
-    return await get_chat_completion_json(
+    basic_analysis_result = await get_chat_completion_json(
         prompt=user_prompt,
-        system_prompt=system_prompt,
-        response_model=CandidateBasicAnalysis
-    )
\ No newline at end of file
+        system_prompt=basic_analysis_prompt.system_prompt,
+        response_model=CandidateBasicAnalysis,
+        call_site=basic_analysis_prompt.name
+    )
+    await emit_progress(on_progress, "basic_analysis", basic_analysis_result)
+    return basic_analysis_result
\ No newline at end of file
@@ -0,0 +1,157 @@
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from model.resume_analysis.resume_basic_analysis import CandidateBasicAnalysis
+from model.resume_analysis.resume_git_crawling_analysis import GithubAnalysisReport
+from utils.token_counter import count_tokens, truncate_to_tokens
+
+composite_context_max_tokens = int(os.getenv("composite_context_max_tokens", "12000"))
+trimmed_list_items = 3
+trimmed_text_tokens = 120
+stub_text_tokens = 40
+# Cut first: suggestions are the least useful evidence for the hiring verdict.
+low_value_list_fields = ['improvement_suggestions', 'core_functionality', 'strengths', 'weaknesses']
+text_fields = ['project_purpose', 'architecture_design', 'code_quality_assessment']
+stop_words = {
+    'and', 'the', 'with', 'for', 'our', 'you', 'your', 'are', 'will', 'from', 'that', 'this', 'have', 'has',
+    'years', 'year', 'experience', 'team', 'work', 'using', 'use', 'such', 'other', 'about', 'into', 'their',
+}
+
+
+@dataclass
+class CompositeContext:
+    basic_analysis_json: str
+    github_reports_json: str
+    tokens: int
+    dropped: List[str] = field(default_factory=list)
+
+
+def compact_json(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _without_empty_values(data):
+    if isinstance(data, dict):
+        cleaned = {key: _without_empty_values(value) for key, value in data.items()}
+        return {key: value for key, value in cleaned.items() if value not in (None, "", [], {})}
+    if isinstance(data, list):
+        return [_without_empty_values(item) for item in data if item not in (None, "", [], {})]
+    return data
+
+
+def _terms(text: str) -> Set[str]:
+    return {term for term in re.findall(r'[a-z][a-z0-9+#.\-]{1,}', text.lower()) if term not in stop_words}
+
+
+def _relevance_terms(basic_analysis: CandidateBasicAnalysis, job_requirements: str) -> Dict[str, Set[str]]:
+    resume_data = basic_analysis.resume_data
+    skills = {skill.lower() for skill in (resume_data.skills if resume_data else [])}
+    project_terms = set()
+    for project in (resume_data.projects if resume_data else []):
+        project_terms |= _terms(project.name or "") | {tech.lower() for tech in project.tech_stack}
+    return {"job": _terms(job_requirements or ""), "skills": skills, "projects": project_terms}
+
+
+def score_report(report: GithubAnalysisReport, relevance_terms: Dict[str, Set[str]]) -> float:
+    stack = {tech.lower() for tech in report.technology_stack}
+    name_terms = _terms(f"{report.repo_name or ''} {report.project_name or ''}".replace('-', ' ').replace('_', ' '))
+    text_terms = _terms(" ".join([report.project_purpose or ""] + report.core_functionality))
+
+    score = 3.0 * len(stack & relevance_terms["job"]) + 1.0 * len(text_terms & relevance_terms["job"])
+    # Repositories backing a project the resume claims are the strongest evidence either way.
+    score += 5.0 * len(name_terms & relevance_terms["projects"]) + 1.0 * len(stack & relevance_terms["skills"])
+    return score
+
+
+def _render(basic_analysis: dict, reports: List[dict]) -> tuple:
+    basic_analysis_json = compact_json(basic_analysis)
+    github_reports_json = compact_json(reports)
+    return basic_analysis_json, github_reports_json, count_tokens(basic_analysis_json) + count_tokens(github_reports_json)
+
+
+def build_composite_context(
+        basic_analysis: CandidateBasicAnalysis,
+        github_reports: List[GithubAnalysisReport],
+        job_requirements: str = "",
+        max_tokens: int = composite_context_max_tokens
+) -> CompositeContext:
+    relevance_terms = _relevance_terms(basic_analysis, job_requirements)
+    ranked_reports = sorted(github_reports, key=lambda report: score_report(report, relevance_terms), reverse=True)
+
+    basic_analysis_data = _without_empty_values(basic_analysis.model_dump())
+    reports = [_without_empty_values(report.model_dump()) for report in ranked_reports]
+    dropped: List[str] = []
+
+    # Tokens are tracked per report, so a trim step re-counts only the report it changed. The list's brackets and
+    # separators add about one token per report; the exact count is taken once the trimming is done.
+    basic_analysis_tokens = count_tokens(compact_json(basic_analysis_data))
+    report_tokens = [count_tokens(compact_json(report)) for report in reports]
+    tokens = basic_analysis_tokens + sum(report_tokens) + len(reports) + 1
+
+    def recount(index: int):
+        nonlocal tokens
+        new_tokens = count_tokens(compact_json(reports[index]))
+        tokens += new_tokens - report_tokens[index]
+        report_tokens[index] = new_tokens
+
+    def remove_last():
+        nonlocal tokens
+        tokens -= report_tokens.pop() + 1
+        return reports.pop()
+
+    # Each pass degrades the least relevant reports first and stops as soon as the context fits.
+    for list_field in low_value_list_fields:
+        for index in range(len(reports) - 1, -1, -1):
+            if tokens <= max_tokens:
+                break
+            report = reports[index]
+            if len(report.get(list_field, [])) > trimmed_list_items:
+                dropped.append(f"{report.get('repo_name')}.{list_field}[{trimmed_list_items}:]")
+                report[list_field] = report[list_field][:trimmed_list_items]
+                recount(index)
+
+    for index in range(len(reports) - 1, -1, -1):
+        if tokens <= max_tokens:
+            break
+        report = reports[index]
+        for text_field in text_fields:
+            text = report.get(text_field, "")
+            if count_tokens(text) > trimmed_text_tokens:
+                report[text_field] = truncate_to_tokens(text, trimmed_text_tokens) + "..."
+                dropped.append(f"{report.get('repo_name')}.{text_field} (truncated)")
+        recount(index)
+
+    for index in range(len(reports) - 1, -1, -1):
+        if tokens <= max_tokens:
+            break
+        report = reports[index]
+        reports[index] = _without_empty_values({
+            "repo_name": report.get("repo_name"),
+            "repo_date": report.get("repo_date"),
+            "project_purpose": truncate_to_tokens(report.get("project_purpose", ""), stub_text_tokens),
+            "technology_stack": report.get("technology_stack", []),
+        })
+        dropped.append(f"{report.get('repo_name')} (summarized)")
+        recount(index)
+
+    while reports and tokens > max_tokens:
+        dropped.append(f"{remove_last().get('repo_name')} (dropped)")
+
+    basic_analysis_json, github_reports_json, tokens = _render(basic_analysis_data, reports)
+    while reports and tokens > max_tokens:
+        # The per-report estimate came out a few tokens short of the exact count.
+        dropped.append(f"{remove_last().get('repo_name')} (dropped)")
+        basic_analysis_json, github_reports_json, tokens = _render(basic_analysis_data, reports)
+
+    if tokens > max_tokens:
+        # Only the basic analysis is left; cut it rather than overflow the budget.
+        basic_analysis_json = truncate_to_tokens(basic_analysis_json, max_tokens - count_tokens(github_reports_json))
+        dropped.append("basic_analysis (truncated)")
+        tokens = count_tokens(basic_analysis_json) + count_tokens(github_reports_json)
+
+    if dropped:
+        print(f"Composite context trimmed to {tokens}/{max_tokens} tokens. Dropped: {', '.join(dropped)}")
+    return CompositeContext(basic_analysis_json, github_reports_json, tokens, dropped)
@@ -0,0 +1,58 @@
+import asyncio
+import re
+from typing import List, Optional
+
+from service.github.github_api_client import GithubApiClient, github_api_base_url
+
+# GitHub logins: up to 39 alphanumerics or single hyphens, not starting or ending with a hyphen.
+github_login = r'[A-Za-z0-9](?:[A-Za-z0-9]|-(?=[A-Za-z0-9])){0,38}'
+github_url_pattern = re.compile(rf'(?:https?://)?(?:www\.)?github\.com/({github_login})(?![A-Za-z0-9-])', re.IGNORECASE)
+# "GitHub: octocat" / "github - @octocat", but not the "github" of "github.com/...".
+github_label_pattern = re.compile(rf'\bgithub\s*[:\-–]\s*@?({github_login})(?![A-Za-z0-9\-/]|\.[A-Za-z])', re.IGNORECASE)
+# Top-level github.com paths that are never user profiles.
+reserved_github_paths = {
+    'about', 'apps', 'collections', 'contact', 'customer-stories', 'enterprise', 'events', 'explore', 'features',
+    'issues', 'join', 'login', 'marketplace', 'new', 'notifications', 'orgs', 'pricing', 'pulls', 'readme',
+    'search', 'security', 'settings', 'site', 'sponsors', 'team', 'topics', 'trending', 'users',
+}
+max_verified_candidates = 5
+
+
+def extract_github_username_candidates(text: str) -> List[str]:
+    candidates = []
+    seen = set()
+    matches = [match.group(1) for match in github_url_pattern.finditer(text)]
+    matches += [match.group(1) for match in github_label_pattern.finditer(text)]
+    for candidate in matches:
+        key = candidate.lower()
+        if key in reserved_github_paths or key in seen:
+            continue
+        seen.add(key)
+        candidates.append(candidate)
+    return candidates
+
+
+async def verify_github_username(client: GithubApiClient, username: str) -> Optional[dict]:
+    try:
+        response = await client.get(f"{github_api_base_url}/users/{username}")
+    except Exception as e:
+        # Do not lose a plausible username because of a transient API error; the repo listing will tell.
+        print(f"WARNING: Could not verify GitHub user '{username}': {e}")
+        return {"login": username, "type": "User"}
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        print(f"WARNING: Could not verify GitHub user '{username}': HTTP {response.status_code}")
+        return {"login": username, "type": "User"}
+    return response.json()
+
+
+async def resolve_github_username(client: GithubApiClient, candidates: List[str]) -> Optional[str]:
+    candidates = candidates[:max_verified_candidates]
+    users = await asyncio.gather(*[verify_github_username(client, candidate) for candidate in candidates])
+    existing_users = [user for user in users if user]
+    # An organization link (e.g. a former employer) is only used when no personal account is mentioned.
+    for user in existing_users:
+        if user.get("type", "User") == "User":
+            return user["login"]
+    return existing_users[0]["login"] if existing_users else None
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from model.resume_analysis.resume_git_crawling_analysis import GithubAnalysisReport
+from service.chat_completion.llm_model_router import call_site_tiers, default_tier, model_tiers
+from service.chat_completion.prompt_registry import get_prompt_template
+from utils.sqlite_key_value_store import SqliteKeyValueStore, get_cache_db_path
+
+# Bump when file selection, chunking or merging changes what a report contains without touching a prompt or model.
+repo_analysis_pipeline_version = "2"
+repo_analysis_call_sites = ("repo_chunk_analysis", "repo_merge")
+_analysis_version: Optional[str] = None
+
+
+def repo_analysis_version() -> str:
+    global _analysis_version
+    if _analysis_version is None:
+        parts = [repo_analysis_pipeline_version]
+        for call_site in repo_analysis_call_sites:
+            tier = model_tiers[call_site_tiers.get(call_site, default_tier)]
+            parts.append(f"{get_prompt_template(call_site).prompt_cache_key}:{tier.cache_identity}")
+        _analysis_version = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:8]
+    return _analysis_version
+
+
+def repo_fingerprint(repo_data: dict) -> str:
+    # `pushed_at` comes with the repo listing for free and changes whenever any branch receives commits.
+    # The analysis version retires reports written by an older pipeline, prompt or model.
+    return (f"{repo_data.get('default_branch') or 'HEAD'}@{repo_data.get('pushed_at') or repo_data.get('updated_at')}"
+            f"#{repo_analysis_version()}")
+
+
+class RepoAnalysisCache:
+    """Final GithubAnalysisReport per `owner/repo`, valid only while the repository fingerprint is unchanged."""
+
+    def __init__(self, store: SqliteKeyValueStore, ttl_seconds: float):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, full_name: str, fingerprint: str) -> Optional[GithubAnalysisReport]:
+        value = await self.store.aget(full_name.lower())
+        if value:
+            entry = json.loads(value)
+            if entry["fingerprint"] == fingerprint:
+                self.hits += 1
+                return GithubAnalysisReport(**entry["report"])
+        self.misses += 1
+        return None
+
+    async def set(self, full_name: str, fingerprint: str, report: GithubAnalysisReport):
+        await self.store.aset(
+            full_name.lower(),
+            json.dumps({"fingerprint": fingerprint, "report": report.model_dump()}, ensure_ascii=False),
+            self.ttl_seconds
+        )
+
+    async def invalidate(self, full_name: str):
+        await self.store.adelete(full_name.lower())
+
+    async def clear(self):
+        await self.store.aclear()
+
+    def stats(self) -> dict:
+        return {"entries": self.store.count(), "hits": self.hits, "misses": self.misses}
+
+
+_repo_analysis_cache: Optional[RepoAnalysisCache] = None
+
+
+def get_repo_analysis_cache() -> RepoAnalysisCache:
+    global _repo_analysis_cache
+    if _repo_analysis_cache is None:
+        _repo_analysis_cache = RepoAnalysisCache(
+            store=SqliteKeyValueStore(get_cache_db_path("repo_analysis_cache.sqlite3"), "repo_analysis"),
+            ttl_seconds=float(os.getenv("repo_analysis_cache_ttl_seconds", str(30 * 24 * 3600)))
+        )
+    return _repo_analysis_cache
@@ -0,0 +1,173 @@
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from utils.token_counter import count_tokens, truncate_to_tokens, truncate_tail_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# gpt-5 accepts 272k input tokens; leave room for the system prompt and the JSON answer.
+max_chunk_tokens = int(os.getenv("repo_chunk_max_tokens", "200000"))
+max_chunks_per_repo = int(os.getenv("repo_max_chunks", "8"))
+truncated_head_ratio = 0.7
+# Streaming packing: partially filled chunks kept open, and the fill level at which a chunk is sent right away.
+max_open_chunks = int(os.getenv("repo_chunk_max_open", "2"))
+chunk_dispatch_fill_ratio = 0.9
+
+entry_point_names = {
+    'main.py', 'app.py', '__main__.py', 'manage.py', 'server.py', 'wsgi.py', 'asgi.py',
+    'index.js', 'index.ts', 'main.js', 'main.ts', 'app.js', 'app.ts', 'server.js', 'server.ts',
+    'main.go', 'main.c', 'main.cpp', 'program.cs', 'startup.cs', 'main.java', 'application.java', 'app.rb', 'index.php'
+}
+config_names = {'dockerfile', 'docker-compose.yml', 'requirements.txt'}
+test_path_pattern = re.compile(r'(^|/)(tests?|__tests__|spec|specs)/|(^|/)test_[^/]*$|_test\.[^/]+$|\.(test|spec)\.[^/]+$',
+                               re.IGNORECASE)
+example_path_pattern = re.compile(r'(^|/)(examples?|samples?|demos?|docs?|scripts?)/', re.IGNORECASE)
+
+
+@dataclass
+class PlannedFile:
+    path: str
+    rendered: str
+    tokens: int
+    priority: float
+
+
+def file_priority(path: str, tokens: int) -> float:
+    file_name = path.rsplit('/', 1)[-1].lower()
+    depth = path.count('/')
+
+    if file_name in entry_point_names or file_name.endswith('application.java'):
+        priority = 100.0
+    elif file_name in config_names:
+        priority = 80.0 if tokens < 2000 else 30.0
+    elif test_path_pattern.search(path):
+        priority = 10.0
+    elif example_path_pattern.search(path):
+        priority = 25.0
+    else:
+        priority = 50.0
+
+    return priority - 3.0 * depth
+
+
+def render_file(file_path: str, content: str) -> str:
+    return f"--- START OF FILE: {file_path} ---\n{content}\n--- END OF FILE: {file_path} ---\n\n"
+
+
+def _truncate_file(file_path: str, content: str, budget: int) -> str:
+    frame_tokens = count_tokens(render_file(file_path, "")) + 32
+    content_budget = max(budget - frame_tokens, 0)
+    head = truncate_to_tokens(content, int(content_budget * truncated_head_ratio))
+    tail = truncate_tail_to_tokens(content[len(head):], content_budget - count_tokens(head))
+    omitted_lines = content.count('\n') - head.count('\n') - tail.count('\n')
+    marker = f"\n... [{omitted_lines} lines truncated to fit the context window] ...\n"
+    return render_file(file_path, head + marker + tail)
+
+
+def plan_file(file_path: str, content: str, chunk_token_budget: int = max_chunk_tokens) -> PlannedFile:
+    """Renders and counts one file, truncating it to a single chunk. CPU-bound on large files; safe to run in a thread."""
+    rendered = render_file(file_path, content)
+    tokens = count_tokens(rendered)
+    if tokens > chunk_token_budget:
+        logger.warning("File '%s' has %d tokens, more than one chunk. Truncating it.", file_path, tokens)
+        rendered = _truncate_file(file_path, content, chunk_token_budget)
+        tokens = count_tokens(rendered)
+    return PlannedFile(file_path, rendered, tokens, file_priority(file_path, tokens))
+
+
+@dataclass
+class CodeChunk:
+    text: str
+    tokens: int
+    content_bytes: int
+    file_count: int
+
+
+class IncrementalChunkBuilder:
+    """
+    Packs files into chunks as they arrive instead of after the whole repository is downloaded.
+    Files go first-fit into a few open chunks; a chunk is emitted once it is nearly full, so its LLM call can start
+    while later files are still downloading. At most `max_chunks` chunks are produced; files that no longer fit are
+    dropped.
+    """
+
+    def __init__(
+            self,
+            chunk_token_budget: int = max_chunk_tokens,
+            max_chunks: int = max_chunks_per_repo,
+            max_open_chunks: int = max_open_chunks,
+            dispatch_fill_ratio: float = chunk_dispatch_fill_ratio
+    ):
+        self.chunk_token_budget = chunk_token_budget
+        self.max_chunks = max_chunks
+        self.max_open_chunks = max_open_chunks
+        self.dispatch_fill_ratio = dispatch_fill_ratio
+        self.emitted_chunks = 0
+        self.dropped_files: List[str] = []
+        self._open_chunks: List[List[Tuple[PlannedFile, int]]] = []
+        self._open_tokens: List[int] = []
+
+    @property
+    def is_full(self) -> bool:
+        # No new chunk can be opened, and either none is left open or a file already failed to fit the open ones.
+        return self.emitted_chunks + len(self._open_chunks) >= self.max_chunks and (
+                not self._open_chunks or bool(self.dropped_files))
+
+    @property
+    def open_chunk_count(self) -> int:
+        return len(self._open_chunks)
+
+    @property
+    def open_bytes(self) -> int:
+        return sum(content_bytes for chunk in self._open_chunks for _, content_bytes in chunk)
+
+    def add(self, planned_file: PlannedFile, content_bytes: int) -> List[CodeChunk]:
+        """
+        Adds one file prepared by `plan_file` (with the same chunk budget) and returns the chunks that became ready
+        to send. Tokenizing is left to the caller so it can happen off the event loop.
+        """
+        file_path, tokens = planned_file.path, planned_file.tokens
+        planned = (planned_file, content_bytes)
+
+        ready = []
+        for index, used_tokens in enumerate(self._open_tokens):
+            if used_tokens + tokens <= self.chunk_token_budget:
+                self._open_chunks[index].append(planned)
+                self._open_tokens[index] += tokens
+                if self._open_tokens[index] >= self.chunk_token_budget * self.dispatch_fill_ratio:
+                    ready.append(self._emit(index))
+                return ready
+
+        if self.emitted_chunks + len(self._open_chunks) >= self.max_chunks:
+            logger.warning("Skipping file '%s': repo exceeds %d chunks.", file_path, self.max_chunks)
+            self.dropped_files.append(file_path)
+            return ready
+        if len(self._open_chunks) >= self.max_open_chunks:
+            # Too many partially filled chunks held in memory; send the fullest one now.
+            ready.append(self._emit(self._open_tokens.index(max(self._open_tokens))))
+        self._open_chunks.append([planned])
+        self._open_tokens.append(tokens)
+        return ready
+
+    def flush(self) -> List[CodeChunk]:
+        return [self._emit(0) for _ in range(len(self._open_chunks))]
+
+    def flush_fullest(self) -> List[CodeChunk]:
+        if not self._open_chunks:
+            return []
+        return [self._emit(self._open_tokens.index(max(self._open_tokens)))]
+
+    def _emit(self, index: int) -> CodeChunk:
+        chunk = self._open_chunks.pop(index)
+        tokens = self._open_tokens.pop(index)
+        self.emitted_chunks += 1
+        ordered = sorted(chunk, key=lambda entry: (-entry[0].priority, entry[0].path))
+        return CodeChunk(
+            text="".join(planned.rendered for planned, _ in ordered),
+            tokens=tokens,
+            content_bytes=sum(content_bytes for _, content_bytes in chunk),
+            file_count=len(chunk)
+        )
@@ -0,0 +1,134 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.metrics import metrics_registry
+
+source_file_extensions = ('.py', '.js', '.ts', '.java', '.go', '.rb', '.php', '.cs', '.c', '.cpp', '.h', '.hpp')
+# Configuration files worth reading by exact name; other .txt files are mostly data dumps and fixtures.
+config_file_names = {'dockerfile', 'docker-compose.yml', 'requirements.txt'}
+vendored_path_pattern = re.compile(
+    r'(^|/)(node_modules|bower_components|vendors?|third[_-]?party|external|site-packages|\.?venv|'
+    r'dist|build|target|out|\.next|\.nuxt|coverage|Pods|Carthage|_?deps)/',
+    re.IGNORECASE
+)
+generated_path_pattern = re.compile(
+    r'(_pb2(_grpc)?\.py|\.pb\.(go|cc|h)|\.pb\.gw\.go|\.g\.(cs|dart)|\.designer\.cs|[._]generated\.\w+)$'
+    r'|(^|/)(generated|__generated__)/|(^|/)migrations/\d{4}_\w+\.py$',
+    re.IGNORECASE
+)
+minified_path_pattern = re.compile(r'[.-]min\.js$|\.bundle\.js$|\.chunk\.js$', re.IGNORECASE)
+generated_header_pattern = re.compile(
+    r'do not edit|@generated|code generated by|auto-?generated|automatically generated|generated by the protocol buffer',
+    re.IGNORECASE
+)
+header_scan_chars = 1000
+max_file_bytes = int(os.getenv("repo_max_file_bytes", str(512 * 1024)))
+minified_average_line_length = 250
+minified_min_chars = 2000
+# English text and source code sit around 4-5 bits per character; base64 and packed data approach 6.
+max_entropy_bits = 5.5
+entropy_min_chars = 4096
+
+repo_files_excluded_total = metrics_registry.counter(
+    "repo_files_excluded_total", "Repository files left out of the analysis by reason.", ["reason"]
+)
+
+
+def git_blob_sha(content: str) -> str:
+    # Same id as the git tree and contents APIs report, so listed files can be matched before they are fetched.
+    data = content.encode('utf-8')
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def path_exclusion_reason(path: str) -> Optional[str]:
+    file_name = path.rsplit('/', 1)[-1].lower()
+    if file_name not in config_file_names and not file_name.endswith(source_file_extensions):
+        return "extension"
+    if vendored_path_pattern.search(path):
+        return "vendored"
+    if generated_path_pattern.search(path):
+        return "generated"
+    if minified_path_pattern.search(path):
+        return "minified"
+    return None
+
+
+def is_analyzable_path(path: str) -> bool:
+    return path_exclusion_reason(path) is None
+
+
+def is_analyzable_directory(path: str) -> bool:
+    # Only the directory patterns can match a path ending in '/', so this never looks at file names.
+    return not (vendored_path_pattern.search(path + '/') or generated_path_pattern.search(path + '/'))
+
+
+def _entropy_bits(text: str) -> float:
+    counts = Counter(text)
+    return -sum(count / len(text) * math.log2(count / len(text)) for count in counts.values())
+
+
+def content_exclusion_reason(content: str) -> Optional[str]:
+    if len(content.encode('utf-8')) > max_file_bytes:
+        return "too_large"
+    if generated_header_pattern.search(content[:header_scan_chars]):
+        return "generated"
+    if len(content) >= minified_min_chars and len(content) / (content.count('\n') + 1) > minified_average_line_length:
+        return "minified"
+    if len(content) >= entropy_min_chars and _entropy_bits(content[:64 * 1024]) > max_entropy_bits:
+        return "high_entropy"
+    return None
+
+
+class BlobIndex:
+    """
+    Content-addressed record of the files already sent for one candidate, keyed by git blob SHA.
+    Identical files (boilerplate, forks, copied utilities) are analyzed only in the first repository that has them.
+    Which repository wins depends on the order this candidate's repositories are fetched in, so a report missing
+    duplicates is specific to this analysis and must not be cached for the repository.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owners: Dict[str, Tuple[str, str]] = {}
+        self.duplicates_by_repo = Counter()
+
+    def claim(self, blob_sha: str, repo: str, path: str) -> bool:
+        # Idempotent per location, so a file checked before fetching (tree listing) passes again after fetching.
+        with self._lock:
+            owner = self._owners.setdefault(blob_sha, (repo, path))
+            if owner == (repo, path):
+                return True
+            self.duplicates_by_repo[repo] += 1
+            repo_files_excluded_total.inc(reason="duplicate")
+            return False
+
+    def blob_filter(self, repo: str) -> Callable[[str, str], bool]:
+        return lambda path, blob_sha: self.claim(blob_sha, repo, path)
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+
+current_blob_index: ContextVar[Optional[BlobIndex]] = ContextVar("current_blob_index", default=None)
+
+
+def file_exclusion_reason(repo: str, path: str, content: str, blob_index: Optional[BlobIndex] = None) -> Optional[str]:
+    reason = path_exclusion_reason(path) or content_exclusion_reason(content)
+    if reason is not None:
+        repo_files_excluded_total.inc(reason=reason)
+        return reason
+    if blob_index is not None and not blob_index.claim(git_blob_sha(content), repo, path):
+        return "duplicate"
+    return None
+
+
+def log_excluded_files(repo: str, excluded: Counter):
+    if excluded:
+        print(f"Excluded {sum(excluded.values())} file(s) from '{repo}': "
+              f"{', '.join(f'{count} {reason}' for reason, count in sorted(excluded.items()))}")
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from model.resume_analysis.resume_git_crawling_analysis import GithubAnalysisReport
+from service.chat_completion.chat_completion_service import get_chat_completion_json
+from service.chat_completion.llm_call_policy import LlmCallError
+from service.chat_completion.prompt_registry import register_prompt_template
+from service.resume_analysis.git_crawling_analysis.repo_chunk_planner import max_chunks_per_repo
+
+list_field_match_ratios = {
+    'core_functionality': 0.85,
+    'technology_stack': 1.0,  # "React" and "Preact" are different technologies; only exact (normalized) matches merge.
+    'strengths': 0.85,
+    'weaknesses': 0.85,
+    'improvement_suggestions': 0.85,
+}
+text_fields = ['project_purpose', 'architecture_design', 'code_quality_assessment']
+text_field_match_ratio = 0.9
+max_list_items = int(os.getenv("repo_merge_max_list_items", "15"))
+# Defaults to the chunk limit, so a repository's partial reports are reconciled in one merge call, not a serial tree.
+max_merge_fan_in = int(os.getenv("repo_merge_fan_in", str(max_chunks_per_repo)))
+
+repo_merge_prompt = register_prompt_template("repo_merge", """
+    You are an expert senior software architect. You receive several partial assessments of the same repository, each written from a different part of its codebase.
+    For every field provided, write one cohesive assessment of the whole repository that integrates all partial assessments without repeating them.
+    When assessments describe related problems, explain how they connect (e.g. a root cause and its symptoms).
+    Respond with a single valid JSON object containing only the provided keys, each mapped to a single string:
+    {"project_purpose": "...", "architecture_design": "...", "code_quality_assessment": "..."}
+    """)
+
+
+def normalize_item(text: str) -> str:
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s+#.]', ' ', text.lower())).strip(' .')
+
+
+def _is_same_item(left: str, right: str, match_ratio: float) -> bool:
+    if left == right:
+        return True
+    if match_ratio >= 1.0:
+        return False
+    return SequenceMatcher(None, left, right).ratio() >= match_ratio
+
+
+def merge_list_items(item_lists: List[List[str]], match_ratio: float, limit: int = max_list_items) -> List[str]:
+    clusters = []  # [normalized, original, mention_count, first_seen]
+    position = 0
+    for items in item_lists:
+        for item in items:
+            if not item or not item.strip():
+                continue
+            normalized = normalize_item(item)
+            for cluster in clusters:
+                if _is_same_item(cluster[0], normalized, match_ratio):
+                    cluster[2] += 1
+                    # Keep the more descriptive wording of near-duplicates.
+                    if len(item) > len(cluster[1]):
+                        cluster[1] = item
+                    break
+            else:
+                clusters.append([normalized, item.strip(), 1, position])
+            position += 1
+
+    # Findings confirmed by several partial reports first, then in the order they were reported.
+    clusters.sort(key=lambda cluster: (-cluster[2], cluster[3]))
+    return [cluster[1] for cluster in clusters[:limit]]
+
+
+def distinct_texts(texts: List[str]) -> List[str]:
+    distinct = []
+    for text in texts:
+        if not text or not text.strip():
+            continue
+        normalized = normalize_item(text)
+        if not any(_is_same_item(normalize_item(existing), normalized, text_field_match_ratio) for existing in distinct):
+            distinct.append(text.strip())
+    return distinct
+
+
+def merge_reports_locally(reports: List[GithubAnalysisReport]) -> Tuple[GithubAnalysisReport, Dict[str, List[str]]]:
+    merged = GithubAnalysisReport(
+        project_name=next((report.project_name for report in reports if report.project_name), ""),
+        repo_name=next((report.repo_name for report in reports if report.repo_name), ""),
+        repo_date=next((report.repo_date for report in reports if report.repo_date), ""),
+    )
+    for field, match_ratio in list_field_match_ratios.items():
+        setattr(merged, field, merge_list_items([getattr(report, field) for report in reports], match_ratio))
+
+    conflicting_text_fields = {}
+    for field in text_fields:
+        values = distinct_texts([getattr(report, field) for report in reports])
+        if len(values) > 1:
+            conflicting_text_fields[field] = values
+        else:
+            setattr(merged, field, values[0] if values else "")
+
+    return merged, conflicting_text_fields
+
+
+async def reconcile_text_fields(
+        conflicting_text_fields: Dict[str, List[str]],
+        use_cache: bool = True
+) -> GithubAnalysisReport:
+    prompt = repo_merge_prompt.user_prompt(
+        ("PARTIAL ASSESSMENTS", json.dumps(conflicting_text_fields, ensure_ascii=False, separators=(',', ':')))
+    )
+
+    return await get_chat_completion_json(
+        prompt=prompt,
+        system_prompt=repo_merge_prompt.system_prompt,
+        response_model=GithubAnalysisReport,
+        use_cache=use_cache,
+        call_site=repo_merge_prompt.name
+    )
+
+
+async def _merge_group(reports: List[GithubAnalysisReport], use_cache: bool) -> GithubAnalysisReport:
+    merged, conflicting_text_fields = merge_reports_locally(reports)
+    if not conflicting_text_fields:
+        return merged
+
+    print(f"Reconciling {', '.join(conflicting_text_fields)} across {len(reports)} partial reports using LLM...")
+    try:
+        reconciled = await reconcile_text_fields(conflicting_text_fields, use_cache=use_cache)
+    except LlmCallError as e:
+        print(f"WARNING: {e}. Keeping the partial assessments side by side.")
+        reconciled = GithubAnalysisReport()
+    for field, values in conflicting_text_fields.items():
+        setattr(merged, field, getattr(reconciled, field) or "\n".join(values))
+    return merged
+
+
+async def merge_analysis_results(reports: List[GithubAnalysisReport], use_cache: bool = True) -> GithubAnalysisReport:
+    if not reports:
+        return GithubAnalysisReport()
+    if len(reports) == 1:
+        return reports[0]
+
+    print(f"Merging {len(reports)} partial reports...")
+
+    # Bounded fan-in tree reduce: every reconcile prompt sees at most `max_merge_fan_in` reports.
+    while len(reports) > max_merge_fan_in:
+        groups = [reports[index:index + max_merge_fan_in] for index in range(0, len(reports), max_merge_fan_in)]
+        reports = list(await asyncio.gather(*[
+            _merge_group(group, use_cache) if len(group) > 1 else asyncio.sleep(0, group[0])
+            for group in groups
+        ]))
+
+    return await _merge_group(reports, use_cache)
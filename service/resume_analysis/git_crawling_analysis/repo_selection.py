@@ -0,0 +1,164 @@
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+
+from model.resume_analysis.resume_basic_analysis import ResumeData
+from utils.metrics import metrics_registry
+
+max_repos_to_analyze = int(os.getenv("github_max_repos_to_analyze", "10"))
+# Opt-in: without a cutoff the best-ranked repositories are always analyzed, however low they score.
+min_repo_score = float(os.getenv("repo_selection_min_score")) if os.getenv("repo_selection_min_score") else None
+# Primary languages whose source files the repository analysis actually reads.
+analyzable_languages = {'python', 'javascript', 'typescript', 'java', 'go', 'ruby', 'php', 'c#', 'c', 'c++', 'dockerfile'}
+min_project_name_chars = 4
+
+repo_selection_total = metrics_registry.counter(
+    "repo_selection_total", "Repositories considered for analysis by outcome (selected, skipped reason).", ["outcome"]
+)
+
+
+@dataclass
+class ScoredRepo:
+    repo_data: dict
+    score: float = 0.0
+    reasons: List[str] = field(default_factory=list)
+    skip_reason: Optional[str] = None
+
+    @property
+    def full_name(self) -> str:
+        return self.repo_data.get('full_name') or self.repo_data.get('name', '')
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'[^a-z0-9+#]+', ' ', text.lower()).strip()
+
+
+def _terms(text: str) -> Set[str]:
+    return set(_normalize(text).split())
+
+
+def _name_phrase(repo_name: str) -> str:
+    # "resumeAnalyzer" / "resume-analyzer" / "resume_analyzer" -> "resume analyzer"
+    return _normalize(re.sub(r'(?<=[a-z0-9])(?=[A-Z])', ' ', repo_name))
+
+
+def _parse_github_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _resume_text_for_matching(resume_text: str, resume_data: Optional[ResumeData]) -> str:
+    if resume_data is None:
+        return resume_text
+    parts = [resume_text] + resume_data.skills
+    for project in resume_data.projects:
+        parts += [project.name or ""] + project.tech_stack
+    return " ".join(parts)
+
+
+def _skip_reason(repo_data: dict, mentioned_in_resume: bool) -> Optional[str]:
+    if repo_data.get('size', 1) == 0:
+        return "empty"
+    if repo_data.get('disabled'):
+        return "disabled"
+    if not repo_data.get('language'):
+        # GitHub found no code at all (docs, dotfiles, assets); a crawl would at best find .txt files.
+        return "no_code"
+    if repo_data.get('fork') and not mentioned_in_resume:
+        return "fork"
+    return None
+
+
+def score_repository(repo_data: dict, resume_text: str, resume_terms: Set[str], job_terms: Set[str],
+                     now: Optional[datetime] = None) -> ScoredRepo:
+    scored = ScoredRepo(repo_data)
+    name_phrase = _name_phrase(repo_data.get('name', ''))
+    language = (repo_data.get('language') or '').lower()
+    # A repository simply named after a language ("python") says nothing about the resume's projects.
+    mentioned_in_resume = len(name_phrase) >= min_project_name_chars and name_phrase != language and (
+        f" {name_phrase} " in f" {resume_text} ")
+    scored.skip_reason = _skip_reason(repo_data, mentioned_in_resume)
+
+    def add(points: float, reason: str):
+        scored.score += points
+        scored.reasons.append(f"{reason} ({points:+.1f})")
+
+    if mentioned_in_resume:
+        # A repository backing a project the resume claims is the strongest evidence either way.
+        add(5.0, "project named in resume")
+
+    if language and language not in analyzable_languages:
+        add(-3.0, f"{repo_data['language']} is not analyzed")
+    if language and language in job_terms:
+        add(2.0, f"{repo_data['language']} wanted by the job")
+    elif language and language in resume_terms:
+        add(1.0, f"{repo_data['language']} listed on the resume")
+
+    topics = {topic.lower() for topic in repo_data.get('topics') or []}
+    matched_topics = topics & job_terms
+    if matched_topics:
+        add(min(len(matched_topics), 3) * 1.0, f"topics {', '.join(sorted(matched_topics))} match the job")
+    matched_description = (_terms(repo_data.get('description') or '') & job_terms) - {language}
+    if matched_description:
+        add(min(len(matched_description), 4) * 0.5, "description matches the job")
+
+    stars = repo_data.get('stargazers_count') or 0
+    if stars:
+        add(min(math.log2(1 + stars) * 0.5, 3.0), f"{stars} stars")
+
+    size_kb = repo_data.get('size') or 0
+    if 0 < size_kb < 20:
+        add(-1.0, "tiny")
+    elif size_kb >= 200:
+        add(0.5, "substantial")
+
+    if repo_data.get('archived'):
+        add(-1.5, "archived")
+    if repo_data.get('fork'):
+        add(-1.0, "fork")
+
+    last_activity = _parse_github_time(repo_data.get('pushed_at') or repo_data.get('updated_at'))
+    if last_activity is not None:
+        age_days = ((now or datetime.now(timezone.utc)) - last_activity).days
+        # Full credit for work in the last few months, none for repositories untouched for three years.
+        add(round(3.0 * max(0.0, 1.0 - max(age_days - 90, 0) / 1005), 1), f"pushed {age_days} days ago")
+
+    if scored.skip_reason is None and min_repo_score is not None and scored.score < min_repo_score:
+        scored.skip_reason = "low_score"
+    return scored
+
+
+def select_repositories(
+        repos: List[dict],
+        resume_text: str = "",
+        job_requirements: str = "",
+        resume_data: Optional[ResumeData] = None,
+        limit: int = max_repos_to_analyze
+) -> List[ScoredRepo]:
+    """
+    Ranks a user's repositories from the listing metadata alone, so low-value repositories (empty, forks, no code,
+    stale or unrelated to the resume and the job) are skipped before any content is fetched.
+    """
+    matching_text = _normalize(_resume_text_for_matching(resume_text, resume_data))
+    resume_terms = set(matching_text.split())
+    job_terms = _terms(job_requirements)
+    now = datetime.now(timezone.utc)
+
+    scored_repos = [score_repository(repo_data, matching_text, resume_terms, job_terms, now) for repo_data in repos]
+    candidates = sorted((scored for scored in scored_repos if scored.skip_reason is None),
+                        key=lambda scored: scored.score, reverse=True)
+    selected = candidates[:limit]
+    for scored in candidates[limit:]:
+        scored.skip_reason = "over_limit"
+
+    for scored in scored_repos:
+        repo_selection_total.inc(outcome=scored.skip_reason and f"skipped_{scored.skip_reason}" or "selected")
+        if scored.skip_reason:
+            print(f"Skipping repository '{scored.full_name}' ({scored.skip_reason}, score {scored.score:.1f}).")
+    for scored in selected:
+        print(f"Selected repository '{scored.full_name}' (score {scored.score:.1f}): {'; '.join(scored.reasons)}")
+    return selected
@@ -1,90 +1,187 @@
-import os
 import re
-from typing import List
+from typing import Awaitable, List, Optional
 
-import httpx
+import os
 import json
 import asyncio
-from datetime import datetime
 
 from model.resume_analysis.resume_git_crawling_analysis import GithubAnalysisReport
 from service.chat_completion.chat_completion_service import get_chat_completion_response, get_chat_completion_json
+from service.chat_completion.llm_call_policy import LlmCallError
+from service.chat_completion.prompt_registry import register_prompt_template
+from service.github.github_api_client import GithubApiClient, get_github_api_client, github_api_base_url
+from service.resume_analysis.git_crawling_analysis.github_username_resolver import \
+    extract_github_username_candidates, resolve_github_username
+from service.resume_analysis.basic_analysis.resume_basic_company_analysis_service import extract_job_requirements
+from service.resume_analysis.basic_analysis.job_requirements_store import get_job_requirements_store
+from service.resume_analysis.git_crawling_analysis.repo_analysis_cache import repo_fingerprint
+from service.resume_analysis.git_crawling_analysis.repo_content_filter import BlobIndex, current_blob_index
+from service.resume_analysis.git_crawling_analysis.repo_selection import select_repositories
 from service.resume_analysis.git_crawling_analysis.resume_git_single_repo_analysis_service import analyze_single_repo_async
-
-
-async def git_resume_analysis(resume: str) -> List[GithubAnalysisReport]:
-    github_username = await find_github_username_from_resume(resume)
+from utils.memory_budget import MemoryBudget, current_memory_budget, request_memory_budget_bytes
+from utils.progress_events import ProgressCallback, emit_progress
+from utils.single_flight import SingleFlight
+from utils.tracing import span
+
+# Candidates analyzed concurrently (e.g. in a batch) often share a GitHub user or repositories; do that work once.
+repo_listing_single_flight = SingleFlight()
+repo_analysis_single_flight = SingleFlight()
+# How long repository selection waits for the job requirements the basic analysis is resolving concurrently.
+# Short on purpose: a cold scrape plus extraction takes far longer, and selection should not hold up the crawl for it.
+job_requirements_wait_seconds = float(os.getenv("repo_selection_job_wait_seconds", "1.5"))
+
+github_username_prompt = register_prompt_template("github_username", """
+    You are a helpful assistant. Please find the GitHub username in the resume provided by the user.
+    Answer with the profile URL (https://github.com/<username>), or "none" if the resume mentions no GitHub account.
+    """)
+
+
+async def git_resume_analysis(
+        resume: str,
+        force_refresh: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+        application_link: str = ""
+) -> List[GithubAnalysisReport]:
+    client = get_github_api_client()
+    candidates = extract_github_username_candidates(resume)
+    # Files identical across this candidate's repositories are fetched and analyzed once.
+    current_blob_index.set(BlobIndex())
+    # Bounds the repository content this analysis holds in memory across all of its repositories.
+    current_memory_budget.set(MemoryBudget(request_memory_budget_bytes))
+
+    repo_listing = None
+    if candidates:
+        # Speculatively list the most likely candidate's repositories while the candidates are being verified.
+        repo_listing = asyncio.create_task(list_user_repos(client, candidates[0]))
+
+    with span("username_lookup"):
+        github_username = await find_github_username_from_resume(resume, candidates=candidates)
+    if repo_listing is not None and (github_username or "").lower() != candidates[0].lower():
+        repo_listing.cancel()
+        repo_listing = None
+
+    await emit_progress(on_progress, "github_username", {"github_username": github_username})
     if not github_username:
         return []
 
-    return await git_crawling_analysis_parallel(github_username)
-
-
-async def find_github_username_from_resume(resume: str):
-    analyze_prompt = "Please find github username from following resume_analysis: " + resume
-    raw_git_hub_username = await get_chat_completion_response(analyze_prompt)
-    pattern = r'(https?://(?:www\.)?github\.com/([\w\-.]+))'
-    match = re.search(pattern, raw_git_hub_username)
-    if match:
-        return match.group(2)
-    else:
-        pattern = r'github\.com/([\w\-.]+)'
-        match = re.search(pattern, resume)
-        if match:
-            return match.group(1)
-        match = re.search(r'github:\s*([\w\-.]+)', resume, re.IGNORECASE)
-        if match:
-            return match.group(1)
-    return None
-
-
-async def get_repos_with_api_async(client: httpx.AsyncClient, username: str) -> list:
+    return await git_crawling_analysis_parallel(
+        github_username,
+        force_refresh=force_refresh,
+        on_progress=on_progress,
+        repo_listing=repo_listing,
+        resume_text=resume,
+        application_link=application_link
+    )
+
+
+async def find_github_username_from_resume(resume: str, candidates: Optional[List[str]] = None) -> Optional[str]:
+    client = get_github_api_client()
+    if candidates is None:
+        candidates = extract_github_username_candidates(resume)
+
+    # Profile links and "GitHub:" labels cover most resumes without an LLM round-trip.
+    if candidates:
+        github_username = await resolve_github_username(client, candidates)
+        if github_username:
+            return github_username
+
+    print("No GitHub username found in the resume text. Asking LLM...")
+    try:
+        raw_git_hub_username = await get_chat_completion_response(
+            github_username_prompt.user_prompt(("RESUME", resume)),
+            system_prompt=github_username_prompt.system_prompt,
+            call_site=github_username_prompt.name
+        )
+    except LlmCallError as e:
+        print(f"WARNING: {e}. Continuing without GitHub analysis.")
+        return None
+    llm_candidates = [candidate for candidate in extract_github_username_candidates(raw_git_hub_username)
+                      if candidate.lower() not in {known.lower() for known in candidates}]
+    if not llm_candidates:
+        return None
+    return await resolve_github_username(client, llm_candidates)
+
+
+async def get_repos_with_api_async(client: GithubApiClient, username: str) -> list:
     repo_data_list = []
-    api_url = f"https://api.github.com/users/{username}/repos"
-    while api_url:
-        try:
-            response = await client.get(api_url, params={'per_page': 100})
-            response.raise_for_status()
-            repos_page_data = response.json()
-            repo_data_list.extend(repos_page_data)
-            api_url = response.links.get('next', {}).get('url')
-        except Exception as e:
-            print(f"ERROR: An error occurred while fetching repositories: {e}")
-            break
+    api_url = f"{github_api_base_url}/users/{username}/repos"
+    with span("repo_listing"):
+        while api_url:
+            try:
+                response = await client.get(api_url, params={'per_page': 100})
+                response.raise_for_status()
+                repos_page_data = response.json()
+                repo_data_list.extend(repos_page_data)
+                api_url = response.links.get('next', {}).get('url')
+            except Exception as e:
+                print(f"ERROR: An error occurred while fetching repositories: {e}")
+                break
     return repo_data_list
 
 
-async def git_crawling_analysis_parallel(target_username: str) -> List[GithubAnalysisReport]:
-    token = os.getenv('github_token_1')
-    if not token:
-        print("WARNING: github_token environment variable is not set. API requests will be severely rate-limited.")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {token}"
-    } if token else {"Accept": "application/vnd.github.v3+json"}
-
-    max_repos_to_analyze = 10
-
-    async with httpx.AsyncClient(headers=headers, timeout=50.0) as client:
-        print(f"Fetching repositories for user '{target_username}'...")
-        all_repos_data = await get_repos_with_api_async(client, target_username)
+async def list_user_repos(client: GithubApiClient, username: str) -> list:
+    return await repo_listing_single_flight.do(username.lower(), lambda: get_repos_with_api_async(client, username))
+
+
+async def _job_requirements_for_selection(application_link: str) -> str:
+    if not application_link:
+        return ""
+    job_requirements = get_job_requirements_store().peek(application_link)
+    if job_requirements is not None:
+        return job_requirements
+    # Joins the extraction the basic analysis already started; selection never waits for long.
+    try:
+        return await asyncio.wait_for(asyncio.shield(extract_job_requirements(application_link)),
+                                      timeout=job_requirements_wait_seconds)
+    except asyncio.TimeoutError:
+        print("Job requirements are not ready yet. Selecting repositories from the resume alone.")
+    except Exception as e:
+        print(f"WARNING: Could not use the job requirements for repository selection: {e}")
+    return ""
+
+
+async def git_crawling_analysis_parallel(
+        target_username: str,
+        force_refresh: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+        repo_listing: Optional[Awaitable[list]] = None,
+        resume_text: str = "",
+        application_link: str = ""
+) -> List[GithubAnalysisReport]:
+    client = get_github_api_client()
+
+    print(f"Fetching repositories for user '{target_username}'...")
+    if repo_listing is None:
+        repo_listing = list_user_repos(client, target_username)
+    all_repos_data, job_requirements = await asyncio.gather(
+        repo_listing, _job_requirements_for_selection(application_link)
+    )
+
+    if not all_repos_data:
+        print("No repositories found.")
+        return []
 
-        if not all_repos_data:
-            print("No repositories found.")
-            return []
+    selected_repos = select_repositories(list(all_repos_data), resume_text=resume_text,
+                                         job_requirements=job_requirements)
+    print(f"Found {len(all_repos_data)} repositories. Analyzing {len(selected_repos)} of them...")
 
-        all_repos_data.sort(key=lambda x: datetime.strptime(x['updated_at'], '%Y-%m-%dT%H:%M:%SZ'), reverse=True)
-        print(f"Found and sorted {len(all_repos_data)} repositories. Analyzing top {max_repos_to_analyze}...")
+    async def analyze_and_report(repo_data: dict) -> GithubAnalysisReport:
+        # The flight runs under the caller's BlobIndex and memory budget, so it is only shared within one analysis.
+        # Other candidates share the repository's work through the report cache instead.
+        report = await repo_analysis_single_flight.do(
+            (repo_data.get('full_name') or repo_data.get('html_url'), repo_fingerprint(repo_data), force_refresh,
+             id(current_blob_index.get())),
+            lambda: analyze_single_repo_async(client, repo_data, force_refresh=force_refresh)
+        )
+        if report is not None:
+            await emit_progress(on_progress, "github_repo_analysis", report)
+        return report
 
-        tasks = [
-            analyze_single_repo_async(client, repo_data)
-            for repo_data in all_repos_data[:max_repos_to_analyze]
-        ]
+    tasks = [analyze_and_report(scored.repo_data) for scored in selected_repos]
 
-        analysis_results = await asyncio.gather(*tasks)
+    analysis_results = await asyncio.gather(*tasks)
 
-        final_analysis_results = [result for result in analysis_results if result is not None]
+    final_analysis_results = [result for result in analysis_results if result is not None]
 
     print("\n--- Analysis process finished ---")
     return final_analysis_results
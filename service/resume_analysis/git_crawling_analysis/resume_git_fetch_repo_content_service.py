@@ -1,11 +1,32 @@
 import asyncio
 import base64
+import concurrent.futures
+import io
+import os
+import tarfile
+import threading
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 
-import httpx
+from httpx import HTTPStatusError
 
+from service.github.github_api_client import GithubApiClient, github_api_base_url
 
-async def get_file_content_async(client: httpx.AsyncClient, owner: str, repo: str, path: str) -> str:
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+github_raw_base_url = os.getenv("github_raw_base_url", "https://raw.githubusercontent.com").rstrip("/")
+github_fetch_mode = os.getenv("github_fetch_mode", "tarball")  # tarball | trees | contents
+max_tarball_bytes = int(os.getenv("github_max_tarball_bytes", str(200 * 1024 * 1024)))
+max_concurrent_file_fetches = int(os.getenv("github_file_fetch_concurrency", "8"))
+max_directory_depth = int(os.getenv("github_max_directory_depth", "10"))
+max_listed_files = int(os.getenv("github_max_listed_files", "5000"))
+# Fetched files waiting for the chunk builder; downloads pause while the queue is full.
+max_buffered_files = int(os.getenv("repo_pipeline_queue_size", "16"))
+max_buffered_tarball_chunks = 16
+_end_of_files = object()
+
+
+async def get_file_content_async(client: GithubApiClient, owner: str, repo: str, path: str) -> str:
+    api_url = f"{github_api_base_url}/repos/{owner}/{repo}/contents/{path}"
 
     try:
         response = await client.get(api_url)
@@ -23,7 +44,7 @@ async def get_file_content_async(client: httpx.AsyncClient, owner: str, repo: st
             print(f"Warning: No 'content' or unsupported encoding for file {path}")
             return None
 
-    except httpx.HTTPStatusError as e:
+    except HTTPStatusError as e:
         print(f"Error fetching file content for '{path}': {e.response.status_code} - {e.response.text}")
         return None
     except Exception as e:
@@ -31,26 +52,388 @@ async def get_file_content_async(client: httpx.AsyncClient, owner: str, repo: st
         return None
 
 
-async def get_all_repo_files_async(client: httpx.AsyncClient, owner: str, repo_name: str, path: str = '') -> list:
-    contents_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/{path}"
-    files = []
+async def _list_directory_async(client: GithubApiClient, owner: str, repo_name: str, path: str) -> list:
+    contents_url = f"{github_api_base_url}/repos/{owner}/{repo_name}/contents/{path}"
     try:
         response = await client.get(contents_url)
         response.raise_for_status()
-        contents = response.json()
+        return response.json()
+    except Exception as e:
+        print(f"ERROR: Could not fetch repository contents for path '{path}': {e}")
+        return []
 
-        tasks = []
-        for item in contents:
-            if item['type'] == 'file':
-                files.append(item['path'])
-            elif item['type'] == 'dir':
-                tasks.append(get_all_repo_files_async(client, owner, repo_name, item['path']))
 
-        if tasks:
-            nested_files_list = await asyncio.gather(*tasks)
-            for nested_files in nested_files_list:
-                files.extend(nested_files)
+async def get_all_repo_files_async(
+        client: GithubApiClient,
+        owner: str,
+        repo_name: str,
+        dir_filter: Optional[Callable[[str], bool]] = None,
+        max_depth: int = max_directory_depth,
+        max_files: int = max_listed_files
+) -> list:
+    """
+    Lists the repository's files as contents API items ({'path', 'sha', ...}), one API call per directory.
+    Directories are walked breadth-first by a fixed number of workers, so top-level project code is listed first and
+    a huge repository stops at `max_depth` levels or `max_files` files instead of fanning out without bound.
+    `dir_filter(path)` prunes directories (e.g. vendored code) before they are listed.
+    """
+    files = []
+    pending: asyncio.Queue = asyncio.Queue()
+    pending.put_nowait(('', 0))
+    skipped = {"too_deep": 0, "filtered": 0, "over_file_limit": 0}
 
-    except Exception as e:
-        print(f"ERROR: Could not fetch repository contents for path '{path}': {e}")
+    async def crawl():
+        while True:
+            path, depth = await pending.get()
+            try:
+                if len(files) >= max_files:
+                    skipped["over_file_limit"] += 1
+                    continue
+                for item in await _list_directory_async(client, owner, repo_name, path):
+                    if item['type'] == 'file':
+                        if len(files) >= max_files:
+                            skipped["over_file_limit"] += 1
+                            continue
+                        files.append(item)
+                    elif item['type'] == 'dir':
+                        if depth + 1 > max_depth:
+                            skipped["too_deep"] += 1
+                        elif dir_filter is not None and not dir_filter(item['path']):
+                            skipped["filtered"] += 1
+                        else:
+                            pending.put_nowait((item['path'], depth + 1))
+            finally:
+                pending.task_done()
+
+    workers = [asyncio.create_task(crawl()) for _ in range(max_concurrent_file_fetches)]
+    try:
+        await pending.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    if any(skipped.values()):
+        print(f"Listed {len(files)} files of '{owner}/{repo_name}'. Skipped {skipped['too_deep']} directories "
+              f"deeper than {max_depth} levels, {skipped['filtered']} excluded directories and "
+              f"{skipped['over_file_limit']} entries past the {max_files} file limit.")
     return files
+
+
+def _in_allowed_directory(path: str, dir_filter: Optional[Callable[[str], bool]], directory_allowed: dict) -> bool:
+    # Same pruning as the contents crawl: a file is skipped when any directory above it is excluded.
+    if dir_filter is None:
+        return True
+    directories = path.split('/')[:-1]
+    for depth in range(1, len(directories) + 1):
+        directory = '/'.join(directories[:depth])
+        if directory not in directory_allowed:
+            directory_allowed[directory] = dir_filter(directory)
+        if not directory_allowed[directory]:
+            return False
+    return True
+
+
+def _limit_tree_listing(owner: str, repo_name: str, listed_files: list,
+                        dir_filter: Optional[Callable[[str], bool]] = None) -> list:
+    # Same limits as the contents crawl, keeping the shallowest files as a breadth-first walk would.
+    directory_allowed = {}
+    limited = [item for item in listed_files if item['path'].count('/') <= max_directory_depth
+               and _in_allowed_directory(item['path'], dir_filter, directory_allowed)]
+    if len(limited) > max_listed_files:
+        limited = sorted(limited, key=lambda item: item['path'].count('/'))[:max_listed_files]
+    if len(limited) < len(listed_files):
+        print(f"Keeping {len(limited)} of {len(listed_files)} listed files of '{owner}/{repo_name}' "
+              f"(max depth {max_directory_depth}, max {max_listed_files} files, excluded directories pruned).")
+    return limited
+
+
+async def get_repo_tree_async(client: GithubApiClient, owner: str, repo_name: str, ref: str) -> Optional[list]:
+    tree_url = f"{github_api_base_url}/repos/{owner}/{repo_name}/git/trees/{ref}"
+    try:
+        response = await client.get(tree_url, params={'recursive': '1'})
+        response.raise_for_status()
+        tree_data = response.json()
+    except Exception as e:
+        print(f"ERROR: Could not fetch git tree for '{owner}/{repo_name}': {e}")
+        return None
+
+    if tree_data.get('truncated'):
+        print(f"WARNING: Git tree for '{owner}/{repo_name}' is truncated.")
+        return None
+
+    return [item for item in tree_data.get('tree', []) if item.get('type') == 'blob']
+
+
+async def get_raw_file_content_async(client: GithubApiClient, owner: str, repo: str, ref: str, path: str) -> str:
+    raw_url = f"{github_raw_base_url}/{owner}/{repo}/{ref}/{path}"
+
+    try:
+        response = await client.get(raw_url)
+        response.raise_for_status()
+        return response.content.decode('utf-8')
+    except UnicodeDecodeError:
+        print(f"Warning: File {path} is not valid UTF-8. Skipping.")
+        return None
+    except Exception as e:
+        print(f"An unexpected error occurred while fetching raw '{path}': {e}")
+        return None
+
+
+class _TarballPipe(io.RawIOBase):
+    """
+    Blocking file object that `tarfile` reads on a worker thread while the event loop feeds it downloaded chunks.
+    The loop stops feeding while `max_buffered_chunks` chunks are waiting to be read.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_buffered_chunks: int):
+        self._loop = loop
+        self._max_buffered_chunks = max_buffered_chunks
+        self._chunks = deque()
+        self._current = b""
+        self._finished = False
+        self._condition = threading.Condition()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        with self._condition:
+            while not self._current:
+                if self._chunks:
+                    self._current = self._chunks.popleft()
+                    if len(self._chunks) < self._max_buffered_chunks:
+                        self._loop.call_soon_threadsafe(self._has_room.set)
+                elif self._finished:
+                    return 0
+                else:
+                    self._condition.wait()
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+    async def feed(self, chunk: bytes):
+        await self._has_room.wait()
+        with self._condition:
+            self._chunks.append(chunk)
+            if len(self._chunks) >= self._max_buffered_chunks:
+                self._has_room.clear()
+            self._condition.notify()
+
+    def finish(self, discard: bool = False):
+        with self._condition:
+            if discard:
+                self._chunks.clear()
+            self._finished = True
+            self._condition.notify()
+
+
+def _read_tarball_stream(
+        pipe: _TarballPipe,
+        path_filter: Callable[[str], bool],
+        dir_filter: Optional[Callable[[str], bool]],
+        files: asyncio.Queue,
+        loop: asyncio.AbstractEventLoop,
+        stop: threading.Event
+):
+    def emit(item) -> bool:
+        future = asyncio.run_coroutine_threadsafe(files.put(item), loop)
+        while not stop.is_set():
+            try:
+                future.result(timeout=0.2)
+                return True
+            except concurrent.futures.TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    directory_allowed = {}
+
+    try:
+        with tarfile.open(fileobj=io.BufferedReader(pipe, buffer_size=256 * 1024), mode="r|*") as archive:
+            file_count = 0
+            for member in archive:
+                if stop.is_set():
+                    return
+                if not member.isfile():
+                    continue
+                # GitHub tarballs wrap everything in a single "<owner>-<repo>-<sha>/" directory.
+                _, _, path = member.name.partition('/')
+                if not path or path.count('/') > max_directory_depth or not _in_allowed_directory(path, dir_filter, directory_allowed):
+                    continue
+                file_count += 1
+                if file_count > max_listed_files:
+                    # Archives arrive in path order rather than breadth-first, so this keeps the first files seen.
+                    print(f"{threading.current_thread().name} has more than {max_listed_files} files. "
+                          f"Ignoring the rest.")
+                    break
+                if not path_filter(path):
+                    continue
+                file_object = archive.extractfile(member)
+                if file_object is None:
+                    continue
+                try:
+                    content = file_object.read().decode('utf-8')
+                except UnicodeDecodeError:
+                    print(f"Warning: File {path} is not valid UTF-8. Skipping.")
+                    continue
+                if not emit((path, content)):
+                    return
+        emit(_end_of_files)
+    except Exception as e:
+        emit(e)
+
+
+async def iter_repo_files_from_tarball_async(
+        client: GithubApiClient,
+        owner: str,
+        repo_name: str,
+        ref: str,
+        path_filter: Callable[[str], bool],
+        dir_filter: Optional[Callable[[str], bool]] = None
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Streams the tarball through `tarfile` on a dedicated thread and yields matching files as their members arrive.
+    Applies the same directory depth, `dir_filter` and file-count limits as the trees and contents listings.
+    At most `max_buffered_files` extracted files and `max_buffered_tarball_chunks` downloaded chunks wait in memory.
+    """
+    loop = asyncio.get_running_loop()
+    tarball_url = f"{github_api_base_url}/repos/{owner}/{repo_name}/tarball/{ref}"
+    pipe = _TarballPipe(loop, max_buffered_tarball_chunks)
+    files: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_files)
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=_read_tarball_stream, args=(pipe, path_filter, dir_filter, files, loop, stop),
+        name=f"tarball-{owner}/{repo_name}", daemon=True
+    )
+
+    async def download():
+        downloaded_bytes = 0
+        try:
+            async with client.stream("GET", tarball_url, follow_redirects=True) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    downloaded_bytes += len(chunk)
+                    if downloaded_bytes > max_tarball_bytes:
+                        raise ValueError(f"Tarball for '{owner}/{repo_name}' exceeds {max_tarball_bytes} bytes.")
+                    await pipe.feed(chunk)
+        finally:
+            pipe.finish()
+
+    reader.start()
+    downloader = asyncio.create_task(download())
+    try:
+        while True:
+            item = await files.get()
+            if item is _end_of_files:
+                break
+            if isinstance(item, Exception):
+                # A download error (HTTP status, size limit) explains a truncated archive better than tarfile's.
+                if downloader.done() and not downloader.cancelled() and downloader.exception() is not None:
+                    raise downloader.exception()
+                raise item
+            yield item
+        await downloader
+    finally:
+        stop.set()
+        if not downloader.done():
+            downloader.cancel()
+        await asyncio.gather(downloader, return_exceptions=True)
+        pipe.finish(discard=True)
+
+
+async def _iter_listed_files(
+        listed_files: List[dict],
+        fetch_content: Callable[[str], Awaitable[Optional[str]]]
+) -> AsyncIterator[Tuple[str, str]]:
+    """Downloads listed files in order with bounded concurrency and yields them as they complete."""
+    contents: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_files)
+    semaphore = asyncio.Semaphore(max_concurrent_file_fetches)
+
+    async def fetch(item: dict):
+        async with semaphore:
+            content = await fetch_content(item['path'])
+            # The slot is held until the consumer takes the file, so finished downloads cannot pile up.
+            await contents.put((item['path'], content))
+
+    async def fetch_all():
+        await asyncio.gather(*[fetch(item) for item in listed_files])
+        await contents.put(_end_of_files)
+
+    producer = asyncio.create_task(fetch_all())
+    try:
+        while True:
+            item = await contents.get()
+            if item is _end_of_files:
+                break
+            path, content = item
+            if content:
+                yield path, content
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+
+async def iter_repo_files_async(
+        client: GithubApiClient,
+        owner: str,
+        repo_name: str,
+        ref: str,
+        path_filter: Callable[[str], bool],
+        fetch_mode: str = github_fetch_mode,
+        blob_filter: Optional[Callable[[str, str], bool]] = None,
+        order_key: Optional[Callable[[dict], float]] = None,
+        dir_filter: Optional[Callable[[str], bool]] = None
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Yields (path, content) for the repository's matching files while they are still being downloaded.
+    `blob_filter(path, blob_sha)` can reject files by content id and `order_key(item)` sorts listed files
+    ({'path', 'sha', 'size'}) before download. The trees and contents modes apply both before fetching anything;
+    tarballs arrive in archive order and are filtered by the caller. `dir_filter(path)` prunes directories in every
+    mode.
+    """
+    def is_wanted(item: dict) -> bool:
+        if not path_filter(item['path']):
+            return False
+        return blob_filter is None or not item.get('sha') or blob_filter(item['path'], item['sha'])
+
+    yielded_paths = set()
+    if fetch_mode == 'tarball':
+        try:
+            async with aclosing(iter_repo_files_from_tarball_async(client, owner, repo_name, ref, path_filter,
+                                                                   dir_filter)) as files:
+                async for path, content in files:
+                    yielded_paths.add(path)
+                    yield path, content
+            return
+        except Exception as e:
+            print(f"ERROR: Tarball fetch failed for '{owner}/{repo_name}': {e}. Falling back to the trees API.")
+            fetch_mode = 'trees'
+
+    listed_files = None
+    fetch_content = None
+    if fetch_mode == 'trees':
+        listed_files = await get_repo_tree_async(client, owner, repo_name, ref)
+        if listed_files is not None:
+            listed_files = _limit_tree_listing(owner, repo_name, listed_files, dir_filter)
+        fetch_content = lambda path: get_raw_file_content_async(client, owner, repo_name, ref, path)
+        if listed_files is None:
+            print(f"Falling back to the contents API for '{owner}/{repo_name}'.")
+
+    if listed_files is None:
+        listed_files = await get_all_repo_files_async(client, owner, repo_name, dir_filter=dir_filter)
+        fetch_content = lambda path: get_file_content_async(client, owner, repo_name, path)
+
+    # Files already delivered by a tarball that failed part-way are not fetched again.
+    wanted_files = [item for item in listed_files if item['path'] not in yielded_paths and is_wanted(item)]
+    if order_key is not None:
+        wanted_files.sort(key=order_key)
+    async with aclosing(_iter_listed_files(wanted_files, fetch_content)) as files:
+        async for path, content in files:
+            yield path, content
+
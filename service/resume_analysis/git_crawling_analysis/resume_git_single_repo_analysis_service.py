@@ -1,27 +1,33 @@
 import asyncio
-import json
-from typing import List
-
-import httpx
+import os
+from collections import Counter
+from contextlib import aclosing
+from typing import List, Optional, Tuple
 
 from model.resume_analysis.resume_git_crawling_analysis import GithubAnalysisReport
 from service.chat_completion.chat_completion_service import get_chat_completion_json
+from service.chat_completion.llm_call_policy import LlmCallError
+from service.chat_completion.llm_model_router import current_downgraded_call_sites
+from service.chat_completion.prompt_registry import register_prompt_template
+from service.github.github_api_client import GithubApiClient
+from service.resume_analysis.git_crawling_analysis.repo_analysis_cache import get_repo_analysis_cache, repo_fingerprint
+from service.resume_analysis.git_crawling_analysis.repo_chunk_planner import CodeChunk, IncrementalChunkBuilder, \
+    file_priority, plan_file
+from service.resume_analysis.git_crawling_analysis.repo_content_filter import BlobIndex, \
+    current_blob_index, file_exclusion_reason, is_analyzable_directory, is_analyzable_path, log_excluded_files
+from service.resume_analysis.git_crawling_analysis.repo_report_merger import merge_analysis_results
 from service.resume_analysis.git_crawling_analysis.resume_git_fetch_repo_content_service import \
-    get_all_repo_files_async, get_file_content_async
+    iter_repo_files_async
+from utils.memory_budget import get_memory_budget
+from utils.tracing import span
 
+# Tests and examples (see file_priority) are packed last, after the code they exercise.
+deferred_file_priority = float(os.getenv("repo_deferred_file_priority", "30"))
 
-async def analyze_repo_code_with_llm(combined_code: str, repo_name: str) -> GithubAnalysisReport:
-    prompt = f"""
-    ---
-    Combined Code for '{repo_name}':
-    ```
-    {combined_code}
-    ```
-    """
 
-    system_prompt = f"""
-        As a senior software architect, please conduct a analysis of the provided source code for the repository named '{repo_name}'.
-    The code below is a concatenation of all relevant source files from the repository.
+repo_chunk_prompt = register_prompt_template("repo_chunk_analysis", """
+    As a senior software architect, please conduct a analysis of the provided source code of a repository.
+    The user message names the repository and contains a concatenation of its relevant source files.
 
     Based on the entire codebase, please evaluate the following:
     1.  **Repository Purpose & Core Functionality**:
@@ -46,7 +52,7 @@ async def analyze_repo_code_with_llm(combined_code: str, repo_name: str) -> Gith
         * Offer 3-5 concrete, high-level suggestions for improvement (e.g., refactoring specific parts, improving documentation, adding tests).
 
     Provide the final analysis in a valid JSON format with the following structure:
-    {{
+    {
         "project_name": "Project's name.",
         "project_purpose": "A concise description of the project's goal.",
         "core_functionality": ["Function 1", "Function 2"],
@@ -56,130 +62,190 @@ async def analyze_repo_code_with_llm(combined_code: str, repo_name: str) -> Gith
         "strengths": ["Strength 1", "Strength 2"],
         "weaknesses": ["Weakness 1", "Weakness 2"],
         "improvement_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3"]
-    }}"""
+    }""")
+
 
-    return await get_chat_completion_json(prompt=prompt, system_prompt=system_prompt,
-                                          response_model=GithubAnalysisReport)
+async def analyze_repo_code_with_llm(combined_code: str, repo_name: str, use_cache: bool = True) -> GithubAnalysisReport:
+    prompt = repo_chunk_prompt.user_prompt(("REPOSITORY", repo_name), ("COMBINED CODE", combined_code))
 
+    with span("chunk_completion"):
+        return await get_chat_completion_json(prompt=prompt, system_prompt=repo_chunk_prompt.system_prompt,
+                                              response_model=GithubAnalysisReport, use_cache=use_cache,
+                                              call_site=repo_chunk_prompt.name)
 
-async def analyze_single_repo_async(client: httpx.AsyncClient, repo_data: dict) -> GithubAnalysisReport:
-    file_extensions_to_analyze = ['.py', '.js', '.ts', '.java', '.go', '.rb', '.php', '.cs', '.c', '.cpp', '.h', '.hpp',
-                                  'Dockerfile', 'docker-compose.yml', '.txt']
-    max_chunk_size = 300000  # max token size 272000
 
+async def analyze_single_repo_async(
+        client: GithubApiClient,
+        repo_data: dict,
+        force_refresh: bool = False
+) -> GithubAnalysisReport:
     owner = repo_data['owner']['login']
     repo_name = repo_data['name']
     repo_date = repo_data['updated_at']
-    print(f"Analyzing repository: {repo_name}")
-
-    all_files = await get_all_repo_files_async(client, owner, repo_name)
-    if not all_files:
-        print(f"No files found in repository '{repo_name}'. Skipping.")
-        return None
-
-    filtered_files = [f for f in all_files if any(f.endswith(ext) for ext in file_extensions_to_analyze)]
-
-    content_tasks = [get_file_content_async(client, owner, repo_name, file_path) for file_path in filtered_files]
-    contents = await asyncio.gather(*content_tasks)
-
-    code_chunks = []
-    current_chunk_parts = []
-    current_chunk_size = 0
-
-    for file_path, content in zip(filtered_files, contents):
-        if not content:
-            continue
-
-        file_header = f"--- START OF FILE: {file_path} ---\n"
-        file_footer = f"\n--- END OF FILE: {file_path} ---\n\n"
-        full_file_str = file_header + content + file_footer
-        file_size = len(full_file_str.encode('utf-8'))
-
-        if file_size > max_chunk_size:
-            print(
-                f"WARNING: File '{file_path}' is larger ({file_size / 1024:.2f} KB) than max_chunk_size and will be skipped.")
-            continue
+    ref = repo_data.get('default_branch') or 'HEAD'
+    full_name = repo_data.get('full_name') or f"{owner}/{repo_name}"
+    fingerprint = repo_fingerprint(repo_data)
+    repo_analysis_cache = get_repo_analysis_cache()
+
+    if not force_refresh:
+        cached_report = await repo_analysis_cache.get(full_name, fingerprint)
+        if cached_report is not None:
+            print(f"Repository '{full_name}' is unchanged since its last analysis ({fingerprint}). Using cached report.")
+            cached_report.repo_date = repo_date
+            cached_report.repo_name = repo_name
+            return cached_report
 
-        if current_chunk_size + file_size > max_chunk_size and current_chunk_parts:
-            code_chunks.append("".join(current_chunk_parts))
-            current_chunk_parts = []
-            current_chunk_size = 0
-
-        current_chunk_parts.append(full_file_str)
-        current_chunk_size += file_size
-
-    if current_chunk_parts:
-        code_chunks.append("".join(current_chunk_parts))
+    print(f"Analyzing repository: {repo_name}")
 
-    if not code_chunks:
+    # Chunk and merge calls started below (including their tasks) record deadline downgrades here.
+    downgraded_call_sites = set()
+    current_downgraded_call_sites.set(downgraded_call_sites)
+    blob_index = current_blob_index.get()
+    chunk_count, chunk_results = await analyze_repo_files_pipelined(
+        client, owner, repo_name, ref, full_name, use_cache=not force_refresh, blob_index=blob_index
+    )
+    deduplicated = blob_index is not None and blob_index.duplicates_by_repo[full_name] > 0
+    if not chunk_count and deduplicated:
+        # Every analyzable file is also in another of the candidate's repositories (e.g. a fork the resume names).
+        print(f"All files of '{repo_name}' were already analyzed in other repositories. Analyzing it on its own.")
+        deduplicated = False
+        chunk_count, chunk_results = await analyze_repo_files_pipelined(
+            client, owner, repo_name, ref, full_name, use_cache=not force_refresh
+        )
+    if not chunk_count:
         print(f"No suitable files found to analyze in '{repo_name}'.")
         return None
 
-    print(f"Total code split into {len(code_chunks)} chunk(s) for '{repo_name}'.")
-
-    analysis_tasks = [analyze_repo_code_with_llm(chunk, repo_name) for chunk in code_chunks]
-    partial_analysis_results = await asyncio.gather(*analysis_tasks)
+    # A chunk whose LLM call exhausted its retries is left out rather than failing the whole repository.
+    partial_analysis_results = []
+    for chunk_result in chunk_results:
+        if isinstance(chunk_result, LlmCallError):
+            print(f"WARNING: Skipping a chunk of '{repo_name}': {chunk_result}")
+        elif isinstance(chunk_result, BaseException):
+            raise chunk_result
+        else:
+            partial_analysis_results.append(chunk_result)
+    if not partial_analysis_results:
+        print(f"Every chunk analysis of '{repo_name}' failed. Skipping.")
+        return None
 
-    final_report = await merge_analysis_results(list(partial_analysis_results))
+    with span("merge"):
+        final_report = await merge_analysis_results(partial_analysis_results, use_cache=not force_refresh)
     final_report.repo_date = repo_date
     final_report.repo_name = repo_name
 
-    print(f"Successfully analyzed and merged {len(code_chunks)} chunk(s) for '{repo_name}'.")
+    # A report missing chunks is returned but not cached, so the next request retries the failed ones.
+    # Nor is one that skipped files claimed by another of this candidate's repositories; it depends on who asked.
+    # Nor is one with a call downgraded to a faster tier by the deadline fallback.
+    if downgraded_call_sites:
+        print(f"Not caching the report of '{repo_name}': {', '.join(sorted(downgraded_call_sites))} "
+              f"ran on a faster model tier.")
+    if len(partial_analysis_results) == chunk_count and not deduplicated and not downgraded_call_sites and (
+            final_report.project_purpose or final_report.core_functionality):
+        await repo_analysis_cache.set(full_name, fingerprint, final_report)
+
+    print(f"Successfully analyzed and merged {chunk_count} chunk(s) for '{repo_name}'.")
     return final_report
 
 
-async def merge_analysis_results(reports: List[GithubAnalysisReport]) -> GithubAnalysisReport:
-    if not reports:
-        return GithubAnalysisReport()
-    if len(reports) == 1:
-        return reports[0]
-
-    print(f"Merging {len(reports)} partial reports using LLM...")
-
-    partial_reports_json_str = ""
-    for i, report in enumerate(reports):
-        report_dict = report.model_dump()
-        partial_reports_json_str += f"--- Partial Report {i + 1} ---\n"
-        partial_reports_json_str += json.dumps(report_dict, indent=2)
-        partial_reports_json_str += "\n\n"
-
-    repo_name = reports[0].project_name if reports[0].project_name else "Unknown Repository"
-
-    system_prompt = f"""
-        You are an expert senior software architect. Your task is to synthesize multiple partial code analysis reports for the repository '{repo_name}' into a single, final, and comprehensive report.
-
-        The user will provide a series of JSON objects, each representing an analysis of a different part of the same codebase.
-        Your goal is to intelligently merge the information. Consolidate findings, remove duplicates, and produce a holistic overview.
-
-        When synthesizing the `weaknesses` from different reports, pay close attention to how they might be interconnected or complementary. Identify if one weakness is a root cause of another to reveal deeper, underlying issues in the project. For example, a weakness in 'lack of documentation' might be directly related to a weakness in 'difficult onboarding for new developers'. Your analysis should capture these relationships.
-
-        Provide the final analysis in a valid JSON format with the following structure:
-        {{
-            "project_name": "{repo_name}",
-            "project_purpose": "A concise description of the project's goal.",
-            "core_functionality": ["Function 1", "Function 2"],
-            "architecture_design": "Feedback on architecture and project structure.",
-            "code_quality_assessment": "Overall assessment of the code quality.",
-            "technology_stack": ["Language", "Framework", "Key Library"],
-            "strengths": ["Strength 1", "Strength 2"],
-            "weaknesses": ["Weakness 1", "Weakness 2"],
-            "improvement_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3"]
-        }}
-        """
-
-    prompt = f"""
-    Please synthesize the following {len(reports)} partial analysis reports for the repository '{repo_name}' into one final report.
-    Ensure the final report is comprehensive and cohesive.
-
-    --- Combined Partial Reports ---
-    {partial_reports_json_str}
-    --- End of Combined Partial Reports ---
+async def analyze_repo_files_pipelined(
+        client: GithubApiClient,
+        owner: str,
+        repo_name: str,
+        ref: str,
+        full_name: str,
+        use_cache: bool = True,
+        blob_index: Optional[BlobIndex] = None
+) -> Tuple[int, List]:
     """
-
-    final_report = await get_chat_completion_json(
-        prompt=prompt,
-        system_prompt=system_prompt,
-        response_model=GithubAnalysisReport
-    )
-
-    return final_report
+    Streams the repository's files into chunks and starts each chunk's LLM call as soon as the chunk fills,
+    while later files are still downloading. File contents count against the request's memory budget from the
+    moment they are accepted until their chunk's LLM call finishes.
+    Files already claimed in `blob_index` by another repository are skipped.
+    Returns the number of chunks and their results (reports or exceptions), in dispatch order.
+    """
+    budget = get_memory_budget()
+    builder = IncrementalChunkBuilder()
+    chunk_tasks: List[asyncio.Task] = []
+    deferred_files: List[Tuple[str, str, int]] = []
+    excluded = Counter()
+
+    def dispatch(chunks: List[CodeChunk]):
+        for chunk in chunks:
+            print(f"Sending chunk {len(chunk_tasks) + 1} of '{repo_name}' "
+                  f"({chunk.file_count} files, {chunk.tokens} tokens) for analysis.")
+            task = asyncio.create_task(analyze_repo_code_with_llm(chunk.text, repo_name, use_cache=use_cache))
+            # Released by the dispatcher, not the task body: a task cancelled before it starts never runs a finally.
+            task.add_done_callback(lambda _, content_bytes=chunk.content_bytes: budget.release_nowait(content_bytes))
+            chunk_tasks.append(task)
+
+    async def pack(path: str, content: str, content_bytes: int):
+        dropped_before = len(builder.dropped_files)
+        try:
+            # Tokenizing a large file takes long enough to stall every other request on the event loop.
+            planned_file = await asyncio.to_thread(plan_file, path, content, builder.chunk_token_budget)
+        except BaseException:
+            await budget.release(content_bytes)
+            raise
+        dispatch(builder.add(planned_file, content_bytes))
+        if len(builder.dropped_files) > dropped_before:
+            await budget.release(content_bytes)
+
+    async def pack_deferred_files():
+        # Popped one at a time so a file being packed is never also counted as deferred if packing is interrupted.
+        while deferred_files:
+            await pack(*deferred_files.pop(0))
+
+    async def admit(content_bytes: int):
+        if budget.try_acquire(content_bytes):
+            return
+        # Out of memory budget: send the fullest buffered chunk so its finished call frees memory, and another one
+        # only if that was not enough. Partially filled chunks are kept open as long as possible.
+        print(f"Memory budget of {budget.capacity_bytes} bytes reached while fetching '{repo_name}'. "
+              f"Sending buffered chunks early.")
+        await pack_deferred_files()
+        while not budget.try_acquire(content_bytes):
+            if not builder.open_chunk_count:
+                await budget.acquire(content_bytes)
+                return
+            dispatch(builder.flush_fullest())
+            await asyncio.wait([task for task in chunk_tasks if not task.done()], return_when=asyncio.FIRST_COMPLETED)
+
+    try:
+        repo_files = iter_repo_files_async(
+            client, owner, repo_name, ref,
+            path_filter=is_analyzable_path,
+            blob_filter=blob_index.blob_filter(full_name) if blob_index is not None else None,
+            order_key=lambda item: -file_priority(item['path'], item.get('size', 0) // 4),
+            dir_filter=is_analyzable_directory
+        )
+        # aclosing stops the downloads right away if packing fails or the analysis is cancelled.
+        async with aclosing(repo_files):
+            with span("file_fetch"):
+                async for path, content in repo_files:
+                    reason = file_exclusion_reason(full_name, path, content, blob_index)
+                    if reason is not None:
+                        excluded[reason] += 1
+                        continue
+                    content_bytes = len(content.encode('utf-8'))
+                    await admit(content_bytes)
+                    if file_priority(path, content_bytes // 4) < deferred_file_priority:
+                        deferred_files.append((path, content, content_bytes))
+                    else:
+                        await pack(path, content, content_bytes)
+                    if builder.is_full:
+                        # Leaving the loop closes the stream, so the remaining files are never downloaded.
+                        print(f"'{repo_name}' filled its {builder.max_chunks} chunks. Not fetching the remaining files.")
+                        break
+
+                await pack_deferred_files()
+                dispatch(builder.flush())
+    except BaseException:
+        for task in chunk_tasks:
+            task.cancel()
+        await budget.release(builder.open_bytes + sum(content_bytes for _, _, content_bytes in deferred_files))
+        raise
+    finally:
+        log_excluded_files(full_name, excluded)
+
+    return len(chunk_tasks), list(await asyncio.gather(*chunk_tasks, return_exceptions=True))
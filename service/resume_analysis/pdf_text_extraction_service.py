@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import UploadFile
+
+from utils.pdf_to_text_converter import PdfExtractionError, get_pdf_page_count, pdf_pages_to_text
+from utils.tracing import span
+
+max_pdf_upload_bytes = int(os.getenv("pdf_max_upload_bytes", str(10 * 1024 * 1024)))
+max_pdf_pages = int(os.getenv("pdf_max_pages", "50"))
+pages_per_task = int(os.getenv("pdf_pages_per_task", "8"))
+pdf_process_workers = int(os.getenv("pdf_process_workers", str(min(os.cpu_count() or 2, 4))))
+max_cached_pdf_texts = int(os.getenv("pdf_text_cache_entries", "256"))
+upload_read_chunk_bytes = 64 * 1024
+multipart_overhead_bytes = 64 * 1024
+
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+_pdf_text_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
+    global _pdf_process_pool
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(max_workers=pdf_process_workers)
+    return _pdf_process_pool
+
+
+def shutdown_pdf_process_pool():
+    global _pdf_process_pool
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_process_pool = None
+
+
+def max_pdf_upload_body_bytes(file_count: int = 1) -> int:
+    """Largest multipart request body accepted for an upload carrying up to `file_count` PDFs."""
+    return max_pdf_upload_bytes * file_count + multipart_overhead_bytes
+
+
+async def read_pdf_upload(upload: UploadFile) -> bytes:
+    # Starlette has already spooled the file by the time this runs; the middleware in main.py rejects
+    # oversized bodies up front from Content-Length, this check covers chunked uploads without one.
+    if upload.size is not None and upload.size > max_pdf_upload_bytes:
+        raise PdfExtractionError(f"The uploaded PDF exceeds the {max_pdf_upload_bytes} byte limit.", status_code=413)
+
+    pdf_bytes = bytearray()
+    while True:
+        chunk = await upload.read(upload_read_chunk_bytes)
+        if not chunk:
+            break
+        pdf_bytes.extend(chunk)
+        if len(pdf_bytes) > max_pdf_upload_bytes:
+            raise PdfExtractionError(f"The uploaded PDF exceeds the {max_pdf_upload_bytes} byte limit.", status_code=413)
+
+    if not pdf_bytes:
+        raise PdfExtractionError("The uploaded PDF is empty.")
+    return bytes(pdf_bytes)
+
+
+async def extract_pdf_text(pdf_bytes: bytes) -> str:
+    with span("pdf_parse"):
+        return await _extract_pdf_text(pdf_bytes)
+
+
+async def _extract_pdf_text(pdf_bytes: bytes) -> str:
+    content_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    cached_text = _pdf_text_cache.get(content_hash)
+    if cached_text is not None:
+        _pdf_text_cache.move_to_end(content_hash)
+        print(f"PDF text cache hit for {content_hash[:12]}")
+        return cached_text
+
+    loop = asyncio.get_running_loop()
+    process_pool = get_pdf_process_pool()
+
+    page_count = await loop.run_in_executor(process_pool, get_pdf_page_count, pdf_bytes)
+    if page_count > max_pdf_pages:
+        raise PdfExtractionError(f"The uploaded PDF has {page_count} pages; at most {max_pdf_pages} are allowed.")
+
+    page_texts = await asyncio.gather(*[
+        loop.run_in_executor(process_pool, pdf_pages_to_text, pdf_bytes, start_page,
+                             min(start_page + pages_per_task, page_count))
+        for start_page in range(0, page_count, pages_per_task)
+    ])
+    text = "".join(page_texts)
+    if not text.strip():
+        raise PdfExtractionError("No text could be extracted from the uploaded PDF. Scanned PDFs are not supported.")
+
+    _pdf_text_cache[content_hash] = text
+    while len(_pdf_text_cache) > max_cached_pdf_texts:
+        _pdf_text_cache.popitem(last=False)
+    return text
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+from service.resume_analysis.resume_core_analysis_service import analyze_resume
+from utils.progress_events import format_sse_event
+from utils.request_context import current_request_id, get_request_id, current_deadline, deadline_after
+from utils.tracing import RequestTimings, current_request_timings
+
+keep_alive_interval_seconds = 15.0
+_stream_finished = object()
+
+
+def stream_resume_analysis(resume_text: str, application_link: str, force_refresh: bool = False) -> AsyncIterator[str]:
+    request_id = get_request_id()
+    # Response headers are sent before the analysis runs, so the timing summary is streamed as the last event instead.
+    timings = RequestTimings()
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def on_progress(event: str, data: Any):
+        await events.put((event, data))
+
+    async def run_analysis():
+        current_request_id.set(request_id)
+        current_request_timings.set(timings)
+        current_deadline.set(deadline_after())
+        try:
+            await analyze_resume(resume_text, application_link, force_refresh=force_refresh, on_progress=on_progress)
+        except Exception as e:
+            print(f"ERROR: Streaming resume analysis failed: {e}")
+            await events.put(("error", {"detail": str(e)}))
+        finally:
+            await events.put(("timings", timings.summary()))
+            await events.put((_stream_finished, None))
+
+    async def event_stream() -> AsyncIterator[str]:
+        analysis_task = asyncio.create_task(run_analysis())
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), timeout=keep_alive_interval_seconds)
+                except asyncio.TimeoutError:
+                    # SSE comment lines keep proxies and load balancers from closing an idle connection.
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is _stream_finished:
+                    yield format_sse_event("done")
+                    return
+                yield format_sse_event(event, data)
+        finally:
+            if not analysis_task.done():
+                analysis_task.cancel()
+
+    return event_stream()
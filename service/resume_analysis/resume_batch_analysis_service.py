@@ -0,0 +1,144 @@
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from model.resume_analysis.resume_batch_analysis import ResumeBatchItem, RankedCandidate
+from service.resume_analysis.basic_analysis.resume_basic_company_analysis_service import extract_job_requirements
+from service.resume_analysis.resume_analysis_stream_service import keep_alive_interval_seconds
+from service.resume_analysis.resume_core_analysis_service import analyze_resume, resume_text_from_pdf
+from utils.progress_events import format_sse_event
+from utils.request_context import current_request_id, get_request_id, current_deadline, deadline_after
+from utils.tracing import RequestTimings, current_request_timings
+
+batch_parallelism = int(os.getenv("resume_batch_parallelism", "8"))
+max_batch_size = int(os.getenv("resume_batch_max_size", "50"))
+_batch_finished = object()
+
+
+def _rank_key(candidate: RankedCandidate) -> float:
+    # Failed candidates sink to the bottom.
+    return -candidate.score if candidate.score is not None else float('inf')
+
+
+def rank_candidates(candidates: List[RankedCandidate]) -> List[RankedCandidate]:
+    ranked = sorted(candidates, key=_rank_key)
+    return [candidate.model_copy(update={"rank": rank}) for rank, candidate in enumerate(ranked, start=1)]
+
+
+def check_batch_size(resume_count: int):
+    if resume_count > max_batch_size:
+        raise HTTPException(status_code=413,
+                            detail=f"The batch has {resume_count} resumes; at most {max_batch_size} are allowed.")
+
+
+async def resume_batch_items_from_pdfs(
+        resume_pdf_files: List[UploadFile]
+) -> Tuple[List[ResumeBatchItem], List[RankedCandidate]]:
+    """Extracts every PDF's text. A PDF that cannot be read becomes a failed candidate instead of failing the batch."""
+    resume_texts = await asyncio.gather(
+        *[resume_text_from_pdf(resume_pdf_file) for resume_pdf_file in resume_pdf_files], return_exceptions=True
+    )
+    resumes, failed_candidates = [], []
+    for index, (resume_pdf_file, resume_text) in enumerate(zip(resume_pdf_files, resume_texts), start=1):
+        # File names are not unique within a batch, so they are only shown alongside the upload position.
+        candidate_id = f"candidate-{index}"
+        file_name = resume_pdf_file.filename
+        if isinstance(resume_text, HTTPException):
+            print(f"ERROR: Could not read the resume PDF of candidate '{candidate_id}' ({file_name}): "
+                  f"{resume_text.detail}")
+            failed_candidates.append(RankedCandidate(candidate_id=candidate_id, file_name=file_name,
+                                                     error=resume_text.detail))
+        elif isinstance(resume_text, BaseException):
+            raise resume_text
+        else:
+            resumes.append(ResumeBatchItem(candidate_id=candidate_id, file_name=file_name, resume_text=resume_text))
+    return resumes, failed_candidates
+
+
+def stream_resume_batch_analysis(
+        resumes: List[ResumeBatchItem],
+        application_link: str,
+        force_refresh: bool = False,
+        failed_candidates: Optional[List[RankedCandidate]] = None
+) -> AsyncIterator[str]:
+    request_id = get_request_id()
+    timings = RequestTimings()
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def analyze_candidate(index: int, resume: ResumeBatchItem, semaphore: asyncio.Semaphore) -> RankedCandidate:
+        async with semaphore:
+            # Each candidate is its own owner in the GitHub and LLM schedulers, so one candidate's large repositories
+            # share fairly with the rest of the batch instead of all candidates splitting one request's slots.
+            current_request_id.set(f"{request_id}-{index}")
+            # Each candidate gets the full per-request deadline from when it starts, not from when the batch did.
+            current_deadline.set(deadline_after())
+            try:
+                report = await analyze_resume(resume.resume_text, application_link, force_refresh=force_refresh)
+                return RankedCandidate(candidate_id=resume.candidate_id, file_name=resume.file_name,
+                                       score=report.revised_job_fit.updated_score, report=report)
+            except Exception as e:
+                print(f"ERROR: Batch analysis of candidate '{resume.candidate_id}' failed: {e}")
+                return RankedCandidate(candidate_id=resume.candidate_id, file_name=resume.file_name, error=str(e))
+
+    async def run_batch():
+        current_request_id.set(request_id)
+        current_request_timings.set(timings)
+        current_deadline.set(deadline_after())
+        try:
+            # Resolve the posting once up front; every candidate pipeline then hits the job requirements store.
+            job_requirements = await extract_job_requirements(application_link, force_refresh=force_refresh)
+            await events.put(("job_requirements", job_requirements))
+
+            semaphore = asyncio.Semaphore(batch_parallelism)
+            candidate_tasks = [asyncio.create_task(analyze_candidate(index, resume, semaphore))
+                               for index, resume in enumerate(resumes, start=1)]
+            completed: List[RankedCandidate] = []
+            total = len(resumes) + len(failed_candidates or [])
+
+            async def report_candidate(candidate: RankedCandidate):
+                completed.append(candidate)
+                current_rank = 1 + sum(1 for other in completed if _rank_key(other) < _rank_key(candidate))
+                await events.put(("candidate_result", {
+                    "completed": len(completed),
+                    "total": total,
+                    "candidate": candidate.model_copy(update={"rank": current_rank})
+                }))
+
+            try:
+                # Candidates whose resume could not be read are reported right away.
+                for candidate in failed_candidates or []:
+                    await report_candidate(candidate)
+                for candidate_task in asyncio.as_completed(candidate_tasks):
+                    await report_candidate(await candidate_task)
+            finally:
+                for candidate_task in candidate_tasks:
+                    candidate_task.cancel()
+
+            await events.put(("ranked_results", rank_candidates(completed)))
+        except Exception as e:
+            print(f"ERROR: Batch resume analysis failed: {e}")
+            await events.put(("error", {"detail": str(e)}))
+        finally:
+            await events.put(("timings", timings.summary()))
+            await events.put((_batch_finished, None))
+
+    async def event_stream() -> AsyncIterator[str]:
+        batch_task = asyncio.create_task(run_batch())
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), timeout=keep_alive_interval_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is _batch_finished:
+                    yield format_sse_event("done")
+                    return
+                yield format_sse_event(event, data)
+        finally:
+            if not batch_task.done():
+                batch_task.cancel()
+
+    return event_stream()
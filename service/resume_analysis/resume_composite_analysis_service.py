@@ -1,18 +1,15 @@
-import json
 from typing import List, Dict, Any
 
 from model.resume_analysis.resume_basic_analysis import CandidateBasicAnalysis
 from model.resume_analysis.resume_composite_analysis import CompositeAnalysisReport
 from model.resume_analysis.resume_git_crawling_analysis import GithubAnalysisReport
 from service.chat_completion.chat_completion_service import get_chat_completion_response, get_chat_completion_json
+from service.chat_completion.prompt_registry import register_prompt_template
+from service.resume_analysis.basic_analysis.job_requirements_store import get_job_requirements_store
+from service.resume_analysis.composite_context_budgeter import build_composite_context
+from utils.tracing import span
 
-
-async def composite_resume_analysis(
-    basic_analysis_result: CandidateBasicAnalysis,
-    github_analysis_reports: List[GithubAnalysisReport]
-) -> CompositeAnalysisReport:
-
-    system_prompt = """
+composite_analysis_prompt = register_prompt_template("composite_analysis", """
     You are a highly experienced senior software engineer and a tech hiring manager.
     Your task is to synthesize information from a candidate's basic resume analysis and detailed analyses of their GitHub projects to create a comprehensive, evidence-based final evaluation.
     Go beyond simple summaries. Your analysis must provide deep insights into the candidate's true capabilities by using the GitHub analysis as concrete proof.
@@ -43,24 +40,30 @@ async def composite_resume_analysis(
         "Example: The resume claims expertise in 'Project X', but the corresponding GitHub repository is minimal and lacks significant commits."
       ]
     }
-    """
 
-    basic_analysis_str = basic_analysis_result.model_dump_json(indent=2)
-    github_analysis_reports_as_dicts = [report.model_dump() for report in github_analysis_reports]
-    github_reports_str= json.dumps(github_analysis_reports_as_dicts, indent=2, ensure_ascii=False)
+    The user message contains the candidate's basic resume and job fit analysis followed by the GitHub project analyses,
+    as compact JSON. GitHub projects are ordered by relevance to the job; the least relevant may be shortened.
+    """)
 
-    prompt = f"""
-    Here is the candidate's information. Please perform a composite analysis based on the system instructions.
 
-    --- BASIC RESUME AND JOB FIT ANALYSIS ---
-    {basic_analysis_str}
+async def composite_resume_analysis(
+    basic_analysis_result: CandidateBasicAnalysis,
+    github_analysis_reports: List[GithubAnalysisReport],
+    application_link: str = ""
+) -> CompositeAnalysisReport:
+    # Already resolved by the basic analysis; peeking never triggers a new scrape.
+    job_requirements = get_job_requirements_store().peek(application_link) if application_link else None
+    context = build_composite_context(basic_analysis_result, github_analysis_reports, job_requirements or "")
 
-    --- DETAILED GITHUB PROJECT ANALYSIS ---
-    {github_reports_str}
-    """
+    prompt = composite_analysis_prompt.user_prompt(
+        ("BASIC RESUME AND JOB FIT ANALYSIS", context.basic_analysis_json),
+        ("DETAILED GITHUB PROJECT ANALYSIS", context.github_reports_json)
+    )
 
-    return await get_chat_completion_json(
-        prompt=prompt,
-        response_model=CompositeAnalysisReport,
-        system_prompt=system_prompt
-    )
\ No newline at end of file
+    with span("composite"):
+        return await get_chat_completion_json(
+            prompt=prompt,
+            response_model=CompositeAnalysisReport,
+            system_prompt=composite_analysis_prompt.system_prompt,
+            call_site=composite_analysis_prompt.name
+        )
\ No newline at end of file
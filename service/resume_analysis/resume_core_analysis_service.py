@@ -1,24 +1,50 @@
 import asyncio
+from typing import Optional
 
-from fastapi import UploadFile
+from fastapi import UploadFile, HTTPException
 
 from service.resume_analysis.basic_analysis.resume_basic_core_analysis_service import basic_resume_analysis
 from service.resume_analysis.resume_composite_analysis_service import composite_resume_analysis
 from service.resume_analysis.git_crawling_analysis.resume_git_core_analysis_service import git_resume_analysis
-from utils.pdf_to_text_converter import pdf_to_text
+from service.resume_analysis.pdf_text_extraction_service import read_pdf_upload, extract_pdf_text
+from utils.pdf_to_text_converter import PdfExtractionError
+from utils.progress_events import ProgressCallback, emit_progress
 
 
-async def analyze_resume(resume_text: str, application_link: str):
-    basic_analysis_result, github_analysis_result = await asyncio.gather(
-        basic_resume_analysis(resume_text, application_link),
-        git_resume_analysis(resume_text)
-    )
+async def analyze_resume(
+        resume_text: str,
+        application_link: str,
+        force_refresh: bool = False,
+        on_progress: Optional[ProgressCallback] = None
+):
+    basic_task = asyncio.create_task(basic_resume_analysis(resume_text, application_link, on_progress=on_progress))
+    git_task = asyncio.create_task(git_resume_analysis(resume_text, force_refresh=force_refresh, on_progress=on_progress,
+                                                       application_link=application_link))
+    try:
+        basic_analysis_result, github_analysis_result = await asyncio.gather(basic_task, git_task)
+    finally:
+        # gather leaves the other branch running when one fails; nobody would receive its result.
+        # (TaskGroup would wrap the error in an ExceptionGroup and bypass the LlmCallError handler.)
+        basic_task.cancel()
+        git_task.cancel()
 
-    composite_analysis_result = await composite_resume_analysis(basic_analysis_result, github_analysis_result)
+    composite_analysis_result = await composite_resume_analysis(
+        basic_analysis_result,
+        github_analysis_result,
+        application_link=application_link
+    )
+    await emit_progress(on_progress, "composite_analysis", composite_analysis_result)
     return composite_analysis_result
 
 
-async def analyze_pdf_resume(resume_pdf_file: UploadFile, application_link: str):
-    pdf_bytes = await resume_pdf_file.read()
-    resume_text = pdf_to_text(pdf_bytes)
-    return await analyze_resume(resume_text, application_link)
+async def resume_text_from_pdf(resume_pdf_file: UploadFile) -> str:
+    try:
+        pdf_bytes = await read_pdf_upload(resume_pdf_file)
+        return await extract_pdf_text(pdf_bytes)
+    except PdfExtractionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+async def analyze_pdf_resume(resume_pdf_file: UploadFile, application_link: str, force_refresh: bool = False):
+    resume_text = await resume_text_from_pdf(resume_pdf_file)
+    return await analyze_resume(resume_text, application_link, force_refresh=force_refresh)
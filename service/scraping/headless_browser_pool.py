@@ -0,0 +1,246 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+user_agent = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
+dom_idle_seconds = 0.75
+dom_poll_interval_seconds = 0.25
+
+_chrome_driver_path: Optional[str] = None
+_chrome_driver_path_lock = threading.Lock()
+
+
+class BrowserPoolBusyError(Exception):
+    pass
+
+
+@dataclass
+class RenderedPage:
+    url: str
+    html: str
+    text: str
+
+
+@dataclass
+class _RenderJob:
+    url: str
+    wait_for_selector: Optional[str]
+    future: asyncio.Future
+
+
+def _get_chrome_driver_path() -> str:
+    global _chrome_driver_path
+    with _chrome_driver_path_lock:
+        if _chrome_driver_path is None:
+            _chrome_driver_path = ChromeDriverManager().install()
+        return _chrome_driver_path
+
+
+def _create_driver() -> webdriver.Chrome:
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument(f'user-agent={user_agent}')
+    return webdriver.Chrome(service=Service(_get_chrome_driver_path()), options=options)
+
+
+class _BrowserWorker:
+    """A Chrome instance pinned to one thread. Selenium drivers are not thread-safe, so every call goes through `executor`."""
+
+    def __init__(self, index: int, max_pages: int, page_timeout: float):
+        self.index = index
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"headless-browser-{index}")
+        self.driver: Optional[webdriver.Chrome] = None
+        self.pages_served = 0
+        self.busy = False
+
+    def ensure_driver(self) -> webdriver.Chrome:
+        if self.driver is None:
+            self.driver = _create_driver()
+            self.driver.set_page_load_timeout(self.page_timeout)
+            self.pages_served = 0
+        return self.driver
+
+    def quit_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"WARNING: Failed to quit headless browser {self.index}: {e}")
+            self.driver = None
+
+    def render(self, url: str, wait_for_selector: Optional[str]) -> RenderedPage:
+        driver = self.ensure_driver()
+        try:
+            driver.get(url)
+            self._wait_until_ready(driver, wait_for_selector)
+            return RenderedPage(
+                url=url,
+                html=driver.page_source,
+                text=driver.find_element(By.TAG_NAME, 'body').text
+            )
+        except Exception:
+            self.quit_driver()
+            raise
+        finally:
+            self.pages_served += 1
+            if self.pages_served >= self.max_pages:
+                print(f"Recycling headless browser {self.index} after {self.pages_served} pages.")
+                self.quit_driver()
+
+    def _wait_until_ready(self, driver: webdriver.Chrome, wait_for_selector: Optional[str]):
+        deadline = time.monotonic() + self.page_timeout
+        wait = WebDriverWait(driver, self.page_timeout, poll_frequency=dom_poll_interval_seconds)
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+        if wait_for_selector:
+            try:
+                wait.until(expected_conditions.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector)))
+            except TimeoutException:
+                print(f"WARNING: Selector '{wait_for_selector}' did not appear on {driver.current_url}.")
+
+        # Client-rendered career sites keep filling the DOM after `load`; wait until the text stops changing.
+        last_length = -1
+        stable_since = time.monotonic()
+        while time.monotonic() < deadline:
+            length = driver.execute_script("return document.body ? document.body.innerText.length : 0")
+            now = time.monotonic()
+            if length != last_length:
+                last_length = length
+                stable_since = now
+            elif length > 0 and now - stable_since >= dom_idle_seconds:
+                return
+            time.sleep(dom_poll_interval_seconds)
+
+
+class HeadlessBrowserPool:
+    """
+    Keeps warm headless browsers in dedicated threads and feeds them from a bounded queue.
+    Browsers are recycled after `max_pages_per_browser` pages to keep Chrome memory in check.
+    """
+
+    def __init__(
+            self,
+            size: int,
+            max_pages_per_browser: int,
+            max_queue_size: int,
+            page_timeout: float,
+            queue_timeout: float
+    ):
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_queue_size = max_queue_size
+        self.page_timeout = page_timeout
+        self.queue_timeout = queue_timeout
+        self._workers: List[_BrowserWorker] = []
+        self._worker_tasks: List[asyncio.Task] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    async def start(self, prewarm: bool = True):
+        async with self._start_lock:
+            if self.started:
+                return
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._workers = [
+                _BrowserWorker(index, self.max_pages_per_browser, self.page_timeout) for index in range(self.size)
+            ]
+            self._worker_tasks = [asyncio.create_task(self._run_worker(worker)) for worker in self._workers]
+
+        if prewarm:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *[loop.run_in_executor(worker.executor, worker.ensure_driver) for worker in self._workers],
+                return_exceptions=True
+            )
+            for worker, result in zip(self._workers, results):
+                if isinstance(result, Exception):
+                    print(f"WARNING: Could not prewarm headless browser {worker.index}: {result}")
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            await loop.run_in_executor(worker.executor, worker.quit_driver)
+            worker.executor.shutdown(wait=False)
+
+        self._workers = []
+        self._worker_tasks = []
+        self._queue = None
+
+    async def render(self, url: str, wait_for_selector: Optional[str] = None) -> RenderedPage:
+        if not self.started:
+            await self.start(prewarm=False)
+
+        job = _RenderJob(url=url, wait_for_selector=wait_for_selector, future=asyncio.get_running_loop().create_future())
+        try:
+            await asyncio.wait_for(self._queue.put(job), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolBusyError(f"Headless browser queue is full ({self.max_queue_size} pending pages).")
+
+        return await job.future
+
+    def snapshot(self) -> dict:
+        return {
+            "size": self.size,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "busy_browsers": sum(1 for worker in self._workers if worker.busy),
+            "pages_served": {worker.index: worker.pages_served for worker in self._workers},
+        }
+
+    async def _run_worker(self, worker: _BrowserWorker):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.future.cancelled():
+                continue
+
+            worker.busy = True
+            try:
+                page = await loop.run_in_executor(worker.executor, worker.render, job.url, job.wait_for_selector)
+                if not job.future.done():
+                    job.future.set_result(page)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                worker.busy = False
+
+
+_headless_browser_pool: Optional[HeadlessBrowserPool] = None
+
+
+def get_headless_browser_pool() -> HeadlessBrowserPool:
+    global _headless_browser_pool
+    if _headless_browser_pool is None:
+        _headless_browser_pool = HeadlessBrowserPool(
+            size=int(os.getenv("browser_pool_size", "2")),
+            max_pages_per_browser=int(os.getenv("browser_pages_per_instance", "50")),
+            max_queue_size=int(os.getenv("browser_queue_size", "32")),
+            page_timeout=float(os.getenv("browser_page_timeout_seconds", "20")),
+            queue_timeout=float(os.getenv("browser_queue_timeout_seconds", "30"))
+        )
+    return _headless_browser_pool
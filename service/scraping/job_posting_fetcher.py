@@ -0,0 +1,57 @@
+import asyncio
+import os
+from typing import Optional
+
+import httpx
+
+from service.scraping.headless_browser_pool import get_headless_browser_pool, user_agent
+from service.scraping.main_content_extractor import extract_main_content_text
+
+min_static_text_length = int(os.getenv("scraper_min_static_text_length", "500"))
+static_fetch_timeout_seconds = float(os.getenv("scraper_static_timeout_seconds", "10"))
+
+_static_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_static_http_client() -> httpx.AsyncClient:
+    global _static_http_client
+    if _static_http_client is None:
+        _static_http_client = httpx.AsyncClient(
+            headers={"User-Agent": user_agent, "Accept": "text/html,application/xhtml+xml"},
+            timeout=static_fetch_timeout_seconds,
+            follow_redirects=True
+        )
+    return _static_http_client
+
+
+async def close_static_http_client():
+    global _static_http_client
+    if _static_http_client is not None:
+        await _static_http_client.aclose()
+        _static_http_client = None
+
+
+async def fetch_static_html(url: str) -> Optional[str]:
+    try:
+        response = await get_static_http_client().get(url)
+        response.raise_for_status()
+        if "html" not in response.headers.get("content-type", "text/html"):
+            return None
+        return response.text
+    except Exception as e:
+        print(f"Static fetch failed for {url}: {e}")
+        return None
+
+
+async def fetch_job_posting_text(url: str) -> str:
+    html = await fetch_static_html(url)
+    if html:
+        # Parsing a large listing page takes seconds of CPU; keep it off the event loop.
+        text = await asyncio.to_thread(extract_main_content_text, html)
+        if len(text) >= min_static_text_length:
+            print(f"Extracted {len(text)} chars from static HTML of {url}.")
+            return text
+        print(f"Static HTML of {url} has too little text ({len(text)} chars). Escalating to the headless browser.")
+
+    page = await get_headless_browser_pool().render(url)
+    return await asyncio.to_thread(extract_main_content_text, page.html) or page.text
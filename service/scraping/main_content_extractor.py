@@ -0,0 +1,106 @@
+import json
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup, Tag
+
+boilerplate_tags = ['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'nav', 'footer', 'header', 'aside',
+                    'form', 'button', 'select', 'input']
+boilerplate_pattern = re.compile(
+    r'cookie|consent|gdpr|banner|navbar|navigation|menu|footer|breadcrumb|sidebar|social|share|newsletter|'
+    r'subscribe|popup|modal|advert|promo|related|recommend', re.IGNORECASE)
+content_pattern = re.compile(
+    r'job|posting|position|vacancy|career|description|requirement|qualification|responsibilit|content|article|main',
+    re.IGNORECASE)
+boilerplate_roles = {'navigation', 'banner', 'contentinfo', 'dialog', 'alertdialog', 'search'}
+block_tags = ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'dd', 'dt', 'td', 'blockquote']
+min_block_text_length = 25
+
+
+def extract_main_content_text(html: str) -> str:
+    if not html:
+        return ""
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    job_posting_text = _extract_json_ld_job_posting(soup)
+    if job_posting_text:
+        return job_posting_text
+
+    _strip_boilerplate(soup)
+
+    body = soup.body or soup
+    candidate = _find_main_content_candidate(body) or body
+    return _normalize_text(candidate.get_text("\n"))
+
+
+def _extract_json_ld_job_posting(soup: BeautifulSoup) -> Optional[str]:
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or "")
+        except (json.JSONDecodeError, TypeError):
+            continue
+
+        items = data if isinstance(data, list) else data.get('@graph', [data]) if isinstance(data, dict) else []
+        for item in items:
+            if not isinstance(item, dict) or item.get('@type') != 'JobPosting' or not item.get('description'):
+                continue
+            description = BeautifulSoup(item['description'], "html.parser").get_text("\n")
+            parts = [item.get('title') or "", _normalize_text(description)]
+            for key in ('qualifications', 'responsibilities', 'skills', 'experienceRequirements'):
+                value = item.get(key)
+                if isinstance(value, str) and value:
+                    parts.append(_normalize_text(BeautifulSoup(value, "html.parser").get_text("\n")))
+            return "\n\n".join(part for part in parts if part)
+    return None
+
+
+def _strip_boilerplate(soup: BeautifulSoup):
+    for element in soup.find_all(boilerplate_tags):
+        element.decompose()
+
+    for element in soup.find_all(True):
+        if element.decomposed or not isinstance(element, Tag) or element.attrs is None:
+            continue
+        if element.name in ('html', 'body', 'main', 'article'):
+            continue
+        if element.get('role') in boilerplate_roles:
+            element.decompose()
+            continue
+        marker = " ".join([element.get('id') or ""] + list(element.get('class') or []))
+        if marker and boilerplate_pattern.search(marker) and not content_pattern.search(marker):
+            element.decompose()
+
+
+def _find_main_content_candidate(body: Tag) -> Optional[Tag]:
+    scores = {}
+    elements = {}
+
+    for block in body.find_all(block_tags):
+        text_length = len(block.get_text(" ", strip=True))
+        if text_length < min_block_text_length:
+            continue
+        for ancestor, weight in ((block.parent, 1.0), (block.parent.parent if block.parent else None, 0.5)):
+            if not isinstance(ancestor, Tag):
+                continue
+            key = id(ancestor)
+            elements[key] = ancestor
+            scores[key] = scores.get(key, 0.0) + text_length * weight
+
+    if not scores:
+        return None
+
+    def final_score(key: int) -> float:
+        element = elements[key]
+        text_length = len(element.get_text(" ", strip=True)) or 1
+        link_length = sum(len(link.get_text(" ", strip=True)) for link in element.find_all('a'))
+        marker = " ".join([element.get('id') or ""] + list(element.get('class') or []))
+        bonus = 1.25 if content_pattern.search(marker) or element.name in ('main', 'article') else 1.0
+        return scores[key] * (1 - link_length / text_length) * bonus
+
+    return elements[max(scores, key=final_score)]
+
+
+def _normalize_text(text: str) -> str:
+    lines = [re.sub(r'[ \t ]+', ' ', line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
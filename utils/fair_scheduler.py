@@ -0,0 +1,152 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+@dataclass
+class Ticket:
+    owner: str
+    cost: int = 0
+    meta: Any = None
+
+
+@dataclass
+class _Waiter:
+    ticket: Ticket
+    future: asyncio.Future
+
+
+class FairScheduler:
+    """
+    Admits work round-robin across owners (usually one owner per HTTP request) so that a single
+    large request cannot starve the others. `admission_delay` lets callers add extra admission rules
+    (e.g. rate windows); it returns how many seconds to wait before the next admission is possible.
+    """
+
+    def __init__(
+            self,
+            capacity: int,
+            per_owner_capacity: Optional[int] = None,
+            admission_delay: Optional[Callable[[Ticket], float]] = None,
+            on_admit: Optional[Callable[[Ticket], None]] = None
+    ):
+        self.capacity = capacity
+        self.per_owner_capacity = per_owner_capacity
+        self._admission_delay = admission_delay
+        self._on_admit = on_admit
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._in_flight = 0
+        self._in_flight_by_owner: Dict[str, int] = {}
+        self._wakeup_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def queue_depth_by_owner(self) -> Dict[str, int]:
+        return {owner: len(queue) for owner, queue in self._queues.items()}
+
+    def in_flight_by_owner(self) -> Dict[str, int]:
+        return dict(self._in_flight_by_owner)
+
+    async def acquire(self, owner: str, cost: int = 0) -> Ticket:
+        waiter = _Waiter(ticket=Ticket(owner=owner, cost=cost), future=asyncio.get_running_loop().create_future())
+        self._queues.setdefault(owner, deque()).append(waiter)
+        self.dispatch()
+
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.ticket)
+            else:
+                self._remove_waiter(waiter)
+            raise
+
+    def release(self, ticket: Ticket):
+        self._in_flight -= 1
+        remaining = self._in_flight_by_owner.get(ticket.owner, 0) - 1
+        if remaining > 0:
+            self._in_flight_by_owner[ticket.owner] = remaining
+        else:
+            self._in_flight_by_owner.pop(ticket.owner, None)
+        self.dispatch()
+
+    @asynccontextmanager
+    async def slot(self, owner: str, cost: int = 0):
+        ticket = await self.acquire(owner, cost)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def dispatch(self):
+        while self._in_flight < self.capacity:
+            owner = self._next_owner()
+            if owner is None:
+                return
+
+            queue = self._queues[owner]
+            waiter = queue[0]
+
+            if self._admission_delay:
+                delay = self._admission_delay(waiter.ticket)
+                if delay > 0:
+                    self._schedule_wakeup(delay)
+                    return
+
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+
+            self._in_flight += 1
+            self._in_flight_by_owner[owner] = self._in_flight_by_owner.get(owner, 0) + 1
+            if self._on_admit:
+                self._on_admit(waiter.ticket)
+            waiter.future.set_result(waiter.ticket)
+
+    def _next_owner(self) -> Optional[str]:
+        for owner in list(self._queues.keys()):
+            queue = self._queues[owner]
+            while queue and queue[0].future.done():
+                queue.popleft()
+            if not queue:
+                del self._queues[owner]
+                continue
+            if self.per_owner_capacity and self._in_flight_by_owner.get(owner, 0) >= self.per_owner_capacity:
+                continue
+            return owner
+        return None
+
+    def _remove_waiter(self, waiter: _Waiter):
+        queue = self._queues.get(waiter.ticket.owner)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[waiter.ticket.owner]
+
+    def _schedule_wakeup(self, delay: float):
+        loop = asyncio.get_running_loop()
+        wakeup_at = loop.time() + delay
+        if self._wakeup_handle is not None:
+            # Keep whichever wakeup comes first; a later one would hold back a waiter that is ready sooner.
+            if self._wakeup_handle.when() <= wakeup_at:
+                return
+            self._wakeup_handle.cancel()
+        self._wakeup_handle = loop.call_at(wakeup_at, self._on_wakeup)
+
+    def _on_wakeup(self):
+        self._wakeup_handle = None
+        self.dispatch()
@@ -0,0 +1,62 @@
+import asyncio
+import os
+from contextvars import ContextVar
+from typing import Optional
+
+request_memory_budget_bytes = int(os.getenv("request_memory_budget_bytes", str(32 * 1024 * 1024)))
+
+
+class MemoryBudget:
+    """
+    Byte-counting semaphore bounding how much fetched content one request keeps in memory at a time.
+    A single item larger than the whole budget is admitted alone rather than blocking forever.
+    """
+
+    def __init__(self, capacity_bytes: int):
+        self.capacity_bytes = capacity_bytes
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self._released = asyncio.Condition()
+        self._pending_releases = set()
+
+    def _clamp(self, size: int) -> int:
+        return min(size, self.capacity_bytes)
+
+    def try_acquire(self, size: int) -> bool:
+        size = self._clamp(size)
+        if self.used_bytes + size > self.capacity_bytes:
+            return False
+        self.used_bytes += size
+        self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+        return True
+
+    async def acquire(self, size: int):
+        async with self._released:
+            await self._released.wait_for(lambda: self.try_acquire(size))
+
+    async def release(self, size: int):
+        async with self._released:
+            self.used_bytes = max(self.used_bytes - self._clamp(size), 0)
+            self._released.notify_all()
+
+    def release_nowait(self, size: int):
+        """Releases from synchronous code on the event loop, such as a task's done-callback. Waiters wake up shortly."""
+        self.used_bytes = max(self.used_bytes - self._clamp(size), 0)
+        task = asyncio.get_running_loop().create_task(self._notify_released())
+        self._pending_releases.add(task)
+        task.add_done_callback(self._pending_releases.discard)
+
+    async def _notify_released(self):
+        async with self._released:
+            self._released.notify_all()
+
+
+current_memory_budget: ContextVar[Optional[MemoryBudget]] = ContextVar("current_memory_budget", default=None)
+
+
+def get_memory_budget() -> MemoryBudget:
+    budget = current_memory_budget.get()
+    if budget is None:
+        budget = MemoryBudget(request_memory_budget_bytes)
+        current_memory_budget.set(budget)
+    return budget
@@ -1,16 +1,41 @@
 import fitz
 
 
-def pdf_to_text(pdf_content_bytes: bytes) -> str:
+class PdfExtractionError(Exception):
+    def __init__(self, message: str, status_code: int = 422):
+        super().__init__(message, status_code)
+        self.message = message
+        self.status_code = status_code
+
+
+def _open_pdf(pdf_content_bytes: bytes):
     try:
-        pdf_document = fitz.open(stream=pdf_content_bytes, filetype="pdf")
+        return fitz.open(stream=pdf_content_bytes, filetype="pdf")
+    except Exception as e:
+        raise PdfExtractionError(f"The uploaded file is not a readable PDF: {e}")
 
-        full_text = []
-        for page in pdf_document:
-            full_text.append(page.get_text())
 
-        return "".join(full_text)
+def get_pdf_page_count(pdf_content_bytes: bytes) -> int:
+    with _open_pdf(pdf_content_bytes) as pdf_document:
+        if pdf_document.needs_pass:
+            raise PdfExtractionError("The uploaded PDF is password protected.")
+        return pdf_document.page_count
 
-    except Exception as e:
-        print(f"PDF conversion error: {e}")
-        return None
\ No newline at end of file
+
+def _page_text_with_links(page) -> str:
+    text = page.get_text()
+    # Hyperlinks (e.g. a "GitHub" label pointing at a profile) live in link annotations, not in the page text.
+    link_uris = [link["uri"] for link in page.get_links() if link.get("uri") and link["uri"] not in text]
+    return text + "".join(f"{uri}\n" for uri in dict.fromkeys(link_uris))
+
+
+def pdf_pages_to_text(pdf_content_bytes: bytes, start_page: int, end_page: int) -> str:
+    with _open_pdf(pdf_content_bytes) as pdf_document:
+        try:
+            return "".join(_page_text_with_links(pdf_document[page_number]) for page_number in range(start_page, end_page))
+        except Exception as e:
+            raise PdfExtractionError(f"PDF conversion error on pages {start_page + 1}-{end_page}: {e}")
+
+
+def pdf_to_text(pdf_content_bytes: bytes) -> str:
+    return pdf_pages_to_text(pdf_content_bytes, 0, get_pdf_page_count(pdf_content_bytes))
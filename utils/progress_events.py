@@ -0,0 +1,16 @@
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+ProgressCallback = Callable[[str, Any], Awaitable[None]]
+
+
+async def emit_progress(on_progress: Optional[ProgressCallback], event: str, data: Any = None):
+    if on_progress is not None:
+        await on_progress(event, data)
+
+
+def format_sse_event(event: str, data: Any = None) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,29 @@
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+BACKGROUND_REQUEST_ID = "background"
+request_deadline_seconds = float(os.getenv("request_deadline_seconds", "600"))
+
+current_request_id: ContextVar[str] = ContextVar("current_request_id", default=BACKGROUND_REQUEST_ID)
+# Absolute time.monotonic() by which the current request's work should be finished; None means no deadline.
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> str:
+    return current_request_id.get()
+
+
+def deadline_after(seconds: Optional[float] = None) -> float:
+    return time.monotonic() + (request_deadline_seconds if seconds is None else seconds)
+
+
+def remaining_time() -> Optional[float]:
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
@@ -0,0 +1,23 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight execution instead of repeating the work."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the work other callers are waiting on.
+        return await asyncio.shield(task)
+
+    def in_flight_keys(self) -> list:
+        return list(self._in_flight.keys())
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+cache_dir = os.getenv("cache_dir", ".cache")
+
+
+def get_cache_db_path(file_name: str) -> str:
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, file_name)
+
+
+class SqliteKeyValueStore:
+    """
+    Small persistent key/value table with optional per-entry expiry.
+    Sync methods hit SQLite directly; the `a*` variants run them in a worker thread so the event loop never blocks.
+    """
+
+    def __init__(self, db_path: str, table: str):
+        self.db_path = db_path
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL, expires_at REAL)"
+            )
+            self._connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, updated_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, expires_at)
+            )
+            self._connection.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute(f"DELETE FROM {self.table}")
+            self._connection.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._connection.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            self._connection.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def items(self, limit: int = 100) -> List[Tuple[str, str, float, Optional[float]]]:
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT key, value, updated_at, expires_at FROM {self.table} ORDER BY updated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        await asyncio.to_thread(self.set, key, value, ttl_seconds)
+
+    async def adelete(self, key: str):
+        await asyncio.to_thread(self.delete, key)
+
+    async def aclear(self):
+        await asyncio.to_thread(self.clear)
@@ -0,0 +1,70 @@
+import os
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+tokenizer_encoding_name = os.getenv("tokenizer_encoding", "o200k_base")
+
+_encoding = None
+_encoding_unavailable = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        if tiktoken is None:
+            _encoding_unavailable = True
+            print("WARNING: tiktoken is not installed. Falling back to estimated token counts.")
+        else:
+            try:
+                _encoding = tiktoken.get_encoding(tokenizer_encoding_name)
+            except Exception as e:
+                _encoding_unavailable = True
+                print(f"WARNING: Could not load tokenizer '{tokenizer_encoding_name}': {e}. Falling back to estimates.")
+    return _encoding
+
+
+def _estimate_tokens(text: str) -> int:
+    # Latin text averages ~4 chars per token; CJK and other non-ASCII scripts are close to one token per char.
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        if _estimate_tokens(text) <= max_tokens:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if _estimate_tokens(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def truncate_tail_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return truncate_to_tokens(text[::-1], max_tokens)[::-1]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[-max_tokens:])
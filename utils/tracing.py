@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from utils.metrics import metrics_registry
+
+stage_duration_seconds = metrics_registry.histogram(
+    "resume_stage_duration_seconds", "Duration of resume analysis stages.", ["stage"]
+)
+stage_errors_total = metrics_registry.counter(
+    "resume_stage_errors_total", "Resume analysis stages that raised an exception.", ["stage"]
+)
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response headers are ready.",
+    ["method", "route", "status"]
+)
+
+
+class RequestTimings:
+    """Per-request stage durations and counters. Concurrent spans of the same stage are summed."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}  # stage -> [total seconds, span count]
+        self.counters: Dict[str, float] = {}
+
+    def add_stage(self, stage: str, seconds: float):
+        entry = self.stages.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def increment(self, name: str, amount: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "stages": {stage: {"ms": round(seconds * 1000, 1), "count": count}
+                       for stage, (seconds, count) in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def server_timing_header(self) -> str:
+        entries = [f'{stage};dur={seconds * 1000:.1f};desc="{count}x"' for stage, (seconds, count) in self.stages.items()]
+        entries += [f'{name};desc="{value:g}"' for name, value in self.counters.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started_at) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+current_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_request_timings", default=None)
+
+
+def record_request_count(name: str, amount: float = 1):
+    timings = current_request_timings.get()
+    if timings is not None:
+        timings.increment(name, amount)
+
+
+@contextmanager
+def span(stage: str):
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors_total.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started_at
+        stage_duration_seconds.observe(elapsed, stage=stage)
+        timings = current_request_timings.get()
+        if timings is not None:
+            timings.add_stage(stage, elapsed)